@@ -2,6 +2,11 @@
 Criterios profesionales para análisis de hechos esenciales CMF
 Basado en mejores prácticas de Bloomberg/Refinitiv
 """
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from alerts.utils.aho_corasick import AhoCorasick
 
 # Empresas IPSA (actualizar semestralmente según cambios en el índice)
 EMPRESAS_IPSA = {
@@ -361,24 +366,236 @@ CATEGORIAS_HECHOS = {
     }
 }
 
+# Exclusiones de filtrar_hechos_profesional: (campos donde se buscan, palabras)
+EXCLUSIONES_HECHOS = {
+    # Fondos de inversión
+    "FONDO": (("titulo", "materia", "entidad"), [
+        'fondo', 'fondos', 'fund', 'funds', 'fip', 'fia',
+        'fondo de inversion', 'fondo mutuo', 'mutual fund',
+        'investment fund', 'fondo inmobiliario'
+    ]),
+    # Colocación de valores
+    "COLOCACION": (("titulo", "materia", "resumen"), [
+        'colocación de valores', 'colocacion de valores',
+        'colocación de bonos', 'colocacion de bonos',
+        'colocación exitosa', 'colocacion exitosa',
+        'colocación de acciones', 'colocacion de acciones',
+        'colocación en el mercado', 'colocacion en el mercado',
+        'colocación internacional', 'colocacion internacional'
+    ]),
+    # Compañías de seguros
+    "SEGURO": (("entidad",), [
+        'seguro', 'seguros', 'aseguradora', 'aseguradoras',
+        'insurance', 'vida security', 'metlife', 'consorcio seguros',
+        'bice vida', 'euroamerica', 'ohio national', 'principal seguros',
+        'zurich santander', 'confuturo', 'chilena consolidada',
+        'sura', 'mapfre', 'liberty', 'rsa', 'hdi', 'bci seguros',
+        'santander seguros', 'compañía de seguros', 'compania de seguros',
+        'cia de seguros', 'cia. de seguros', 'cía de seguros',
+        'cía. de seguros', 'rigel', 'reale chile'
+    ]),
+    # Materias propias de seguros
+    "MATERIA_SEGUROS": (("materia",), [
+        'poliza', 'póliza', 'siniestro', 'prima', 'reaseguro',
+        'cobertura de seguro', 'contrato de seguro'
+    ]),
+    # Cambios en la administración
+    "CAMBIO_ADMINISTRACION": (("titulo", "materia"), [
+        'cambio en la administración', 'cambio en la administracion',
+        'cambios en la administración', 'cambios en la administracion',
+        'cambio de directorio', 'nuevo directorio',
+        'renuncia director', 'renuncia gerente',
+        'nombramiento director', 'nombramiento gerente',
+        'designación director', 'designacion director',
+        'elección de directorio', 'eleccion de directorio',
+        'renovación del directorio', 'renovacion del directorio',
+        'cambio de gerente general', 'nuevo gerente general',
+        'cambio en el directorio', 'cambios en el directorio'
+    ]),
+}
+
+# Bonus de relevancia según el contexto (resumen) del hecho
+BONUS_CONTEXTO = {
+    "MONTO": ["millon", "billion", "significativo"],
+    "MONEDA": ["usd", "dolares"],
+    "RESULTADO": ["ebitda", "utilidad", "margen"],
+    "PORCENTAJE": ["10%", "20%", "30%", "40%", "50%"],
+}
+
+AnalisisHecho = namedtuple('AnalisisHecho', ['categoria', 'marcas'])
+
+
+def _regex_trie(palabras):
+    """
+    Alternación con los prefijos comunes factorizados (un trie como regex).
+    El motor descarta una posición con un solo carácter en vez de probar
+    cada palabra, y los opcionales codiciosos dan la palabra más larga.
+    """
+    trie = {}
+    for palabra in palabras:
+        nodo = trie
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[''] = True
+
+    def construir(nodo):
+        alternativas = [re.escape(c) + construir(hijo) for c, hijo in sorted(nodo.items()) if c]
+        if not alternativas:
+            return ''
+        cuerpo = alternativas[0] if len(alternativas) == 1 else '(?:' + '|'.join(alternativas) + ')'
+        return '(?:' + cuerpo + ')?' if '' in nodo else cuerpo
+
+    return construir(trie)
+
+
+class ClasificadorHechos:
+    """
+    Compila las palabras clave de CATEGORIAS_HECHOS, EXCLUSIONES_HECHOS y
+    BONUS_CONTEXTO en una sola regex y analiza un hecho con una pasada sobre
+    "titulo materia resumen" + entidad (en minúsculas).
+
+    La regex es un lookahead, así encuentra en cada posición la palabra más
+    larga que empieza ahí; las palabras más cortas en la misma posición son
+    prefijos de ella y se precalculan. Cada aparición se atribuye al campo
+    que la contiene, así cada tabla se evalúa solo sobre sus campos, como los
+    `any(palabra in ...)` originales.
+    """
+
+    SEPARADOR = "\x00"
+
+    def __init__(self, categorias, exclusiones, bonus):
+        self._orden_categorias = list(categorias)
+        self._campos = {marca: campos for marca, (campos, _) in exclusiones.items()}
+        self._campos.update({marca: ("resumen",) for marca in bonus})
+
+        etiquetas = {}
+        for categoria, info in categorias.items():
+            for palabra in info["keywords"]:
+                etiquetas.setdefault(palabra, set()).add(("CATEGORIA", categoria))
+        for marca, (_, palabras) in exclusiones.items():
+            for palabra in palabras:
+                etiquetas.setdefault(palabra, set()).add(("MARCA", marca))
+        for marca, palabras in bonus.items():
+            for palabra in palabras:
+                etiquetas.setdefault(palabra, set()).add(("MARCA", marca))
+
+        # Para cada palabra: (tipo, nombre, largo) de ella y de sus prefijos que también son palabras
+        self._apariciones = {
+            palabra: tuple(
+                (tipo, nombre, len(prefijo))
+                for prefijo in (palabra[:n] for n in range(1, len(palabra) + 1)) if prefijo in etiquetas
+                for tipo, nombre in sorted(etiquetas[prefijo])
+            )
+            for palabra in etiquetas
+        }
+        self._regex = re.compile('(?=(' + _regex_trie(etiquetas) + '))')
+        self.analizar = lru_cache(maxsize=4096)(self._analizar)
+
+    def _analizar(self, titulo, materia, entidad, resumen):
+        """Retorna AnalisisHecho(categoria o None, marcas de exclusión/bonus)"""
+        campos = {"titulo": titulo.lower(), "materia": materia.lower(), "resumen": (resumen or "").lower()}
+        texto = f"{campos['titulo']} {campos['materia']} {campos['resumen']}"
+        fin_categorias = len(texto)
+        texto += self.SEPARADOR + entidad.lower()
+
+        # Rango [inicio, fin) de cada campo dentro del texto
+        rangos = {}
+        inicio = 0
+        for nombre in ("titulo", "materia", "resumen"):
+            rangos[nombre] = (inicio, inicio + len(campos[nombre]))
+            inicio += len(campos[nombre]) + 1
+        rangos["entidad"] = (inicio, len(texto))
+
+        categorias = set()
+        marcas = set()
+        for coincidencia in self._regex.finditer(texto):
+            desde = coincidencia.start()
+            for tipo, nombre, largo in self._apariciones[coincidencia.group(1)]:
+                hasta = desde + largo
+                if tipo == "CATEGORIA":
+                    if hasta <= fin_categorias:
+                        categorias.add(nombre)
+                elif nombre not in marcas:
+                    for campo in self._campos[nombre]:
+                        inicio_campo, fin_campo = rangos[campo]
+                        if desde >= inicio_campo and hasta <= fin_campo:
+                            marcas.add(nombre)
+                            break
+
+        categoria = next((c for c in self._orden_categorias if c in categorias), None)
+        return AnalisisHecho(categoria, frozenset(marcas))
+
+
+# Se construye una vez al importar el módulo
+CLASIFICADOR_HECHOS = ClasificadorHechos(CATEGORIAS_HECHOS, EXCLUSIONES_HECHOS, BONUS_CONTEXTO)
+
+
+# Etiquetas de las listas de empresas
+LISTA_IPSA = "IPSA"
+LISTA_ESTRATEGICA = "ESTRATEGICA"
+
+
+class MatcherEmpresas:
+    """
+    Clasifica un nombre de empresa contra las listas IPSA y estratégicas con
+    la misma semántica de siempre: hay coincidencia si un nombre de la lista
+    está contenido en el de la empresa, o si el de la empresa está contenido
+    en uno de la lista.
+
+    La primera dirección usa un autómata Aho-Corasick (una pasada por el
+    nombre). La segunda busca el nombre en todos los de la lista unidos por
+    un separador, con una sola búsqueda de subcadena.
+    """
+
+    SEPARADOR = "\x00"
+
+    def __init__(self, listas):
+        """
+        Args:
+            listas: Pares (etiqueta, conjunto de nombres) en orden de prioridad
+        """
+        self._orden = [etiqueta for etiqueta, _ in listas]
+        self._automata = AhoCorasick(
+            (nombre, etiqueta) for etiqueta, nombres in listas for nombre in nombres
+        )
+        self._unidos = {
+            etiqueta: self.SEPARADOR.join(nombres) for etiqueta, nombres in listas
+        }
+        self.clasificar = lru_cache(maxsize=4096)(self._clasificar)
+
+    def _clasificar(self, nombre_empresa):
+        """Retorna la etiqueta de mayor prioridad que coincide, o None"""
+        nombre_upper = nombre_empresa.upper().strip()
+        contenidas = self._automata.etiquetas(nombre_upper)
+        for etiqueta in self._orden:
+            if etiqueta in contenidas:
+                return etiqueta
+            if self.SEPARADOR not in nombre_upper and nombre_upper in self._unidos[etiqueta]:
+                return etiqueta
+        return None
+
+
+# Se construye una vez al importar el módulo
+MATCHER_EMPRESAS = MatcherEmpresas([
+    (LISTA_IPSA, EMPRESAS_IPSA),
+    (LISTA_ESTRATEGICA, EMPRESAS_ESTRATEGICAS),
+])
+
+
+def clasificar_empresa(nombre_empresa):
+    """
+    Indica en qué lista está la empresa: LISTA_IPSA, LISTA_ESTRATEGICA o None.
+    IPSA tiene prioridad cuando el nombre aparece en ambas.
+    """
+    return MATCHER_EMPRESAS.clasificar(nombre_empresa)
+
 def es_empresa_ipsa(nombre_empresa):
     """Verifica si la empresa pertenece al IPSA"""
-    nombre_upper = nombre_empresa.upper().strip()
-    for empresa_ipsa in EMPRESAS_IPSA:
-        if empresa_ipsa in nombre_upper or nombre_upper in empresa_ipsa:
-            return True
-    return False
+    return clasificar_empresa(nombre_empresa) == LISTA_IPSA
 
 def es_empresa_estrategica(nombre_empresa):
     """Verifica si la empresa es estratégica (IPSA o adicional)"""
-    if es_empresa_ipsa(nombre_empresa):
-        return True
-    
-    nombre_upper = nombre_empresa.upper().strip()
-    for empresa in EMPRESAS_ESTRATEGICAS:
-        if empresa in nombre_upper or nombre_upper in empresa:
-            return True
-    return False
+    return clasificar_empresa(nombre_empresa) is not None
 
 def evaluar_criticidad_hecho(titulo, materia, entidad, resumen=""):
     """
@@ -388,33 +605,20 @@ def evaluar_criticidad_hecho(titulo, materia, entidad, resumen=""):
         tuple: (categoria, peso_base, es_prioritaria)
     """
     # Incluir resumen en la evaluación para capturar contenido real cuando materia es "Otros"
-    texto_completo = f"{titulo} {materia} {resumen}".lower()
+    categoria = CLASIFICADOR_HECHOS.analizar(titulo, materia, entidad, resumen).categoria
     es_prioritaria = es_empresa_estrategica(entidad)
     
-    # Evaluar cada categoría
-    for categoria, info in CATEGORIAS_HECHOS.items():
-        for keyword in info["keywords"]:
-            if keyword in texto_completo:
-                return categoria, info["peso"], es_prioritaria
-    
     # Por defecto es rutinario
-    return "RUTINARIO", CATEGORIAS_HECHOS["RUTINARIO"]["peso"], es_prioritaria
+    categoria = categoria or "RUTINARIO"
+    return categoria, CATEGORIAS_HECHOS[categoria]["peso"], es_prioritaria
 
 def es_empresa_prioritaria(nombre_empresa):
     """
     Verifica si la empresa es prioritaria (IPSA o de las 500 empresas importantes)
     Estas empresas siempre tendrán sus hechos incluidos
     """
-    # Primero verificar si es IPSA
-    if es_empresa_ipsa(nombre_empresa):
-        return True
-    
-    # Luego verificar si está en las empresas estratégicas originales
-    if es_empresa_estrategica(nombre_empresa):
-        return True
-    
-    # Las 500 empresas importantes se verifican en es_empresa_estrategica
-    return False
+    # IPSA o cualquiera de las 500 empresas importantes
+    return clasificar_empresa(nombre_empresa) is not None
 
 def calcular_relevancia_profesional(titulo, materia, entidad, contexto_adicional=""):
     """
@@ -441,18 +645,16 @@ def calcular_relevancia_profesional(titulo, materia, entidad, contexto_adicional
         # Garantizar mínimo de 7.0 para empresas prioritarias (siempre se incluyen)
         relevancia = max(relevancia + 2.5, 7.0)
     
-    # Factores adicionales del contexto
-    contexto_lower = contexto_adicional.lower()
+    # Factores adicionales del contexto (ya detectados en la misma pasada)
+    marcas = CLASIFICADOR_HECHOS.analizar(titulo, materia, entidad, contexto_adicional).marcas
     
     # Bonus por montos significativos
-    if any(word in contexto_lower for word in ["millon", "billion", "significativo"]):
-        if "usd" in contexto_lower or "dolares" in contexto_lower:
-            relevancia += 0.5
+    if "MONTO" in marcas and "MONEDA" in marcas:
+        relevancia += 0.5
     
     # Bonus por impacto en resultados
-    if any(word in contexto_lower for word in ["ebitda", "utilidad", "margen"]):
-        if any(word in contexto_lower for word in ["10%", "20%", "30%", "40%", "50%"]):
-            relevancia += 0.5
+    if "RESULTADO" in marcas and "PORCENTAJE" in marcas:
+        relevancia += 0.5
     
     # Cap máximo de 10
     relevancia = min(relevancia, 10)
@@ -566,54 +768,16 @@ def filtrar_hechos_profesional(hechos, max_hechos=12):
     # Primero, filtrar hechos relacionados con fondos, colocación de valores y compañías de seguros
     hechos_filtrados = []
     for hecho in hechos:
-        titulo = hecho.get('titulo', '').lower()
-        materia = hecho.get('materia', '').lower()
-        entidad = hecho.get('entidad', '').lower()
-        resumen = hecho.get('resumen', '').lower()
-        
-        # Excluir si contiene palabras relacionadas con fondos
-        es_fondo = any(palabra in titulo or palabra in materia or palabra in entidad 
-                      for palabra in ['fondo', 'fondos', 'fund', 'funds', 'fip', 'fia', 
-                                     'fondo de inversion', 'fondo mutuo', 'mutual fund',
-                                     'investment fund', 'fondo inmobiliario'])
-        
-        # Excluir si es colocación de valores
-        es_colocacion = any(palabra in titulo or palabra in materia or palabra in resumen
-                           for palabra in ['colocación de valores', 'colocacion de valores',
-                                          'colocación de bonos', 'colocacion de bonos',
-                                          'colocación exitosa', 'colocacion exitosa',
-                                          'colocación de acciones', 'colocacion de acciones',
-                                          'colocación en el mercado', 'colocacion en el mercado',
-                                          'colocación internacional', 'colocacion internacional'])
-        
-        # Excluir si es compañía de seguros
-        es_seguro = any(palabra in entidad 
-                       for palabra in ['seguro', 'seguros', 'aseguradora', 'aseguradoras',
-                                      'insurance', 'vida security', 'metlife', 'consorcio seguros',
-                                      'bice vida', 'euroamerica', 'ohio national', 'principal seguros',
-                                      'zurich santander', 'confuturo', 'chilena consolidada',
-                                      'sura', 'mapfre', 'liberty', 'rsa', 'hdi', 'bci seguros',
-                                      'santander seguros', 'compañía de seguros', 'compania de seguros',
-                                      'cia de seguros', 'cia. de seguros', 'cía de seguros',
-                                      'cía. de seguros', 'rigel', 'reale chile'])
-        
-        # También excluir si la materia menciona seguros específicamente
-        es_materia_seguros = any(palabra in materia 
-                                for palabra in ['poliza', 'póliza', 'siniestro', 'prima', 'reaseguro',
-                                              'cobertura de seguro', 'contrato de seguro'])
+        marcas = CLASIFICADOR_HECHOS.analizar(
+            hecho.get('titulo', ''), hecho.get('materia', ''),
+            hecho.get('entidad', ''), hecho.get('resumen', '')
+        ).marcas
         
-        # Excluir cambios en la administración
-        es_cambio_administracion = any(palabra in titulo or palabra in materia
-                                      for palabra in ['cambio en la administración', 'cambio en la administracion',
-                                                     'cambios en la administración', 'cambios en la administracion',
-                                                     'cambio de directorio', 'nuevo directorio',
-                                                     'renuncia director', 'renuncia gerente',
-                                                     'nombramiento director', 'nombramiento gerente',
-                                                     'designación director', 'designacion director',
-                                                     'elección de directorio', 'eleccion de directorio',
-                                                     'renovación del directorio', 'renovacion del directorio',
-                                                     'cambio de gerente general', 'nuevo gerente general',
-                                                     'cambio en el directorio', 'cambios en el directorio'])
+        es_fondo = "FONDO" in marcas
+        es_colocacion = "COLOCACION" in marcas
+        es_seguro = "SEGURO" in marcas
+        es_materia_seguros = "MATERIA_SEGUROS" in marcas
+        es_cambio_administracion = "CAMBIO_ADMINISTRACION" in marcas
         
         if not es_fondo and not es_colocacion and not es_seguro and not es_materia_seguros and not es_cambio_administracion:
             hechos_filtrados.append(hecho)
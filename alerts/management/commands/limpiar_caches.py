@@ -0,0 +1,42 @@
+"""
+Aplica los presupuestos en bytes a todos los cachés en disco y muestra estadísticas.
+
+Pensado para Heroku Scheduler (el disco del dyno es efímero y limitado):
+    python manage.py limpiar_caches
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from alerts.models import TextoPDFExtraido
+from alerts.services.cache_eviction import enforce_directory_budget, eviction_stats, get_policy
+from alerts.services.cache_service import cache_service
+from alerts.services.http_cache import http_cache
+from alerts.services.pdf_cache import pdf_cache
+
+
+class Command(BaseCommand):
+    help = 'Desaloja entradas de los cachés en disco que exceden su presupuesto en bytes'
+
+    def handle(self, *args, **options):
+        pdf_cache.clear_old()
+        pdf_cache.enforce_budget()
+        cache_service.enforce_disk_budget()
+        http_cache.enforce_budget()
+        TextoPDFExtraido.aplicar_presupuesto()
+
+        # Solo los respaldos rotados de logs; los archivos activos no se tocan
+        logs_dir = settings.BASE_DIR / 'logs'
+        if logs_dir.exists():
+            enforce_directory_budget(logs_dir, get_policy('logs'), '*.log.*')
+
+        stats_pdf = pdf_cache.get_stats()
+        self.stdout.write(f"Caché de PDFs: {stats_pdf['total_files']} archivos, "
+                          f"{stats_pdf['total_size_mb']:.1f} / {stats_pdf['max_size_mb']:.0f} MB")
+
+        for stats in eviction_stats():
+            self.stdout.write(
+                f"  [{stats['namespace']}] presupuesto {stats['max_mb']:.0f} MB ({stats['order'].upper()}), "
+                f"{stats['evictions']} desalojos, {stats['bytes_reclaimed'] / (1024 * 1024):.1f} MB liberados"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Limpieza de cachés completada'))
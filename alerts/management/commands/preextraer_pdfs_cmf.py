@@ -0,0 +1,130 @@
+"""
+Pre-extrae el texto de los PDFs de hechos esenciales CMF durante la tarde/noche.
+
+El OCR de hechos escaneados es lo más lento del informe de las 8:30. Los hechos
+del día N-1 ya se conocen la tarde anterior, así que este comando revisa la
+portada de hechos CMF cada cierto intervalo, descarga los PDFs nuevos y guarda
+su texto en TextoPDFExtraido. El informe de la mañana solo consulta esa tabla.
+
+Uso:
+    python manage.py preextraer_pdfs_cmf                 # vigila hasta las 23:00
+    python manage.py preextraer_pdfs_cmf --una-vez       # una pasada (Heroku Scheduler)
+    python manage.py preextraer_pdfs_cmf --fecha 14/03/2025 --una-vez
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from alerts.models import TextoPDFExtraido
+from alerts.services.pdf_cache import pdf_cache
+
+# Agregar el directorio raíz al path para poder importar los scripts
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.scrapers.cmf_pdf_downloader import cmf_pdf_downloader
+from scripts.scrapers.cmf_pdf_extractor_garantizado import cmf_pdf_extractor_garantizado
+from scripts.scrapers.scraper_cmf_mejorado import ScraperCMFMejorado
+
+
+class Command(BaseCommand):
+    help = 'Descarga y pre-extrae el texto de los PDFs de hechos CMF del día para el informe de la mañana'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fecha',
+            type=str,
+            help='Fecha de los hechos en formato DD/MM/YYYY (por defecto hoy)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=20,
+            help='Minutos entre revisiones de la portada CMF'
+        )
+        parser.add_argument(
+            '--hasta',
+            type=int,
+            default=23,
+            help='Hora local en que el vigilante se detiene'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='PDFs procesados en paralelo'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Hacer una sola pasada y terminar'
+        )
+
+    def handle(self, *args, **options):
+        fecha = options['fecha'] or datetime.now().strftime("%d/%m/%Y")
+        fecha_documento = datetime.strptime(fecha, "%d/%m/%Y").date()
+        scraper = ScraperCMFMejorado()
+
+        self.stdout.write(self.style.SUCCESS(f'Pre-extracción de PDFs CMF para {fecha}'))
+
+        while True:
+            self.procesar_pasada(scraper, fecha, fecha_documento, options['workers'])
+
+            if options['una_vez'] or datetime.now().hour >= options['hasta']:
+                break
+
+            self.stdout.write(f"Próxima revisión en {options['intervalo']} minutos...")
+            time.sleep(options['intervalo'] * 60)
+
+        self.stdout.write(self.style.SUCCESS('Pre-extracción finalizada'))
+
+    def procesar_pasada(self, scraper, fecha, fecha_documento, workers):
+        """Procesa los hechos publicados hasta ahora que aún no tienen texto extraído"""
+        hechos = scraper.obtener_hechos_dia(fecha)
+        urls = {h['url_pdf'] for h in hechos if h.get('url_pdf')}
+        pendientes = urls - TextoPDFExtraido.urls_extraidas(urls)
+
+        self.stdout.write(f"[{datetime.now():%H:%M}] {len(hechos)} hechos, {len(pendientes)} PDFs nuevos")
+        if not pendientes:
+            return
+
+        extraidos = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.extraer_pdf, url): url for url in pendientes}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    texto, metodo = future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'  ✗ Error con {url[:60]}: {str(e)[:100]}'))
+                    continue
+
+                # Si la extracción falló se deja pendiente para la próxima pasada
+                if not texto or metodo in ('no_content', 'extraction_failed'):
+                    self.stdout.write(self.style.WARNING(f'  ⚠ Sin texto útil ({metodo}): {url[:60]}'))
+                    continue
+
+                TextoPDFExtraido.guardar(url, texto, metodo=metodo, fuente='CMF',
+                                         fecha_documento=fecha_documento)
+                extraidos += 1
+                self.stdout.write(self.style.SUCCESS(f'  ✓ {metodo}: {len(texto)} caracteres'))
+
+        # El presupuesto de la tabla se aplica una vez por pasada, no por PDF
+        if extraidos:
+            TextoPDFExtraido.aplicar_presupuesto()
+        self.stdout.write(f'  PDFs extraídos en esta pasada: {extraidos}')
+
+    def extraer_pdf(self, url):
+        """Descarga (con caché) y extrae el texto de un PDF CMF"""
+        pdf_content = pdf_cache.get(url)
+        if not pdf_content:
+            pdf_content, _ = cmf_pdf_downloader.download_pdf(url, max_retries=3)
+            if not pdf_content:
+                return '', 'no_content'
+            pdf_cache.put(url, pdf_content)
+
+        return cmf_pdf_extractor_garantizado.extract_text_guaranteed(pdf_content)
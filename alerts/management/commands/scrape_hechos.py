@@ -25,6 +25,7 @@ from io import BytesIO
 import openai
 from dotenv import load_dotenv
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Importar servicios robustos existentes
 from alerts.services.cache_service import cache_service
@@ -34,9 +35,18 @@ from alerts.utils.retry_utils import retry
 
 load_dotenv()
 
+# Se calcula una vez: antes se reconstruía la lista por cada hecho
+EMPRESAS_IPSA_UPPER = frozenset(e.upper() for e in EMPRESAS_IPSA)
+
 class Command(BaseCommand):
     help = 'Scrapea los hechos esenciales del sitio web de la CMF con criterios profesionales'
 
+    # generar_resumen_ia solo usa texto[:4000]
+    PRESUPUESTO_TEXTO_PDF = 4000
+    
+    # Filas por sentencia en el modo --bulk
+    TAMANO_LOTE = 500
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--dias',
@@ -49,6 +59,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Modo debug con más información'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Ingesta por lotes (recomendado para backfills de varios días)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='PDFs/resúmenes procesados en paralelo en el modo --bulk'
+        )
 
     def __init__(self):
         super().__init__()
@@ -61,6 +82,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.debug_mode = options.get('debug', False)
         dias = options['dias']
+        self.workers = options.get('workers', 4)
         
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS(f'INICIANDO SCRAPING DE HECHOS ESENCIALES CMF'))
@@ -75,7 +97,10 @@ class Command(BaseCommand):
             
             if hechos:
                 self.stdout.write(self.style.SUCCESS(f'\nEncontrados {len(hechos)} hechos esenciales'))
-                self.procesar_hechos(hechos)
+                if options.get('bulk'):
+                    self.procesar_hechos_bulk(hechos)
+                else:
+                    self.procesar_hechos(hechos)
             else:
                 self.stdout.write(self.style.WARNING('No se encontraron hechos esenciales nuevos'))
                 
@@ -214,7 +239,7 @@ class Command(BaseCommand):
                     empresa, created = Empresa.objects.get_or_create(
                         nombre=hecho['empresa'],
                         defaults={
-                            'es_ipsa': hecho['empresa'].upper() in [e.upper() for e in EMPRESAS_IPSA]
+                            'es_ipsa': hecho['empresa'].upper() in EMPRESAS_IPSA_UPPER
                         }
                     )
                     
@@ -263,14 +288,153 @@ class Command(BaseCommand):
         self.stdout.write(f'  - Actualizados: {actualizados}')
         self.stdout.write(f'  - Errores: {errores}')
 
+    def procesar_hechos_bulk(self, hechos):
+        """
+        Ingesta por lotes: una consulta para las empresas existentes, bulk_create
+        para las nuevas, inserción de hechos por URL (los existentes no se tocan)
+        y un bulk_update final con resúmenes y relevancia. PDFs y resúmenes IA se
+        procesan en paralelo. Un hecho con error se informa y se omite, y si una
+        sentencia por lote falla se reintenta fila a fila.
+        """
+        errores = 0
+        
+        # Un mismo hecho puede aparecer dos veces en un backfill; gana el último
+        por_url = {}
+        for hecho in hechos:
+            if not hecho.get('url'):
+                continue
+            if not hecho.get('empresa'):
+                errores += 1
+                self.registrar_error(hecho['url'], ValueError('hecho sin empresa'))
+                continue
+            por_url[hecho['url']] = hecho
+        
+        # Empresas: prefetch por nombre y creación de las faltantes
+        nombres = {hecho['empresa'] for hecho in por_url.values()}
+        empresas = Empresa.objects.in_bulk(nombres, field_name='nombre')
+        faltantes = [
+            Empresa(nombre=nombre, es_ipsa=nombre.upper() in EMPRESAS_IPSA_UPPER)
+            for nombre in nombres if nombre not in empresas
+        ]
+        if faltantes:
+            Empresa.objects.bulk_create(faltantes, batch_size=self.TAMANO_LOTE, ignore_conflicts=True)
+            empresas = Empresa.objects.in_bulk(nombres, field_name='nombre')
+            self.stdout.write(f'  Empresas nuevas creadas: {len(faltantes)}')
+        
+        # Hechos: solo se insertan los nuevos, como get_or_create en el modo por hecho
+        existentes = {
+            url: (resumen, categoria)
+            for url, resumen, categoria in HechoEsencial.objects.filter(url__in=por_url)
+                                                        .values_list('url', 'resumen', 'categoria')
+        }
+        a_insertar = []
+        for url, hecho in por_url.items():
+            if url in existentes:
+                continue
+            try:
+                empresa = empresas[hecho['empresa']]
+                a_insertar.append(HechoEsencial(
+                    url=url,
+                    empresa=empresa,
+                    titulo=hecho['titulo'],
+                    fecha_publicacion=hecho['fecha'],
+                    es_empresa_ipsa=empresa.es_ipsa,
+                ))
+            except Exception as e:
+                errores += 1
+                self.registrar_error(url, e)
+        errores += self.guardar_por_lotes(
+            a_insertar,
+            lambda lote: HechoEsencial.objects.bulk_create(lote, batch_size=self.TAMANO_LOTE,
+                                                          ignore_conflicts=True),
+        )
+        
+        # Igual que en el modo por hecho: nuevos, sin resumen o sin categoría definitiva
+        urls_pendientes = [
+            url for url in por_url
+            if url not in existentes
+            or not existentes[url][0] or not existentes[url][1] or existentes[url][1] == 'MODERADO'
+        ]
+        pendientes = list(HechoEsencial.objects.filter(url__in=urls_pendientes).select_related('empresa'))
+        nuevos = len(pendientes) - sum(1 for url in urls_pendientes if url in existentes)
+        self.stdout.write(f'  Hechos nuevos: {nuevos}, existentes: {len(existentes)}, '
+                          f'por procesar: {len(pendientes)}')
+        
+        # obtener_resumen_pdf ya aísla sus errores y retorna None
+        sin_resumen = [hecho for hecho in pendientes if not hecho.resumen]
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            for hecho, resumen in zip(sin_resumen, executor.map(self.obtener_resumen_pdf, sin_resumen)):
+                if resumen:
+                    hecho.resumen = resumen
+        
+        procesados = []
+        for hecho in pendientes:
+            try:
+                self.aplicar_relevancia(hecho)
+                procesados.append(hecho)
+            except Exception as e:
+                errores += 1
+                self.registrar_error(hecho.url, e)
+        
+        campos = ['resumen', 'relevancia_profesional', 'categoria', 'es_empresa_ipsa', 'relevancia']
+        errores += self.guardar_por_lotes(
+            procesados,
+            lambda lote: HechoEsencial.objects.bulk_update(lote, campos, batch_size=self.TAMANO_LOTE),
+        )
+        
+        self.stdout.write(self.style.SUCCESS('\nResumen:'))
+        self.stdout.write(f'  - Nuevos: {nuevos}')
+        self.stdout.write(f'  - Actualizados: {len(pendientes) - nuevos}')
+        self.stdout.write(f'  - Errores: {errores}')
+
+    def guardar_por_lotes(self, objetos, guardar):
+        """
+        Ejecuta guardar(objetos) en una sentencia por lote; si falla, reintenta
+        fila a fila para que un hecho inválido no bloquee al resto. Retorna
+        el número de filas que no se pudieron guardar.
+        """
+        if not objetos:
+            return 0
+        try:
+            with transaction.atomic():
+                guardar(objetos)
+            return 0
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'  Lote falló ({str(e)[:100]}), guardando fila a fila'))
+        
+        errores = 0
+        for objeto in objetos:
+            try:
+                with transaction.atomic():
+                    guardar([objeto])
+            except Exception as e:
+                errores += 1
+                self.registrar_error(objeto.url, e)
+        return errores
+
+    def registrar_error(self, url, error):
+        self.stdout.write(self.style.ERROR(f'Error procesando hecho {url}: {str(error)}'))
+        if self.debug_mode:
+            import traceback
+            traceback.print_exception(error)
+
     def procesar_pdf_hecho(self, hecho):
         """Descarga y procesa el PDF del hecho esencial"""
+        resumen = self.obtener_resumen_pdf(hecho)
+        if resumen:
+            hecho.resumen = resumen
+            hecho.save()
+    
+    def obtener_resumen_pdf(self, hecho):
+        """Descarga el PDF del hecho y retorna su resumen (None si no se pudo), sin guardar"""
         try:
             # Descargar PDF con caché
             pdf_content = self.descargar_pdf_con_cache(hecho.url)
             
             # Extraer texto del PDF usando el servicio robusto
-            texto_completo, metodo = self.pdf_extractor.extract_text(pdf_content, max_pages=5)
+            texto_completo, metodo = self.pdf_extractor.extract_text(
+                pdf_content, max_pages=5, max_chars=self.PRESUPUESTO_TEXTO_PDF
+            )
             
             if self.debug_mode:
                 self.stdout.write(f'  PDF extraído con método: {metodo} ({len(texto_completo)} caracteres)')
@@ -279,16 +443,14 @@ class Command(BaseCommand):
             if self.openai_api_key and len(texto_completo) > 100:
                 resumen = self.generar_resumen_ia(hecho.titulo, texto_completo, hecho.empresa.es_ipsa)
                 if resumen:
-                    hecho.resumen = resumen
-                    hecho.save()
                     self.stdout.write(self.style.SUCCESS(f'  ✓ Resumen generado'))
-                else:
-                    # Fallback: usar primeras líneas del texto
-                    hecho.resumen = texto_completo[:500] + "..."
-                    hecho.save()
+                    return resumen
+                # Fallback: usar primeras líneas del texto
+                return texto_completo[:500] + "..."
                     
         except Exception as e:
             self.stdout.write(self.style.WARNING(f'  ✗ Error procesando PDF: {str(e)}'))
+        return None
 
     def generar_resumen_ia(self, titulo, texto, es_ipsa=False):
         """Genera un resumen usando OpenAI con prompts especializados"""
@@ -340,30 +502,34 @@ Usa lenguaje financiero profesional pero claro."""
             # Fallback a Gemini eliminado - no se usa google-generativeai
             return None
 
+    def aplicar_relevancia(self, hecho):
+        """Asigna relevancia profesional, categoría y relevancia 1-3 al hecho, sin guardar"""
+        # Usar la función de criterios profesionales
+        relevancia, categoria, es_ipsa = calcular_relevancia_profesional(
+            titulo=hecho.titulo,
+            materia=hecho.resumen or hecho.titulo,
+            entidad=hecho.empresa.nombre,
+            contexto_adicional=hecho.resumen or ""
+        )
+        
+        # Actualizar el hecho
+        hecho.relevancia_profesional = relevancia
+        hecho.categoria = categoria
+        hecho.es_empresa_ipsa = es_ipsa
+        
+        # Mapear a relevancia tradicional (1-3)
+        if relevancia >= 8:
+            hecho.relevancia = 3  # Alta
+        elif relevancia >= 5:
+            hecho.relevancia = 2  # Media
+        else:
+            hecho.relevancia = 1  # Baja
+        return relevancia, categoria
+
     def calcular_relevancia_hecho(self, hecho):
         """Calcula y actualiza la relevancia profesional del hecho"""
         try:
-            # Usar la función de criterios profesionales
-            relevancia, categoria, es_ipsa = calcular_relevancia_profesional(
-                titulo=hecho.titulo,
-                materia=hecho.resumen or hecho.titulo,
-                entidad=hecho.empresa.nombre,
-                contexto=hecho.resumen or ""
-            )
-            
-            # Actualizar el hecho
-            hecho.relevancia_profesional = relevancia
-            hecho.categoria = categoria
-            hecho.es_empresa_ipsa = es_ipsa
-            
-            # Mapear a relevancia tradicional (1-3)
-            if relevancia >= 8:
-                hecho.relevancia = 3  # Alta
-            elif relevancia >= 5:
-                hecho.relevancia = 2  # Media
-            else:
-                hecho.relevancia = 1  # Baja
-                
+            relevancia, categoria = self.aplicar_relevancia(hecho)
             hecho.save()
             
             # Emoji según categoría
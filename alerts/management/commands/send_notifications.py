@@ -1,75 +1,124 @@
-import time
+from collections import defaultdict
+
 from django.core.management.base import BaseCommand
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Exists, F, OuterRef
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.urls import reverse
-from alerts.models import HechoEsencial, PerfilUsuario, NotificacionEnviada, User
+from alerts.models import HechoEsencial, PerfilUsuario, NotificacionEnviada
 
 class Command(BaseCommand):
     """
     Comando de gestión para enviar notificaciones por correo sobre hechos esenciales no notificados.
+
+    Calcula en una sola consulta todos los pares (usuario, hecho) pendientes,
+    envía un único correo resumen por usuario reutilizando la conexión SMTP y
+    registra las notificaciones con bulk_create.
     """
     help = 'Envía notificaciones por correo electrónico para nuevos Hechos Esenciales.'
 
+    # Filas por sentencia al registrar notificaciones
+    TAMANO_LOTE = 1000
+
     def handle(self, *args, **options):
-        hechos_a_notificar = HechoEsencial.objects.filter(
-            notificacion_enviada=False,
-            resumen__isnull=False,
-            relevancia__isnull=False
-        ).select_related('empresa')
+        hechos = {
+            hecho.pk: hecho
+            for hecho in HechoEsencial.objects.filter(
+                notificacion_enviada=False,
+                resumen__isnull=False,
+                relevancia__isnull=False
+            ).select_related('empresa')
+        }
 
-        if not hechos_a_notificar.exists():
+        if not hechos:
             self.stdout.write(self.style.SUCCESS('No hay nuevos hechos esenciales analizados para notificar.'))
             return
 
-        notificaciones_enviadas = 0
-        usuarios_notificados = set()
-
-        for hecho in hechos_a_notificar:
-            empresa = hecho.empresa
-            
-            perfiles_suscritos = PerfilUsuario.objects.filter(suscripciones=empresa).select_related('user')
-
-            if not perfiles_suscritos.exists():
-                hecho.notificacion_enviada = True
-                hecho.save()
-                continue
-
-            for perfil in perfiles_suscritos:
-                usuario = perfil.user
-                
-                if NotificacionEnviada.objects.filter(usuario=usuario, hecho_esencial=hecho).exists():
-                    continue
-
-                if usuario.email:
-                    usuarios_notificados.add(usuario)
-                    contexto_email = {
-                        'nombre_usuario': usuario.username,
-                        'hecho_esencial': hecho,
-                        'url_absoluta': settings.SITE_URL + reverse('alerts:dashboard') 
-                    }
-                    cuerpo_html = render_to_string('alerts/email/notificacion_hecho_esencial.html', contexto_email)
-                    
+        pendientes = self.pares_pendientes(hechos.keys())
+
+        enviados = []
+        if pendientes:
+            url_absoluta = settings.SITE_URL + reverse('alerts:dashboard')
+            connection = get_connection()
+            connection.open()
+            try:
+                for (usuario_id, username, email), hecho_ids in pendientes.items():
+                    hechos_usuario = [hechos[hecho_id] for hecho_id in hecho_ids]
+                    mensaje = self.construir_resumen(username, email, hechos_usuario, url_absoluta, connection)
                     try:
-                        send_mail(
-                            subject=f'Alerta de Hecho Esencial: {hecho.empresa.nombre}',
-                            message='', 
-                            from_email=settings.DEFAULT_FROM_EMAIL,
-                            recipient_list=[usuario.email],
-                            html_message=cuerpo_html,
-                            fail_silently=False,
-                        )
-                        notificaciones_enviadas += 1
-                        NotificacionEnviada.objects.create(usuario=usuario, hecho_esencial=hecho)
+                        mensaje.send(fail_silently=False)
                     except Exception as e:
-                         self.stdout.write(self.style.ERROR(f"Error al enviar email a {usuario.username}: {e}"))
+                        self.stdout.write(self.style.ERROR(f"Error al enviar email a {username}: {e}"))
+                        continue
+                    enviados.extend(
+                        NotificacionEnviada(usuario_id=usuario_id, hecho_esencial_id=hecho_id)
+                        for hecho_id in hecho_ids
+                    )
+            finally:
+                connection.close()
+
+            NotificacionEnviada.objects.bulk_create(enviados, batch_size=self.TAMANO_LOTE, ignore_conflicts=True)
 
+        # Como antes, el hecho queda notificado aunque falle el envío a algún usuario
+        HechoEsencial.objects.filter(pk__in=hechos.keys()).update(notificacion_enviada=True)
 
-            hecho.notificacion_enviada = True
-            hecho.save()
+        if enviados:
+            usuarios = len({notificacion.usuario_id for notificacion in enviados})
+            self.stdout.write(self.style.SUCCESS(f'Se enviaron {len(enviados)} notificaciones a {usuarios} usuarios.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No se requirió enviar nuevas notificaciones.'))
+
+    def pares_pendientes(self, hecho_ids):
+        """
+        Pares (usuario, hecho) aún no notificados, en una consulta sobre la tabla
+        de suscripciones. Retorna {(usuario_id, username, email): [hecho_id, ...]}.
+        """
+        ya_notificado = NotificacionEnviada.objects.filter(
+            usuario_id=OuterRef('usuario_id'),
+            hecho_esencial_id=OuterRef('hecho_id'),
+        )
+        pares = (
+            PerfilUsuario.suscripciones.through.objects
+            .filter(empresa__hechos_esenciales__in=hecho_ids)
+            .exclude(perfilusuario__user__email='')
+            .annotate(
+                hecho_id=F('empresa__hechos_esenciales'),
+                usuario_id=F('perfilusuario__user_id'),
+                username=F('perfilusuario__user__username'),
+                email=F('perfilusuario__user__email'),
+            )
+            .filter(~Exists(ya_notificado))
+            .values_list('usuario_id', 'username', 'email', 'hecho_id')
+            .order_by('usuario_id', 'hecho_id')
+        )
+
+        pendientes = defaultdict(list)
+        for usuario_id, username, email, hecho_id in pares:
+            pendientes[(usuario_id, username, email)].append(hecho_id)
+        return pendientes
 
-        if notificaciones_enviadas > 0:
-            self.stdout.write(self.style.SUCCESS(f'Se enviaron {notificaciones_enviadas} notificaciones a {len(usuarios_notificados)} usuarios.'))
+    def construir_resumen(self, username, email, hechos, url_absoluta, connection):
+        """Un correo con todos los hechos pendientes del usuario"""
+        contexto_email = {
+            'nombre_usuario': username,
+            'hechos': hechos,
+            'documentos_analizados': len(hechos),
+            'url_absoluta': url_absoluta,
+        }
+        cuerpo_html = render_to_string('alerts/email/notificacion_hecho_esencial.html', contexto_email)
+
+        if len(hechos) == 1:
+            asunto = f'Alerta de Hecho Esencial: {hechos[0].empresa.nombre}'
         else:
-            self.stdout.write(self.style.SUCCESS('No se requirió enviar nuevas notificaciones.')) 
\ No newline at end of file
+            asunto = f'{len(hechos)} nuevos Hechos Esenciales de tus empresas'
+
+        mensaje = EmailMultiAlternatives(
+            subject=asunto,
+            body='',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=connection,
+        )
+        mensaje.attach_alternative(cuerpo_html, 'text/html')
+        return mensaje
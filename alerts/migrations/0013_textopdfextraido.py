@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 23:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0012_alter_subscription_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextoPDFExtraido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(help_text='MD5 de la URL del PDF', max_length=32, unique=True)),
+                ('url', models.TextField()),
+                ('fuente', models.CharField(choices=[('CMF', 'Hecho esencial CMF'), ('DO', 'Diario Oficial')], default='CMF', max_length=10)),
+                ('fecha_documento', models.DateField(blank=True, null=True)),
+                ('texto', models.TextField()),
+                ('metodo', models.CharField(blank=True, help_text='Método de extracción usado', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_textopdfextraido',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fuente', 'fecha_documento'], name='alerts_text_fuente_9f7d78_idx')],
+            },
+        ),
+    ]
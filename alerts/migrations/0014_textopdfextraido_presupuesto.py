@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0013_textopdfextraido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textopdfextraido',
+            name='accesos',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='textopdfextraido',
+            name='tamano_bytes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='textopdfextraido',
+            name='ultimo_acceso',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='textopdfextraido',
+            index=models.Index(fields=['ultimo_acceso'], name='alerts_text_ultimo__0e5304_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:02
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def importar_json_hechos(apps, schema_editor):
+    """Importa una vez el histórico de data/hechos_cmf_selenium_reales.json"""
+    json_path = Path(settings.BASE_DIR) / 'data' / 'hechos_cmf_selenium_reales.json'
+    if not json_path.exists():
+        return
+
+    HechoCMFPublicado = apps.get_model('alerts', 'HechoCMFPublicado')
+    with open(json_path, 'r', encoding='utf-8') as f:
+        hechos = json.load(f).get('hechos', [])
+
+    registros = []
+    for hecho in hechos:
+        try:
+            fecha = datetime.strptime(hecho['fecha'], '%d-%m-%Y').date()
+        except (KeyError, ValueError):
+            continue
+        link = hecho.get('link_actualizado')
+        registros.append(HechoCMFPublicado(
+            fecha=fecha,
+            entidad=hecho.get('entidad', '')[:300],
+            materia=hecho.get('materia', '')[:500],
+            titulo=hecho.get('titulo', '')[:500],
+            resumen=hecho.get('resumen', ''),
+            url_pdf=hecho.get('url_pdf', ''),
+            tiene_pdf=bool(hecho.get('tiene_pdf')),
+            relevancia=hecho.get('relevancia', 5.0),
+            categoria=hecho.get('categoria', 'MODERADO'),
+            es_ipsa=bool(hecho.get('es_ipsa')),
+            link_actualizado=timezone.make_aware(datetime.fromisoformat(link)) if link else None,
+        ))
+    HechoCMFPublicado.objects.bulk_create(registros, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0014_textopdfextraido_presupuesto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HechoCMFPublicado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_index=True)),
+                ('entidad', models.CharField(max_length=300)),
+                ('numero', models.CharField(blank=True, default='', help_text='Número de documento CMF (vacío en registros importados del JSON)', max_length=50)),
+                ('materia', models.CharField(blank=True, max_length=500)),
+                ('titulo', models.CharField(blank=True, max_length=500)),
+                ('resumen', models.TextField(blank=True)),
+                ('url_pdf', models.TextField(blank=True)),
+                ('tiene_pdf', models.BooleanField(default=False)),
+                ('relevancia', models.FloatField(default=5.0)),
+                ('categoria', models.CharField(default='MODERADO', max_length=20)),
+                ('es_ipsa', models.BooleanField(default=False)),
+                ('link_actualizado', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'alerts_hechocmfpublicado',
+                'ordering': ['fecha', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hechocmfpublicado',
+            constraint=models.UniqueConstraint(fields=('fecha', 'entidad', 'numero'), name='hecho_cmf_fecha_entidad_numero'),
+        ),
+        migrations.RunPython(importar_json_hechos, migrations.RunPython.noop),
+    ]
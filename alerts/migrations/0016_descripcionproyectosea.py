@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0015_hechocmfpublicado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DescripcionProyectoSEA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_expediente', models.CharField(max_length=30, unique=True)),
+                ('url', models.TextField(blank=True)),
+                ('resumen', models.TextField()),
+                ('objetivo', models.TextField(blank=True)),
+                ('titular', models.CharField(blank=True, max_length=300)),
+                ('ubicacion', models.TextField(blank=True)),
+                ('inversion', models.CharField(blank=True, max_length=100)),
+                ('metodo', models.CharField(blank=True, help_text='Método de extracción usado', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_descripcionproyectosea',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
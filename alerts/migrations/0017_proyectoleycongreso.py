@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0016_descripcionproyectosea'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProyectoLeyCongreso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('boletin', models.CharField(max_length=20, unique=True)),
+                ('titulo', models.TextField(blank=True)),
+                ('url_detalle', models.TextField(blank=True)),
+                ('fecha_ingreso', models.DateField(blank=True, db_index=True, null=True)),
+                ('url_documento', models.TextField(blank=True)),
+                ('contenido_documento', models.TextField(blank=True)),
+                ('resumen', models.TextField(blank=True)),
+                ('urgencia', models.BooleanField(default=False)),
+                ('comision', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'alerts_proyectoleycongreso',
+                'ordering': ['-fecha_ingreso', 'boletin'],
+            },
+        ),
+    ]
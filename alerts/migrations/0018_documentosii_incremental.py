@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+def completar_anio(apps, schema_editor):
+    """Los documentos existentes toman el año de su fecha de publicación"""
+    DocumentoSII = apps.get_model('alerts', 'DocumentoSII')
+    for documento in DocumentoSII.objects.all():
+        documento.anio = documento.fecha_publicacion.year
+        documento.save(update_fields=['anio'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0017_proyectoleycongreso'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='documentosii',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='documentosii',
+            name='anio',
+            field=models.IntegerField(default=0, help_text='Año del índice del SII'),
+        ),
+        migrations.AddField(
+            model_name='documentosii',
+            name='fuente',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='documentosii',
+            name='fecha_publicacion',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.RunPython(completar_anio, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='documentosii',
+            unique_together={('tipo_documento', 'anio', 'numero')},
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0018_documentosii_incremental'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglamentoContraloria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.CharField(max_length=50)),
+                ('anio', models.CharField(blank=True, default='', max_length=10)),
+                ('ministerio', models.CharField(blank=True, default='', max_length=300)),
+                ('subsecretaria', models.CharField(blank=True, default='', max_length=300)),
+                ('materia', models.TextField(blank=True)),
+                ('fecha_ingreso', models.DateField(db_index=True)),
+                ('estado', models.CharField(blank=True, default='', max_length=200)),
+                ('url_descarga', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_reglamentocontraloria',
+                'ordering': ['-fecha_ingreso', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reglamentocontraloria',
+            constraint=models.UniqueConstraint(fields=('numero', 'anio', 'ministerio'), name='reglamento_cgr_numero_anio_ministerio'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0019_reglamentocontraloria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APICallMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('api_name', models.CharField(db_index=True, max_length=50)),
+                ('endpoint', models.CharField(blank=True, default='', max_length=200)),
+                ('exitoso', models.BooleanField(default=False)),
+                ('mensaje_error', models.TextField(blank=True, null=True)),
+                ('duracion_segundos', models.FloatField(blank=True, null=True)),
+                ('tokens_usados', models.PositiveIntegerField(blank=True, null=True)),
+                ('costo_estimado', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_apicallmetric',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapingMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_scraping', models.DateTimeField(db_index=True)),
+                ('exitoso', models.BooleanField(default=False)),
+                ('mensaje_error', models.TextField(blank=True, null=True)),
+                ('duracion_segundos', models.FloatField(blank=True, null=True)),
+                ('total_publicaciones', models.PositiveIntegerField(default=0)),
+                ('publicaciones_relevantes', models.PositiveIntegerField(default=0)),
+                ('pdfs_descargados', models.PositiveIntegerField(default=0)),
+                ('pdfs_desde_cache', models.PositiveIntegerField(default=0)),
+                ('tiempo_descarga_promedio', models.FloatField(blank=True, null=True)),
+                ('memoria_usada_mb', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_scrapingmetric',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PDFProcessingMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_pdf', models.TextField()),
+                ('titulo', models.CharField(blank=True, max_length=500)),
+                ('exitoso', models.BooleanField(default=False)),
+                ('mensaje_error', models.TextField(blank=True, null=True)),
+                ('metodo_extraccion', models.CharField(blank=True, default='', max_length=50)),
+                ('tiempo_extraccion', models.FloatField(blank=True, null=True)),
+                ('tiempo_analisis', models.FloatField(blank=True, null=True)),
+                ('tiempo_total', models.FloatField(blank=True, null=True)),
+                ('num_paginas', models.PositiveIntegerField(blank=True, null=True)),
+                ('tamano_bytes', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scraping_metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pdf_metrics', to='alerts.scrapingmetric')),
+            ],
+            options={
+                'db_table': 'alerts_pdfprocessingmetric',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
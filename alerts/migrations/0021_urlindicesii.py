@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0020_metricas_scraping'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='URLIndiceSII',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=30)),
+                ('anio', models.IntegerField()),
+                ('url', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'alerts_urlindicesii',
+                'unique_together': {('tipo', 'anio')},
+            },
+        ),
+    ]
@@ -247,6 +247,10 @@ class InformeEnviado(models.Model):
 class DocumentoSII(models.Model):
     """
     Representa un documento del Servicio de Impuestos Internos (circulares, resoluciones, jurisprudencia)
+    
+    La numeración del SII se reinicia cada año, por eso la clave es
+    (tipo_documento, anio, numero). El índice por fecha_publicacion resuelve
+    la consulta del informe diario.
     """
     TIPO_DOCUMENTO_CHOICES = [
         ('CIRCULAR', 'Circular'),
@@ -254,11 +258,23 @@ class DocumentoSII(models.Model):
         ('JURISPRUDENCIA', 'Jurisprudencia'),
     ]
     
+    # Nombre con que cada tipo aparece en el informe, en el orden del informe
+    TIPOS_INFORME = {
+        'CIRCULAR': 'Circular',
+        'RESOLUCION': 'Resolución Exenta',
+        'JURISPRUDENCIA': 'Jurisprudencia',
+    }
+    
+    MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+             'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+    
     tipo_documento = models.CharField(max_length=20, choices=TIPO_DOCUMENTO_CHOICES)
     numero = models.CharField(max_length=50)
+    anio = models.IntegerField(default=0, help_text="Año del índice del SII")
     titulo = models.CharField(max_length=500)
     url = models.URLField(max_length=500)
-    fecha_publicacion = models.DateField()
+    fecha_publicacion = models.DateField(db_index=True)
+    fuente = models.CharField(max_length=200, blank=True, default='')
     contenido = models.TextField(blank=True, null=True)
     resumen = models.TextField(blank=True, null=True, help_text="Resumen generado por IA")
     relevancia = models.IntegerField(default=2, help_text="Relevancia (1-3)")
@@ -267,10 +283,112 @@ class DocumentoSII(models.Model):
     
     class Meta:
         ordering = ['-fecha_publicacion']
-        unique_together = ('tipo_documento', 'numero')
+        unique_together = ('tipo_documento', 'anio', 'numero')
         
     def __str__(self):
         return f"{self.get_tipo_documento_display()} {self.numero} - {self.titulo}"
+    
+    def as_dict(self):
+        """Publicación con el formato que usa el informe diario"""
+        fecha = self.fecha_publicacion
+        return {
+            'tipo': self.TIPOS_INFORME[self.tipo_documento],
+            'numero': self.numero,
+            'titulo': self.titulo,
+            'fecha_publicacion': f"{fecha.day} de {self.MESES[fecha.month - 1]} de {fecha.year}",
+            'url': self.url,
+            'fuente': self.fuente,
+        }
+    
+    @classmethod
+    def publicaciones_del_dia(cls, fecha):
+        """Documentos relevantes publicados en una fecha (date), circulares primero y por número descendente"""
+        orden = list(cls.TIPOS_INFORME)
+        documentos = cls.objects.filter(fecha_publicacion=fecha, es_relevante=True)
+        documentos = sorted(documentos, key=lambda d: (
+            orden.index(d.tipo_documento), -int(d.numero) if d.numero.isdigit() else 0))
+        return [documento.as_dict() for documento in documentos]
+    
+    @classmethod
+    def sincronizar(cls, tipo_documento, anio, documentos, describir=None):
+        """
+        Inserta o actualiza los documentos de un índice anual del SII.
+        
+        Solo lee las filas de ese tipo y año. Las existentes actualizan URL,
+        fecha y fuente si cambiaron; `describir` se llama solo para las nuevas.
+        
+        Args:
+            tipo_documento: 'CIRCULAR', 'RESOLUCION' o 'JURISPRUDENCIA'
+            anio: Año del índice
+            documentos: Diccionarios con numero, fecha_publicacion (date),
+                        descripcion, url y fuente
+            describir: Función documento -> título para los documentos nuevos
+        
+        Returns:
+            (actualizados, agregados)
+        """
+        existentes = {d.numero: d for d in cls.objects.filter(tipo_documento=tipo_documento, anio=anio)}
+        
+        actualizar = []
+        nuevos = []
+        for dato in documentos:
+            documento = existentes.get(dato['numero'])
+            if documento is not None:
+                cambios = (documento.url, documento.fecha_publicacion, documento.fuente) != (
+                    dato['url'], dato['fecha_publicacion'], dato['fuente'])
+                if cambios and documento.pk:
+                    documento.url = dato['url']
+                    documento.fecha_publicacion = dato['fecha_publicacion']
+                    documento.fuente = dato['fuente']
+                    actualizar.append(documento)
+                continue
+            
+            documento = cls(
+                tipo_documento=tipo_documento,
+                numero=dato['numero'],
+                anio=anio,
+                titulo=(describir(dato) if describir else dato['descripcion'])[:500],
+                url=dato['url'],
+                fecha_publicacion=dato['fecha_publicacion'],
+                fuente=dato['fuente'],
+            )
+            existentes[dato['numero']] = documento
+            nuevos.append(documento)
+        
+        if actualizar:
+            cls.objects.bulk_update(actualizar, ['url', 'fecha_publicacion', 'fuente'])
+        if nuevos:
+            cls.objects.bulk_create(nuevos, ignore_conflicts=True)
+        return len(actualizar), len(nuevos)
+
+
+class URLIndiceSII(models.Model):
+    """
+    URL del índice anual del SII (circulares, resoluciones) que entregó
+    documentos la última vez. Las rutas cambian de un año a otro; recordarla
+    evita volver a probar en cada corrida las candidatas que responden 404.
+    """
+    tipo = models.CharField(max_length=30)
+    anio = models.IntegerField()
+    url = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.tipo} {self.anio}: {self.url}"
+    
+    class Meta:
+        db_table = 'alerts_urlindicesii'
+        unique_together = ('tipo', 'anio')
+    
+    @classmethod
+    def url_resuelta(cls, tipo, anio):
+        """URL recordada para (tipo, año) o None"""
+        return cls.objects.filter(tipo=tipo, anio=anio).values_list('url', flat=True).first()
+    
+    @classmethod
+    def recordar(cls, tipo, anio, url):
+        """Guarda la URL que entregó documentos para (tipo, año)"""
+        cls.objects.update_or_create(tipo=tipo, anio=anio, defaults={'url': url})
 
 
 class InformeDiarioCache(models.Model):
@@ -316,6 +434,374 @@ class InformeDiarioCache(models.Model):
         return informe
 
 
+class TextoPDFExtraido(models.Model):
+    """
+    Texto ya extraído de un PDF (CMF, Diario Oficial), compartido entre procesos.
+    Lo llena el comando preextraer_pdfs_cmf la tarde anterior para que el
+    informe de la mañana solo haga una búsqueda por URL.
+    """
+    FUENTE_CHOICES = [
+        ('CMF', 'Hecho esencial CMF'),
+        ('DO', 'Diario Oficial'),
+    ]
+    
+    url_hash = models.CharField(max_length=32, unique=True, help_text="MD5 de la URL del PDF")
+    url = models.TextField()
+    fuente = models.CharField(max_length=10, choices=FUENTE_CHOICES, default='CMF')
+    fecha_documento = models.DateField(null=True, blank=True)
+    texto = models.TextField()
+    metodo = models.CharField(max_length=50, blank=True, help_text="Método de extracción usado")
+    tamano_bytes = models.PositiveIntegerField(default=0)
+    ultimo_acceso = models.DateTimeField(null=True, blank=True)
+    accesos = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.fuente} {self.fecha_documento} - {self.url[:60]}"
+    
+    class Meta:
+        db_table = 'alerts_textopdfextraido'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fuente', 'fecha_documento']),
+            models.Index(fields=['ultimo_acceso']),
+        ]
+    
+    @staticmethod
+    def hash_url(url):
+        import hashlib
+        return hashlib.md5(url.encode()).hexdigest()
+    
+    @classmethod
+    def obtener_texto(cls, url):
+        """Retorna el texto extraído para la URL o None si no está precalculado"""
+        from alerts.services.cache_eviction import get_policy
+        
+        policy = get_policy('extraction_store')
+        url_hash = cls.hash_url(url)
+        texto = cls.objects.filter(url_hash=url_hash).values_list('texto', flat=True).first()
+        if texto is None:
+            policy.record_miss()
+            return None
+        
+        policy.record_hit()
+        cls.objects.filter(url_hash=url_hash).update(
+            ultimo_acceso=timezone.now(), accesos=models.F('accesos') + 1
+        )
+        return texto
+    
+    @classmethod
+    def urls_extraidas(cls, urls):
+        """Filtra, en una sola consulta, las URLs que ya tienen texto extraído"""
+        hashes = {cls.hash_url(url): url for url in urls}
+        existentes = cls.objects.filter(url_hash__in=hashes).values_list('url_hash', flat=True)
+        return {hashes[h] for h in existentes}
+    
+    @classmethod
+    def guardar(cls, url, texto, metodo='', fuente='CMF', fecha_documento=None):
+        """
+        Guarda o actualiza el texto extraído de una URL.
+        
+        No aplica el presupuesto: quien guarda un lote llama a
+        aplicar_presupuesto() una vez al terminarlo.
+        """
+        registro, created = cls.objects.update_or_create(
+            url_hash=cls.hash_url(url),
+            defaults={
+                'url': url,
+                'texto': texto,
+                'metodo': metodo,
+                'fuente': fuente,
+                'fecha_documento': fecha_documento,
+                'tamano_bytes': len(texto.encode('utf-8')),
+                'ultimo_acceso': timezone.now(),
+            }
+        )
+        return registro
+    
+    @classmethod
+    def aplicar_presupuesto(cls):
+        """Desaloja textos (LRU/LFU) si la tabla excede el presupuesto 'extraction_store'"""
+        from alerts.services.cache_eviction import get_policy
+        
+        policy = get_policy('extraction_store')
+        total = cls.objects.aggregate(total=models.Sum('tamano_bytes'))['total'] or 0
+        if total <= policy.max_bytes:
+            return 0
+        
+        orden = ['accesos', 'ultimo_acceso'] if policy.order == 'lfu' else ['ultimo_acceso', 'accesos']
+        candidatos = cls.objects.order_by(*orden).values_list('pk', 'tamano_bytes').iterator()
+        tamanos = {}
+        
+        def registrar(filas):
+            for pk, tamano in filas:
+                tamanos[pk] = tamano
+                yield pk, tamano
+        
+        victimas = policy.select_victims(total, registrar(candidatos))
+        cls.objects.filter(pk__in=victimas).delete()
+        liberados = sum(tamanos[pk] for pk in victimas)
+        policy.record_eviction(len(victimas), liberados)
+        return liberados
+
+
+class HechoCMFPublicado(models.Model):
+    """
+    Hecho esencial listado en la portada de la CMF (reemplaza a
+    data/hechos_cmf_selenium_reales.json). La clave (fecha, entidad, numero)
+    permite actualizar enlaces sin reescribir el histórico y el índice por
+    fecha resuelve la consulta del informe diario.
+    """
+    fecha = models.DateField(db_index=True)
+    entidad = models.CharField(max_length=300)
+    numero = models.CharField(max_length=50, blank=True, default='',
+                              help_text="Número de documento CMF (vacío en registros importados del JSON)")
+    materia = models.CharField(max_length=500, blank=True)
+    titulo = models.CharField(max_length=500, blank=True)
+    resumen = models.TextField(blank=True)
+    url_pdf = models.TextField(blank=True)
+    tiene_pdf = models.BooleanField(default=False)
+    relevancia = models.FloatField(default=5.0)
+    categoria = models.CharField(max_length=20, default='MODERADO')
+    es_ipsa = models.BooleanField(default=False)
+    link_actualizado = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.fecha} - {self.entidad} {self.numero}".strip()
+    
+    class Meta:
+        db_table = 'alerts_hechocmfpublicado'
+        ordering = ['fecha', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'entidad', 'numero'], name='hecho_cmf_fecha_entidad_numero'),
+        ]
+    
+    def as_dict(self):
+        """Registro con el formato del antiguo JSON (fecha DD-MM-YYYY)"""
+        return {
+            'fecha': self.fecha.strftime('%d-%m-%Y'),
+            'entidad': self.entidad,
+            'numero_documento': self.numero,
+            'materia': self.materia,
+            'titulo': self.titulo,
+            'resumen': self.resumen,
+            'url_pdf': self.url_pdf,
+            'tiene_pdf': self.tiene_pdf,
+            'relevancia': self.relevancia,
+            'categoria': self.categoria,
+            'es_ipsa': self.es_ipsa,
+            'link_actualizado': self.link_actualizado.isoformat() if self.link_actualizado else None,
+        }
+    
+    @classmethod
+    def hechos_del_dia(cls, fecha):
+        """Hechos de una fecha (date), como diccionarios del formato del JSON"""
+        return [hecho.as_dict() for hecho in cls.objects.filter(fecha=fecha)]
+    
+    @classmethod
+    def upsert_dia(cls, fecha, hechos, es_ipsa=None):
+        """
+        Inserta o actualiza los hechos de la portada para una fecha.
+        
+        Solo lee las filas de esa fecha: un registro existente se identifica por
+        (entidad, numero) o, si fue importado del JSON sin número, por entidad.
+        
+        Args:
+            fecha: date de los hechos
+            hechos: Diccionarios de ScraperCMFMejorado.obtener_hechos_dia
+            es_ipsa: Función entidad -> bool para los hechos nuevos
+        
+        Returns:
+            (actualizados, agregados)
+        """
+        existentes = {}
+        sin_numero = {}
+        for hecho in cls.objects.filter(fecha=fecha):
+            existentes[(hecho.entidad, hecho.numero)] = hecho
+            if not hecho.numero:
+                sin_numero[hecho.entidad] = hecho
+        
+        ahora = timezone.now()
+        actualizar = []
+        nuevos = []
+        for dato in hechos:
+            entidad = dato['entidad']
+            numero = dato.get('numero_documento', '')
+            hecho = existentes.get((entidad, numero)) or sin_numero.pop(entidad, None)
+            if hecho is not None:
+                hecho.numero = numero
+                hecho.url_pdf = dato['url_pdf']
+                hecho.tiene_pdf = True
+                hecho.link_actualizado = ahora
+                actualizar.append(hecho)
+                continue
+            
+            hecho = cls(
+                fecha=fecha,
+                entidad=entidad,
+                numero=numero,
+                materia=dato['materia'],
+                titulo=dato['materia'],
+                resumen=f"{entidad} - {dato['materia']} ({fecha.strftime('%d-%m-%Y')})",
+                url_pdf=dato['url_pdf'],
+                tiene_pdf=True,
+                es_ipsa=es_ipsa(entidad) if es_ipsa else False,
+                link_actualizado=ahora,
+            )
+            existentes[(entidad, numero)] = hecho
+            nuevos.append(hecho)
+        
+        if actualizar:
+            cls.objects.bulk_update(actualizar, ['numero', 'url_pdf', 'tiene_pdf', 'link_actualizado'])
+        if nuevos:
+            cls.objects.bulk_create(nuevos, ignore_conflicts=True)
+        return len(actualizar), len(nuevos)
+
+
+class DescripcionProyectoSEA(models.Model):
+    """
+    Descripción ya extraída de la ficha de un proyecto del SEA, por expediente.
+    Un proyecto aparece en la ventana de 7 días del informe varios días seguidos;
+    con esta tabla su ficha se descarga una sola vez.
+    """
+    CAMPOS = ('resumen', 'objetivo', 'titular', 'ubicacion', 'inversion')
+
+    id_expediente = models.CharField(max_length=30, unique=True)
+    url = models.TextField(blank=True)
+    resumen = models.TextField()
+    objetivo = models.TextField(blank=True)
+    titular = models.CharField(max_length=300, blank=True)
+    ubicacion = models.TextField(blank=True)
+    inversion = models.CharField(max_length=100, blank=True)
+    metodo = models.CharField(max_length=50, blank=True, help_text="Método de extracción usado")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"SEA {self.id_expediente}"
+
+    class Meta:
+        db_table = 'alerts_descripcionproyectosea'
+        ordering = ['-created_at']
+
+    def as_dict(self):
+        """Campos con el formato de SEAResumenExtractorRobusto.extraer_resumen_completo"""
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    @classmethod
+    def obtener_varios(cls, ids_expediente):
+        """{id_expediente: dict} de los expedientes ya extraídos, en una sola consulta"""
+        return {
+            descripcion.id_expediente: descripcion.as_dict()
+            for descripcion in cls.objects.filter(id_expediente__in=list(ids_expediente))
+        }
+
+    @classmethod
+    def guardar_varios(cls, detalles, metodo=''):
+        """
+        Guarda o actualiza descripciones; detalles es {id_expediente: dict} con
+        las claves de CAMPOS y opcionalmente 'url'. Se ignoran las que no traen resumen.
+        """
+        registros = []
+        for id_expediente, datos in detalles.items():
+            if not datos.get('resumen'):
+                continue
+            registros.append(cls(
+                id_expediente=str(id_expediente),
+                url=datos.get('url', ''),
+                resumen=datos['resumen'],
+                objetivo=datos.get('objetivo') or '',
+                titular=(datos.get('titular') or '')[:300],
+                ubicacion=datos.get('ubicacion') or '',
+                inversion=(datos.get('inversion') or '')[:100],
+                metodo=datos.get('metodo', metodo),
+            ))
+        if registros:
+            cls.objects.bulk_create(
+                registros,
+                update_conflicts=True,
+                unique_fields=['id_expediente'],
+                update_fields=['url', 'metodo', *cls.CAMPOS],
+            )
+        return len(registros)
+
+
+class ProyectoLeyCongreso(models.Model):
+    """
+    Proyecto de ley ya enriquecido (detalle, documento y resumen), por boletín.
+    La búsqueda del informe cubre los últimos 7 días; con esta tabla cada
+    boletín se descarga y resume una sola vez y el filtro por fecha de ingreso
+    se resuelve con los datos guardados.
+    """
+    boletin = models.CharField(max_length=20, unique=True)
+    titulo = models.TextField(blank=True)
+    url_detalle = models.TextField(blank=True)
+    fecha_ingreso = models.DateField(null=True, blank=True, db_index=True)
+    url_documento = models.TextField(blank=True)
+    contenido_documento = models.TextField(blank=True)
+    resumen = models.TextField(blank=True)
+    urgencia = models.BooleanField(default=False)
+    comision = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Boletín {self.boletin}"
+
+    class Meta:
+        db_table = 'alerts_proyectoleycongreso'
+        ordering = ['-fecha_ingreso', 'boletin']
+
+    def as_dict(self):
+        """Proyecto con el formato de ScraperProyectosLeyIntegrado.obtener_detalle_proyecto"""
+        proyecto = {
+            'boletin': self.boletin,
+            'titulo': self.titulo,
+            'url_detalle': self.url_detalle,
+            'fecha_ingreso': self.fecha_ingreso.strftime('%d/%m/%Y') if self.fecha_ingreso else '',
+        }
+        if self.url_documento:
+            proyecto['url_documento'] = self.url_documento
+        if self.contenido_documento:
+            proyecto['contenido_documento'] = self.contenido_documento
+        if self.resumen:
+            proyecto['resumen'] = self.resumen
+        if self.urgencia:
+            proyecto['urgencia'] = True
+        if self.comision:
+            proyecto['comision'] = self.comision
+        return proyecto
+
+    @classmethod
+    def registros(cls, boletines):
+        """{boletin: ProyectoLeyCongreso} de los boletines ya guardados, en una sola consulta"""
+        return {registro.boletin: registro for registro in cls.objects.filter(boletin__in=list(boletines))}
+
+    @classmethod
+    def guardar(cls, proyecto):
+        """Guarda o actualiza un proyecto enriquecido (fecha_ingreso en DD/MM/YYYY)"""
+        from datetime import datetime
+
+        try:
+            fecha_ingreso = datetime.strptime(proyecto.get('fecha_ingreso', ''), '%d/%m/%Y').date()
+        except ValueError:
+            fecha_ingreso = None
+
+        registro, created = cls.objects.update_or_create(
+            boletin=proyecto['boletin'],
+            defaults={
+                'titulo': proyecto.get('titulo', ''),
+                'url_detalle': proyecto.get('url_detalle', ''),
+                'fecha_ingreso': fecha_ingreso,
+                'url_documento': proyecto.get('url_documento', ''),
+                'contenido_documento': proyecto.get('contenido_documento', ''),
+                'resumen': proyecto.get('resumen', ''),
+                'urgencia': bool(proyecto.get('urgencia')),
+                'comision': proyecto.get('comision', '')[:100],
+            }
+        )
+        return registro
+
+
 # ==================== MODELOS DE SUSCRIPCIÓN Y PAGOS ====================
 
 class Plan(models.Model):
@@ -558,3 +1044,151 @@ class Organization(models.Model):
             self.members.add(user)
             return True
         return False
+
+
+class ReglamentoContraloria(models.Model):
+    """
+    Reglamento listado en la página de tramitación de reglamentos de la
+    Contraloría. La tabla trae cientos de filas, las más nuevas primero: los
+    reglamentos ya guardados marcan hasta dónde leer en la corrida siguiente y
+    el índice por fecha de ingreso resuelve la consulta del informe diario.
+    """
+    numero = models.CharField(max_length=50)
+    anio = models.CharField(max_length=10, blank=True, default='')
+    ministerio = models.CharField(max_length=300, blank=True, default='')
+    subsecretaria = models.CharField(max_length=300, blank=True, default='')
+    materia = models.TextField(blank=True)
+    fecha_ingreso = models.DateField(db_index=True)
+    estado = models.CharField(max_length=200, blank=True, default='')
+    url_descarga = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Reglamento {self.numero}/{self.anio} - {self.ministerio}"
+
+    class Meta:
+        db_table = 'alerts_reglamentocontraloria'
+        ordering = ['-fecha_ingreso', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['numero', 'anio', 'ministerio'], name='reglamento_cgr_numero_anio_ministerio'),
+        ]
+
+    def as_dict(self):
+        """Reglamento con el formato de ScraperContraloriaReglamentos (fecha DD/MM/YYYY)"""
+        return {
+            'numero': self.numero,
+            'año': self.anio,
+            'ministerio': self.ministerio,
+            'subsecretaria': self.subsecretaria,
+            'materia': self.materia,
+            'titulo': self.materia,
+            'fecha_ingreso': self.fecha_ingreso.strftime('%d/%m/%Y'),
+            'estado': self.estado,
+            'url_descarga': self.url_descarga,
+        }
+
+    @classmethod
+    def claves_recientes(cls, limite=50):
+        """(numero, anio, ministerio) de los últimos reglamentos guardados: la marca de la tabla"""
+        return set(cls.objects.order_by('-fecha_ingreso', '-id')
+                   .values_list('numero', 'anio', 'ministerio')[:limite])
+
+    @classmethod
+    def reglamentos_del_dia(cls, fecha):
+        """Reglamentos ingresados en una fecha (date), como diccionarios del scraper"""
+        return [reglamento.as_dict() for reglamento in cls.objects.filter(fecha_ingreso=fecha)]
+
+    @classmethod
+    def guardar_varios(cls, reglamentos):
+        """
+        Guarda reglamentos nuevos; en los ya existentes actualiza estado y
+        enlace de descarga (la tramitación avanza después del ingreso).
+
+        Args:
+            reglamentos: Diccionarios del scraper con 'fecha' (date) además de
+                         los campos de as_dict
+        """
+        # Una clave repetida en el mismo INSERT ... ON CONFLICT DO UPDATE falla en PostgreSQL
+        por_clave = {
+            (r['numero'][:50], r.get('año', '')[:10], r.get('ministerio', '')[:300]): r
+            for r in reglamentos
+        }
+        cls.objects.bulk_create([
+            cls(
+                numero=numero,
+                anio=anio,
+                ministerio=ministerio,
+                subsecretaria=r.get('subsecretaria', '')[:300],
+                materia=r.get('materia', ''),
+                fecha_ingreso=r['fecha'],
+                estado=r.get('estado', '')[:200],
+                url_descarga=r.get('url_descarga', ''),
+            )
+            for (numero, anio, ministerio), r in por_clave.items()
+        ], update_conflicts=True, unique_fields=['numero', 'anio', 'ministerio'],
+           update_fields=['estado', 'url_descarga'])
+
+
+class ScrapingMetric(models.Model):
+    """Métricas de una corrida de scraping del informe diario (MetricsCollector)"""
+    fecha_scraping = models.DateTimeField(db_index=True)
+    exitoso = models.BooleanField(default=False)
+    mensaje_error = models.TextField(null=True, blank=True)
+    duracion_segundos = models.FloatField(null=True, blank=True)
+    total_publicaciones = models.PositiveIntegerField(default=0)
+    publicaciones_relevantes = models.PositiveIntegerField(default=0)
+    pdfs_descargados = models.PositiveIntegerField(default=0)
+    pdfs_desde_cache = models.PositiveIntegerField(default=0)
+    tiempo_descarga_promedio = models.FloatField(null=True, blank=True)
+    memoria_usada_mb = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        estado = "OK" if self.exitoso else "ERROR"
+        return f"Scraping {self.fecha_scraping:%d-%m-%Y %H:%M} - {estado}"
+
+    class Meta:
+        db_table = 'alerts_scrapingmetric'
+        ordering = ['-created_at']
+
+
+class PDFProcessingMetric(models.Model):
+    """Tiempos y resultado del procesamiento de un PDF dentro de una corrida"""
+    scraping_metric = models.ForeignKey(ScrapingMetric, on_delete=models.CASCADE, related_name='pdf_metrics')
+    url_pdf = models.TextField()
+    titulo = models.CharField(max_length=500, blank=True)
+    exitoso = models.BooleanField(default=False)
+    mensaje_error = models.TextField(null=True, blank=True)
+    metodo_extraccion = models.CharField(max_length=50, blank=True, default='')
+    tiempo_extraccion = models.FloatField(null=True, blank=True)
+    tiempo_analisis = models.FloatField(null=True, blank=True)
+    tiempo_total = models.FloatField(null=True, blank=True)
+    num_paginas = models.PositiveIntegerField(null=True, blank=True)
+    tamano_bytes = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"PDF {self.titulo[:50]} - {self.metodo_extraccion or 'sin extracción'}"
+
+    class Meta:
+        db_table = 'alerts_pdfprocessingmetric'
+        ordering = ['-created_at']
+
+
+class APICallMetric(models.Model):
+    """Duración, resultado y consumo de una llamada a una API externa"""
+    api_name = models.CharField(max_length=50, db_index=True)
+    endpoint = models.CharField(max_length=200, blank=True, default='')
+    exitoso = models.BooleanField(default=False)
+    mensaje_error = models.TextField(null=True, blank=True)
+    duracion_segundos = models.FloatField(null=True, blank=True)
+    tokens_usados = models.PositiveIntegerField(null=True, blank=True)
+    costo_estimado = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.api_name} {self.endpoint} - {'OK' if self.exitoso else 'ERROR'}"
+
+    class Meta:
+        db_table = 'alerts_apicallmetric'
+        ordering = ['-created_at']
@@ -52,6 +52,13 @@ def es_licitacion_publica(titulo):
 
 pdf_extractor = PDFExtractor()
 
+# Presupuestos de texto (caracteres) por consumidor del PDF.
+# resumen_con_openai usa el primer párrafo o 1500 caracteres y el evaluador de
+# relevancia usa texto_pdf[:2000]. Para el certificado de monedas basta la primera
+# página con texto, por eso su presupuesto es mínimo.
+PRESUPUESTO_TEXTO_RESUMEN = 3000
+PRESUPUESTO_TEXTO_MONEDAS = 1
+
 @rate_limited
 @retry(max_retries=3, backoff_factor=2)
 def descargar_pdf_con_cache(url_pdf):
@@ -70,9 +77,12 @@ def descargar_pdf_con_cache(url_pdf):
     cache_service.set_pdf_content(url_completa, resp.content)
     return resp.content
 
-def extraer_texto_pdf_mixto(url_pdf):
+def extraer_texto_pdf_mixto(url_pdf, max_chars=PRESUPUESTO_TEXTO_RESUMEN):
     """
     Extrae texto de un PDF usando caché y extractor robusto.
+    
+    La extracción se detiene en la primera página que cubre max_chars
+    (None = procesar las 8 páginas).
     """
     try:
         pdf_content = descargar_pdf_con_cache(url_pdf)
@@ -80,7 +90,7 @@ def extraer_texto_pdf_mixto(url_pdf):
             print(f"[WARNING] No se pudo descargar el PDF: {url_pdf}")
             return ""
         
-        texto, metodo = pdf_extractor.extract_text(pdf_content, max_pages=8)
+        texto, metodo = pdf_extractor.extract_text(pdf_content, max_pages=8, max_chars=max_chars)
         # print(f"[ExtractorRobusto] Método: {metodo}, Texto extraído: {texto[:500]}")
         return texto
     except Exception as e:
@@ -628,7 +638,7 @@ def obtener_sumario_diario_oficial(fecha=None, force_refresh=False):
         # Procesar certificado de monedas
         for pub in todas_las_publicaciones:
             if "TIPOS DE CAMBIO" in pub['titulo'].upper() and "PARIDADES DE MONEDAS EXTRANJERAS" in pub['titulo'].upper():
-                texto_pdf = extraer_texto_pdf_mixto(pub['url_pdf'])
+                texto_pdf = extraer_texto_pdf_mixto(pub['url_pdf'], max_chars=PRESUPUESTO_TEXTO_MONEDAS)
                 valores_monedas = extraer_valores_dolar_euro(texto_pdf)
                 break
         
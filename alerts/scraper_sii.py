@@ -9,15 +9,17 @@ Este módulo contiene las funciones para extraer:
 """
 
 # ==================== IMPORTACIONES ====================
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import re
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from alerts.services.http_cache import http_cache
+
 # Configurar Django si no está configurado
 try:
     import django
@@ -29,10 +31,12 @@ try:
     from alerts.utils.rate_limiter import rate_limited
     from alerts.utils.retry_utils import retry
 except ImportError:
-    # Fallback si Django no está disponible
+    # Fallback si Django no está disponible: como alerts.utils.rate_limiter,
+    # solo se limita cuando la función recibe una URL
     def rate_limited(func):
         def wrapper(*args, **kwargs):
-            time.sleep(1)  # Simple rate limiting
+            if (args and isinstance(args[0], str) and args[0].startswith('http')) or 'url' in kwargs:
+                time.sleep(1)  # Simple rate limiting
             return func(*args, **kwargs)
         return wrapper
     
@@ -61,6 +65,40 @@ MESES_ES = {
 
 # ==================== FUNCIONES AUXILIARES ====================
 
+def ordenar_urls_candidatas(tipo, year, urls_posibles):
+    """
+    Pone primero la URL que entregó documentos la última vez para (tipo, año)
+    (guardada en URLIndiceSII), para no volver a probar las que responden 404.
+    """
+    try:
+        from alerts.models import URLIndiceSII
+        resuelta = URLIndiceSII.url_resuelta(tipo, int(year))
+    except Exception as e:
+        print(f"[SII] No se pudo leer la URL resuelta de {tipo} {year}: {e}")
+        return urls_posibles
+    if resuelta in urls_posibles:
+        return [resuelta] + [url for url in urls_posibles if url != resuelta]
+    return urls_posibles
+
+def recordar_url_candidata(tipo, year, url):
+    """Guarda en URLIndiceSII la URL que entregó documentos para (tipo, año)"""
+    try:
+        from alerts.models import URLIndiceSII
+        URLIndiceSII.recordar(tipo, int(year), url)
+    except Exception as e:
+        print(f"[SII] No se pudo guardar la URL resuelta de {tipo} {year}: {e}")
+
+def cerrar_conexion_bd():
+    """
+    Cierra la conexión a la base de datos del hilo actual. Django abre una
+    conexión por hilo y los hilos del pool no la cierran al terminar.
+    """
+    try:
+        from django.db import connection
+        connection.close()
+    except Exception as e:
+        print(f"[SII] No se pudo cerrar la conexión a la base de datos: {e}")
+
 def convertir_fecha_sii_a_datetime(fecha_str):
     """
     Convierte fecha del formato 'dd de Mes de YYYY' a datetime
@@ -200,12 +238,14 @@ def mejorar_descripcion_tributaria(descripcion, tipo_documento):
 
 @rate_limited
 @retry(max_retries=3, backoff_factor=2)
-def obtener_circulares_sii(year=None):
+def obtener_circulares_sii(year=None, enriquecer=True):
     """
     Obtiene las circulares del SII para un año específico
     
     Args:
         year (int): Año a consultar. Si no se especifica, usa el año actual.
+        enriquecer (bool): Si es False el título queda como "Circular N° X" y la
+                           descripción original se entrega sin mejorar.
     
     Returns:
         list: Lista de diccionarios con información de circulares
@@ -220,13 +260,14 @@ def obtener_circulares_sii(year=None):
         f"{BASE_URL_SII}/normativa_legislacion/circulares/{year}/indcir{year}.htm",
         f"{BASE_URL_SII}/normativa_legislacion/index_normativa_legislacion.html"
     ]
+    urls_posibles = ordenar_urls_candidatas('circulares', year, urls_posibles)
     
     # Agregar logging para debugging
     errores_urls = []
     
     for url in urls_posibles:
         try:
-            response = requests.get(url, timeout=30, headers={
+            response = http_cache.get(url, timeout=30, headers={
                 'User-Agent': 'Mozilla/5.0 (compatible; InformeDiarioBot/1.0)'
             })
             if response.status_code == 404:
@@ -299,13 +340,14 @@ def obtener_circulares_sii(year=None):
                             fuente = fuente_text.replace('Fuente:', '').strip()
                         
                         # Mejorar la descripción para que sea más clara
-                        descripcion_mejorada = mejorar_descripcion_tributaria(descripcion, 'circular')
+                        descripcion_mejorada = mejorar_descripcion_tributaria(descripcion, 'circular') if enriquecer else None
                         
                         circular = {
                             'tipo': 'Circular',
                             'numero': numero,
                             'fecha': fecha,
                             'titulo': descripcion_mejorada or f"Circular N° {numero}",
+                            'descripcion': descripcion,
                             'url_pdf': url_pdf,
                             'fuente': fuente
                         }
@@ -319,6 +361,8 @@ def obtener_circulares_sii(year=None):
                 pass
             
             print(f"[SII] Se encontraron {len(circulares)} circulares para {year}")
+            if circulares:
+                recordar_url_candidata('circulares', year, url)
             return circulares
             
         except Exception as e:
@@ -333,12 +377,14 @@ def obtener_circulares_sii(year=None):
 
 @rate_limited
 @retry(max_retries=3, backoff_factor=2)
-def obtener_resoluciones_exentas_sii(year=None):
+def obtener_resoluciones_exentas_sii(year=None, enriquecer=True):
     """
     Obtiene las resoluciones exentas del SII para un año específico
     
     Args:
         year (int): Año a consultar. Si no se especifica, usa el año actual.
+        enriquecer (bool): Si es False el título queda como "Resolución Exenta
+                           SII N° X" y la descripción original se entrega sin mejorar.
     
     Returns:
         list: Lista de diccionarios con información de resoluciones exentas
@@ -353,10 +399,11 @@ def obtener_resoluciones_exentas_sii(year=None):
         f"{BASE_URL_SII}/normativa_legislacion/resoluciones/{year}/res_ind{year}.htm",
         f"{BASE_URL_SII}/normativa_legislacion/index_normativa_legislacion.html"
     ]
+    urls_posibles = ordenar_urls_candidatas('resoluciones', year, urls_posibles)
     
     for url in urls_posibles:
         try:
-            response = requests.get(url, timeout=30)
+            response = http_cache.get(url, timeout=30)
             if response.status_code == 404:
                 continue  # Probar siguiente URL
             response.raise_for_status()
@@ -426,13 +473,14 @@ def obtener_resoluciones_exentas_sii(year=None):
                             fuente = fuente_text.replace('Fuente:', '').strip()
                         
                         # Mejorar la descripción para que sea más clara
-                        descripcion_mejorada = mejorar_descripcion_tributaria(descripcion, 'resolucion')
+                        descripcion_mejorada = mejorar_descripcion_tributaria(descripcion, 'resolucion') if enriquecer else None
                         
                         resolucion = {
                             'tipo': 'Resolución Exenta',
                             'numero': numero,
                             'fecha': fecha,
                             'titulo': descripcion_mejorada or f"Resolución Exenta SII N° {numero}",
+                            'descripcion': descripcion,
                             'url_pdf': url_pdf,
                             'fuente': fuente
                         }
@@ -446,6 +494,8 @@ def obtener_resoluciones_exentas_sii(year=None):
                 pass
             
             print(f"[SII] Se encontraron {len(resoluciones)} resoluciones exentas para {year}")
+            if resoluciones:
+                recordar_url_candidata('resoluciones', year, url)
             return resoluciones
             
         except Exception as e:
@@ -458,13 +508,14 @@ def obtener_resoluciones_exentas_sii(year=None):
     print(f"[SII] No se pudo acceder a ninguna URL de resoluciones")
     return []
 
-def obtener_jurisprudencia_administrativa_sii(year=None):
+def obtener_jurisprudencia_administrativa_sii(year=None, enriquecer=True):
     """
     Obtiene jurisprudencia administrativa del SII para un año específico
     Accede directamente a las páginas HTML ya que el API requiere autenticación especial
     
     Args:
         year (int): Año para buscar jurisprudencia
+        enriquecer (bool): Igual que en obtener_circulares_sii
     
     Returns:
         list: Lista de diccionarios con información de jurisprudencia administrativa
@@ -492,6 +543,111 @@ def obtener_jurisprudencia_sii_reciente(dias=7):
     """
     return obtener_jurisprudencia_administrativa_sii()
 
+# ==================== ETAPA CONCURRENTE ====================
+
+# Índices que se descargan en paralelo: clave del resultado -> (función, nombre para logs)
+INDICES_SII = {
+    'circulares': (obtener_circulares_sii, 'circulares'),
+    'resoluciones_exentas': (obtener_resoluciones_exentas_sii, 'resoluciones'),
+    'jurisprudencia_administrativa': (obtener_jurisprudencia_administrativa_sii, 'jurisprudencia'),
+}
+
+def obtener_indices_sii_concurrente(year=None, enriquecer=True):
+    """
+    Descarga en paralelo los índices de circulares, resoluciones exentas y
+    jurisprudencia administrativa del año indicado.
+    
+    Args:
+        year (int): Año a consultar. Si no se especifica, usa el año actual.
+        enriquecer (bool): Se pasa a cada función de INDICES_SII.
+    
+    Returns:
+        tuple: (documentos, tiempos) con las mismas claves de INDICES_SII;
+               documentos trae la lista de cada índice (vacía si falló) y
+               tiempos los segundos que tomó cada uno.
+    """
+    if year is None:
+        year = datetime.now().year
+    
+    def ejecutar(clave):
+        funcion, nombre = INDICES_SII[clave]
+        inicio = time.perf_counter()
+        try:
+            documentos = funcion(year, enriquecer=enriquecer) or []
+            if not documentos and clave != 'jurisprudencia_administrativa':
+                print(f"[SII] No se encontraron {nombre} para {year}")
+        except Exception as e:
+            print(f"[SII] Error obteniendo {nombre}: {e}")
+            documentos = []
+        finally:
+            # ordenar_urls_candidatas/recordar_url_candidata consultan URLIndiceSII desde este hilo
+            cerrar_conexion_bd()
+        return documentos, time.perf_counter() - inicio
+    
+    with ThreadPoolExecutor(max_workers=len(INDICES_SII)) as executor:
+        resultados = dict(zip(INDICES_SII, executor.map(ejecutar, INDICES_SII)))
+    
+    documentos = {clave: resultado[0] for clave, resultado in resultados.items()}
+    tiempos = {clave: resultado[1] for clave, resultado in resultados.items()}
+    print("[SII] Tiempos por índice: " + ", ".join(f"{clave} {segundos:.2f}s" for clave, segundos in tiempos.items()))
+    return documentos, tiempos
+
+# ==================== SINCRONIZACIÓN CON DocumentoSII ====================
+
+# Clave de INDICES_SII -> (tipo_documento de DocumentoSII, tipo para mejorar_descripcion_tributaria)
+TIPOS_DOCUMENTO_SII = {
+    'circulares': ('CIRCULAR', 'circular'),
+    'resoluciones_exentas': ('RESOLUCION', 'resolucion'),
+    'jurisprudencia_administrativa': ('JURISPRUDENCIA', 'jurisprudencia'),
+}
+
+def sincronizar_documentos_sii(year=None):
+    """
+    Guarda en DocumentoSII los documentos de los índices del año, con la fecha
+    de publicación normalizada. Solo los documentos nuevos pasan por
+    mejorar_descripcion_tributaria; los ya guardados no se vuelven a procesar.
+    
+    Args:
+        year (int): Año a sincronizar. Si no se especifica, usa el año actual.
+    
+    Returns:
+        dict: {clave de INDICES_SII: (actualizados, agregados)}
+    """
+    from alerts.models import DocumentoSII
+    
+    if year is None:
+        year = datetime.now().year
+    
+    documentos, _ = obtener_indices_sii_concurrente(year, enriquecer=False)
+    
+    resultado = {}
+    for clave, lista in documentos.items():
+        tipo_documento, tipo_descripcion = TIPOS_DOCUMENTO_SII[clave]
+        
+        normalizados = []
+        for documento in lista:
+            fecha = convertir_fecha_sii_a_datetime(documento.get('fecha'))
+            numero = str(documento.get('numero', ''))
+            # Sin número o sin fecha no se puede identificar ni ubicar en el informe
+            if not fecha or not numero.isdigit():
+                continue
+            normalizados.append({
+                'numero': numero,
+                'fecha_publicacion': fecha.date(),
+                'titulo': documento.get('titulo', ''),
+                'descripcion': documento.get('descripcion', ''),
+                'url': documento.get('url_pdf', documento.get('url', '')),
+                'fuente': documento.get('fuente', ''),
+            })
+        
+        def describir(documento, tipo=tipo_descripcion):
+            return mejorar_descripcion_tributaria(documento['descripcion'], tipo) or documento['titulo']
+        
+        resultado[clave] = DocumentoSII.sincronizar(tipo_documento, year, normalizados, describir=describir)
+        print(f"[SII] {clave}: {resultado[clave][1]} nuevos, {resultado[clave][0]} actualizados")
+    
+    return resultado
+
 # ==================== FUNCIÓN PRINCIPAL ====================
 
 def obtener_novedades_tributarias_sii(fecha_referencia=None, dias_atras=7):
@@ -505,14 +661,16 @@ def obtener_novedades_tributarias_sii(fecha_referencia=None, dias_atras=7):
         dias_atras (int): Número de días hacia atrás para considerar como "reciente"
     
     Returns:
-        dict: Diccionario con todas las novedades organizadas por tipo
+        dict: Diccionario con todas las novedades organizadas por tipo y los
+              segundos de descarga de cada índice en 'tiempos_indices'
     """
     # Resultado por defecto en caso de error
     resultado_vacio = {
         'circulares': [],
         'resoluciones_exentas': [],
         'jurisprudencia_administrativa': [],
-        'total_novedades': 0
+        'total_novedades': 0,
+        'tiempos_indices': {}
     }
     
     try:
@@ -524,34 +682,11 @@ def obtener_novedades_tributarias_sii(fecha_referencia=None, dias_atras=7):
         # Solo interesan las novedades del año en curso
         year = datetime.now().year
         
-        try:
-            # Obtener circulares con manejo de errores
-            circulares = obtener_circulares_sii(year)
-            if not circulares:
-                circulares = []
-                print(f"[SII] No se encontraron circulares para {year}")
-        except Exception as e:
-            print(f"[SII] Error obteniendo circulares: {e}")
-            circulares = []
-        
-        try:
-            # Obtener resoluciones exentas con manejo de errores
-            resoluciones = obtener_resoluciones_exentas_sii(year)
-            if not resoluciones:
-                resoluciones = []
-                print(f"[SII] No se encontraron resoluciones para {year}")
-        except Exception as e:
-            print(f"[SII] Error obteniendo resoluciones: {e}")
-            resoluciones = []
-        
-        try:
-            # Obtener jurisprudencia administrativa
-            jurisprudencia = obtener_jurisprudencia_administrativa_sii(year)
-            if not jurisprudencia:
-                jurisprudencia = []
-        except Exception as e:
-            print(f"[SII] Error obteniendo jurisprudencia: {e}")
-            jurisprudencia = []
+        # Los tres índices se descargan en paralelo
+        documentos, tiempos = obtener_indices_sii_concurrente(year)
+        circulares = documentos['circulares']
+        resoluciones = documentos['resoluciones_exentas']
+        jurisprudencia = documentos['jurisprudencia_administrativa']
         
         # Función auxiliar para verificar si un documento es reciente
         def es_documento_reciente(fecha_str, fecha_ref, dias):
@@ -603,7 +738,8 @@ def obtener_novedades_tributarias_sii(fecha_referencia=None, dias_atras=7):
             'circulares': circulares_recientes,
             'resoluciones_exentas': resoluciones_recientes,
             'jurisprudencia_administrativa': jurisprudencia_reciente,
-            'total_novedades': len(circulares_recientes) + len(resoluciones_recientes) + len(jurisprudencia_reciente)
+            'total_novedades': len(circulares_recientes) + len(resoluciones_recientes) + len(jurisprudencia_reciente),
+            'tiempos_indices': tiempos
         }
         
         print(f"[SII] Resumen de novedades:")
@@ -0,0 +1,151 @@
+"""
+Estado de formularios ASP.NET WebForms reutilizable entre búsquedas
+
+Las búsquedas de camara.cl son postbacks: cada POST debe llevar los campos
+ocultos __VIEWSTATE, __VIEWSTATEGENERATOR y __EVENTVALIDATION (a menudo de
+cientos de KB). En lugar de pedir la página antes de cada búsqueda, el
+formulario guarda ese estado por sesión HTTP y URL, lo actualiza con el que
+trae cada respuesta y solo vuelve a pedir la página cuando el servidor rechaza
+el estado. Ese GET va siempre al servidor: un estado guardado de una corrida
+anterior sería justamente el que el servidor rechaza.
+
+No depende de Django, así que se puede usar desde scripts/scrapers:
+
+    from alerts.services.aspnet_form import formulario_para, parsear_grilla
+    formulario = formulario_para(self.session, self.search_url)
+    response = formulario.enviar({'ctl00$mainPlaceHolder$btnBuscar': 'Buscar', ...})
+    filas = parsear_grilla(response.documento, 'mainPlaceHolder_grvResultado')
+"""
+import logging
+import threading
+import weakref
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from lxml import html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+# Campos ocultos que ASP.NET valida en cada postback
+CAMPOS_ESTADO = ('__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION')
+
+# Textos con que ASP.NET rechaza un estado vencido o ajeno
+ERRORES_VALIDACION = (
+    'Invalid postback or callback argument',
+    'Validation of viewstate MAC failed',
+    'The state information is invalid',
+)
+
+# Celda de una grilla: texto (como get_text(strip=True)), texto y href del primer enlace
+Celda = namedtuple('Celda', 'texto enlace_texto href')
+
+
+def _texto(elemento) -> str:
+    return ''.join(fragmento.strip() for fragmento in elemento.itertext())
+
+
+class FormularioASPNET:
+    """Postbacks sucesivos a una página ASP.NET reutilizando su estado"""
+
+    def __init__(self, session, url: str, timeout: int = 30):
+        self.session = session
+        self.url = url
+        self.timeout = timeout
+        self._estado: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'postbacks': 0, 'refrescos': 0, 'rechazos': 0}
+
+    def refrescar(self):
+        """Obtiene el estado desde la página del formulario"""
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        estado = self._extraer_estado(lxml_html.fromstring(response.content or b'<html></html>'))
+        with self._lock:
+            self._estado = estado
+            self.stats['refrescos'] += 1
+
+    def enviar(self, campos: Dict[str, str], event_target: str = '', event_argument: str = ''):
+        """
+        POST al formulario con el estado guardado más `campos`.
+
+        Returns:
+            La respuesta, con el HTML ya parseado en `response.documento` (lxml).
+        """
+        if not self._estado:
+            self.refrescar()
+
+        response, documento = self._postback(campos, event_target, event_argument)
+        if self._es_rechazo(response):
+            logger.info(f"Estado ASP.NET rechazado por {self.url}, refrescando formulario")
+            with self._lock:
+                self.stats['rechazos'] += 1
+            self.refrescar()
+            response, documento = self._postback(campos, event_target, event_argument)
+
+        # El postback trae el estado válido para el siguiente
+        estado = self._extraer_estado(documento)
+        if estado.get('__VIEWSTATE'):
+            with self._lock:
+                self._estado = estado
+
+        response.documento = documento
+        return response
+
+    def _postback(self, campos, event_target, event_argument):
+        with self._lock:
+            data = dict(self._estado)
+            self.stats['postbacks'] += 1
+        data.update({'__EVENTTARGET': event_target, '__EVENTARGUMENT': event_argument})
+        data.update(campos)
+        response = self.session.post(self.url, data=data, timeout=self.timeout)
+        documento = lxml_html.fromstring(response.content or b'<html></html>')
+        return response, documento
+
+    def _es_rechazo(self, response) -> bool:
+        if response.status_code >= 500:
+            return True
+        texto = response.text
+        return any(error in texto for error in ERRORES_VALIDACION)
+
+    @staticmethod
+    def _extraer_estado(documento) -> Dict[str, str]:
+        estado = {}
+        for campo in CAMPOS_ESTADO:
+            valores = documento.xpath(f'//input[@name="{campo}"]/@value')
+            estado[campo] = valores[0] if valores else ''
+        return estado
+
+
+_formularios = weakref.WeakKeyDictionary()
+_formularios_lock = threading.Lock()
+
+
+def formulario_para(session, url: str) -> FormularioASPNET:
+    """Formulario compartido por sesión HTTP y URL (el estado vive lo que vive la sesión)"""
+    with _formularios_lock:
+        por_url = _formularios.setdefault(session, {})
+        if url not in por_url:
+            por_url[url] = FormularioASPNET(session, url)
+        return por_url[url]
+
+
+def parsear_grilla(documento, grid_id: str) -> Optional[List[List[Celda]]]:
+    """
+    Filas de datos (sin encabezado) de una grilla GridView, como listas de Celda.
+    Retorna None si la grilla no está en el documento.
+    """
+    tablas = documento.xpath(f'//table[@id="{grid_id}"]')
+    if not tablas:
+        return None
+
+    filas = []
+    for fila in tablas[0].xpath('.//tr')[1:]:
+        celdas = []
+        for celda in fila.xpath('.//td'):
+            enlaces = celda.xpath('.//a')
+            if enlaces:
+                celdas.append(Celda(_texto(celda), _texto(enlaces[0]), enlaces[0].get('href', '')))
+            else:
+                celdas.append(Celda(_texto(celda), None, None))
+        filas.append(celdas)
+    return filas
@@ -0,0 +1,182 @@
+"""
+Política de desalojo compartida para los cachés en disco
+
+Cada caché (namespace) tiene un presupuesto en bytes y un orden de desalojo
+(LRU o LFU). Cuando el caché supera su presupuesto se desalojan entradas
+hasta bajar a LOW_WATERMARK del presupuesto, para no desalojar en cada put.
+
+Los presupuestos se configuran con variables de entorno
+CACHE_BUDGET_<NAMESPACE>_MB (p. ej. CACHE_BUDGET_PDF_CACHE_MB=100) y el orden
+con CACHE_EVICTION_<NAMESPACE> (lru o lfu, p. ej. CACHE_EVICTION_PDF_CACHE=lfu).
+"""
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Presupuestos por defecto en MB (el disco del dyno es efímero y compartido)
+DEFAULT_BUDGETS_MB = {
+    'pdf_cache': 200,
+    'django_cache': 300,
+    'blob_cache': 300,
+    'extraction_store': 50,
+    'logs': 100,
+    'http_cache': 50,
+}
+
+LOW_WATERMARK = 0.9
+
+ORDER_LRU = 'lru'
+ORDER_LFU = 'lfu'
+
+
+class EvictionPolicy:
+    """Presupuesto en bytes, orden de desalojo y estadísticas de un namespace"""
+
+    def __init__(self, namespace: str, max_bytes: int, order: str = ORDER_LRU):
+        if order not in (ORDER_LRU, ORDER_LFU):
+            raise ValueError(f"Orden de desalojo no soportado: {order}")
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.order = order
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_reclaimed = 0
+
+    def select_victims(self, total_bytes: int, candidates: Iterable[Tuple[str, int]]) -> List[str]:
+        """
+        Elige qué entradas desalojar.
+
+        Args:
+            total_bytes: Bytes que ocupa hoy el caché
+            candidates: Pares (clave, tamaño) ordenados del primero al último en
+                desalojarse: por último acceso (LRU) o por número de accesos (LFU)
+
+        Returns:
+            Lista de claves a desalojar (vacía si el caché está dentro del presupuesto)
+        """
+        if total_bytes <= self.max_bytes:
+            return []
+
+        target = self.max_bytes * LOW_WATERMARK
+        victims = []
+        for key, size in candidates:
+            if total_bytes <= target:
+                break
+            victims.append(key)
+            total_bytes -= size or 0
+        return victims
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_eviction(self, count: int, reclaimed_bytes: int):
+        if not count:
+            return
+        with self._lock:
+            self.evictions += count
+            self.bytes_reclaimed += reclaimed_bytes
+        logger.info(f"🗑️ [{self.namespace}] {count} entradas desalojadas, "
+                    f"{reclaimed_bytes / (1024 * 1024):.1f} MB liberados")
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'order': self.order,
+            'max_mb': self.max_bytes / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes_reclaimed': self.bytes_reclaimed,
+        }
+
+
+_policies: Dict[str, EvictionPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def budget_bytes(namespace: str) -> int:
+    """Presupuesto en bytes del namespace (variable de entorno o valor por defecto)"""
+    env_var = f"CACHE_BUDGET_{namespace.upper()}_MB"
+    megabytes = float(os.environ.get(env_var, DEFAULT_BUDGETS_MB.get(namespace, 100)))
+    return int(megabytes * 1024 * 1024)
+
+
+def eviction_order(namespace: str, default: str = ORDER_LRU) -> str:
+    """Orden de desalojo del namespace (variable de entorno o `default`)"""
+    env_var = f"CACHE_EVICTION_{namespace.upper()}"
+    order = os.environ.get(env_var, default).strip().lower()
+    if order not in (ORDER_LRU, ORDER_LFU):
+        logger.warning(f"{env_var}={order!r} no es lru ni lfu; se usa {default}")
+        return default
+    return order
+
+
+def get_policy(namespace: str, order: str = ORDER_LRU) -> EvictionPolicy:
+    """Retorna la política (única por proceso) del namespace; `order` es el orden si no hay variable de entorno"""
+    with _policies_lock:
+        if namespace not in _policies:
+            _policies[namespace] = EvictionPolicy(namespace, budget_bytes(namespace),
+                                                  eviction_order(namespace, order))
+        return _policies[namespace]
+
+
+def eviction_stats() -> List[Dict]:
+    """Estadísticas de todos los namespaces usados en este proceso"""
+    with _policies_lock:
+        return [policy.get_stats() for policy in _policies.values()]
+
+
+def enforce_directory_budget(directory, policy: EvictionPolicy, pattern: str = '*') -> int:
+    """
+    Aplica el presupuesto a un directorio de archivos de caché.
+
+    Usa el último acceso o modificación de cada archivo como recencia (sin
+    contador de accesos, LFU se comporta como LRU). Retorna los bytes liberados.
+    """
+    from pathlib import Path
+
+    files = []
+    total_bytes = 0
+    for path in Path(directory).glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if not path.is_file():
+            continue
+        total_bytes += stat.st_size
+        files.append((max(stat.st_atime, stat.st_mtime), str(path), stat.st_size))
+
+    if total_bytes <= policy.max_bytes:
+        return 0
+
+    files.sort()
+    sizes = {name: size for _, name, size in files}
+    victims = policy.select_victims(total_bytes, ((name, size) for _, name, size in files))
+
+    reclaimed = 0
+    removed = 0
+    for name in victims:
+        try:
+            os.remove(name)
+            reclaimed += sizes[name]
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"No se pudo desalojar {name}: {e}")
+
+    policy.record_eviction(removed, reclaimed)
+    return reclaimed
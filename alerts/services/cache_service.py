@@ -1,16 +1,170 @@
 """
 Servicio de caché para optimizar el scraping del Diario Oficial
+
+El caché tiene dos niveles:
+- memoria: LRU en el proceso, limitado en bytes, para las claves calientes de
+  una corrida (el mismo PDF o respuesta se pide varias veces por informe).
+  Los valores mutables se guardan serializados, así que cada get entrega una
+  copia que el llamador puede modificar sin alterar el caché
+- disco: los PDFs van a archivos crudos en un BlobStore (sin pickle) y el
+  resto de los valores al caché de Django (FileBasedCache en producción)
 """
 import hashlib
 import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, Any, Dict
 from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
 from django.conf import settings
 import logging
 
+from alerts.services.cache_eviction import get_policy, enforce_directory_budget
+
 logger = logging.getLogger(__name__)
 
+# Valor guardado en el caché de Django junto a su expiración absoluta, para
+# promoverlo a memoria solo por el tiempo que le queda
+EntradaDisco = namedtuple('EntradaDisco', 'expira valor')
+
+
+class TierStats:
+    """Contadores de aciertos y fallos de un nivel del caché"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MemoryTier:
+    """
+    LRU en memoria del proceso, limitado por bytes y con expiración por entrada.
+
+    bytes y str se guardan tal cual (son inmutables); el resto se guarda con
+    pickle y se deserializa en cada get, como haría el caché en disco.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.stats = TierStats('memory')
+        self._entries = OrderedDict()  # key -> (expira, tamaño, valor, serializado)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            self.stats.record(entry is not None)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            _, _, stored, serialized = entry
+        return pickle.loads(stored) if serialized else stored
+
+    def set(self, key: str, value: Any, timeout: int, size: int = None) -> None:
+        serialized = not isinstance(value, (bytes, str))
+        stored = pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if serialized else value
+        size = len(stored) if size is None else size
+        with self._lock:
+            self._remove(key)
+            # Un valor más grande que una fracción del nivel solo lo vaciaría
+            if size > self.max_bytes // 4:
+                return
+            self._entries[key] = (time.monotonic() + timeout, size, stored, serialized)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.as_dict()
+        stats.update({
+            'entries': len(self._entries),
+            'size_mb': self.current_bytes / (1024 * 1024),
+            'max_size_mb': self.max_bytes / (1024 * 1024),
+        })
+        return stats
+
+
+class BlobStore:
+    """
+    Nivel en disco para blobs binarios grandes (PDFs): un archivo crudo por
+    clave, sin pickle, con la expiración dada por la fecha de modificación.
+    """
+
+    SUFFIX = '.blob'
+
+    def __init__(self, directory, max_age_seconds: int):
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.stats = TierStats('blob')
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                content = None
+            else:
+                content = path.read_bytes()
+        except FileNotFoundError:
+            content = None
+        except OSError as e:
+            logger.error(f"Error leyendo blob del caché: {e}")
+            content = None
+        self.stats.record(content is not None)
+        return content
+
+    def set(self, key: str, content: bytes) -> None:
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Escribir a un archivo temporal y renombrar: un lector nunca ve un blob a medias
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error guardando blob en caché: {e}")
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
 
 class CacheService:
     """Servicio para gestionar el caché del scraping"""
@@ -20,6 +174,65 @@ class CacheService:
     SCRAPING_RESULT_CACHE_TIME = 86400  # 24 horas para resultados de scraping
     API_RESPONSE_CACHE_TIME = 3600  # 1 hora para respuestas de API
     
+    # Fracción del presupuesto escrita entre revisiones del tamaño en disco
+    BUDGET_CHECK_FRACTION = 0.1
+    
+    # Tamaño del nivel en memoria (configurable con CACHE_MEMORY_MB)
+    MEMORY_TIER_MB = 64
+    
+    def __init__(self):
+        self.eviction_policy = get_policy('django_cache')
+        self._bytes_since_budget_check = 0
+        memory_mb = float(os.environ.get('CACHE_MEMORY_MB', self.MEMORY_TIER_MB))
+        self.memory = MemoryTier(int(memory_mb * 1024 * 1024))
+        self.disk_stats = TierStats('disk')
+        self._blob_store = None
+    
+    @property
+    def blob_store(self) -> BlobStore:
+        """BlobStore junto al directorio del FileBasedCache (o en el temporal del sistema)"""
+        if self._blob_store is None:
+            cache_dir = self._file_cache_dir()
+            if cache_dir is not None:
+                directory = cache_dir / 'blobs'
+            else:
+                directory = Path(tempfile.gettempdir()) / 'market_sniper_blobs'
+            self._blob_store = BlobStore(directory, self.PDF_CACHE_TIME)
+        return self._blob_store
+    
+    @staticmethod
+    def _file_cache_dir() -> Optional[Path]:
+        """Directorio del caché de Django según settings.CACHES (None si no es FileBasedCache)"""
+        config = settings.CACHES.get('default', {})
+        backend = config.get('BACKEND', '')
+        if backend.rsplit('.', 1)[-1] != FileBasedCache.__name__:
+            return None
+        return Path(config['LOCATION'])
+    
+    def _get(self, key: str) -> Optional[Any]:
+        """
+        Busca en memoria y luego en el caché de Django. Los aciertos de disco se
+        promueven a memoria por el tiempo que les queda, no por un timeout nuevo.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        entry = cache.get(key)
+        if isinstance(entry, EntradaDisco):
+            remaining = entry.expira - time.time()
+            value = entry.valor if remaining > 0 else None
+            if value is not None:
+                self.memory.set(key, value, remaining)
+        else:
+            # Valor guardado antes de registrar la expiración: se usa sin promoverlo
+            value = entry
+        self.disk_stats.record(value is not None)
+        return value
+    
+    def _set(self, key: str, value: Any, timeout: int) -> None:
+        self.memory.set(key, value, timeout)
+        cache.set(key, EntradaDisco(time.time() + timeout, value), timeout)
+    
     @staticmethod
     def _generate_key(prefix: str, identifier: str) -> str:
         """Genera una clave única para el caché"""
@@ -31,24 +244,39 @@ class CacheService:
         return hashlib.md5(url.encode()).hexdigest()
     
     def get_pdf_content(self, url: str) -> Optional[bytes]:
-        """Obtiene el contenido de un PDF del caché"""
-        key = self._generate_key("pdf", self._hash_url(url))
-        content = cache.get(key)
+        """Obtiene el contenido de un PDF del caché (memoria y luego blob en disco)"""
+        url_hash = self._hash_url(url)
+        key = self._generate_key("pdf", url_hash)
+        content = self.memory.get(key)
+        if content is None:
+            content = self.blob_store.get(url_hash)
+            if content is not None:
+                self.memory.set(key, content, self.PDF_CACHE_TIME, size=len(content))
         if content:
+            self.eviction_policy.record_hit()
             logger.info(f"PDF encontrado en caché: {url}")
+        else:
+            self.eviction_policy.record_miss()
         return content
     
     def set_pdf_content(self, url: str, content: bytes) -> None:
         """Guarda el contenido de un PDF en el caché"""
-        key = self._generate_key("pdf", self._hash_url(url))
-        cache.set(key, content, self.PDF_CACHE_TIME)
+        url_hash = self._hash_url(url)
+        key = self._generate_key("pdf", url_hash)
+        self.memory.set(key, content, self.PDF_CACHE_TIME, size=len(content))
+        self.blob_store.set(url_hash, content)
         logger.info(f"PDF guardado en caché: {url}")
+        
+        # Revisar el presupuesto cada cierto volumen escrito, no en cada set
+        self._bytes_since_budget_check += len(content)
+        if self._bytes_since_budget_check >= self.eviction_policy.max_bytes * self.BUDGET_CHECK_FRACTION:
+            self.enforce_disk_budget()
     
     def get_scraping_result(self, date: datetime) -> Optional[Dict[str, Any]]:
         """Obtiene los resultados del scraping para una fecha específica"""
         date_str = date.strftime("%Y-%m-%d")
         key = self._generate_key("scraping", date_str)
-        result = cache.get(key)
+        result = self._get(key)
         if result:
             logger.info(f"Resultados de scraping encontrados en caché para: {date_str}")
         return result
@@ -57,7 +285,7 @@ class CacheService:
         """Guarda los resultados del scraping en el caché"""
         date_str = date.strftime("%Y-%m-%d")
         key = self._generate_key("scraping", date_str)
-        cache.set(key, results, self.SCRAPING_RESULT_CACHE_TIME)
+        self._set(key, results, self.SCRAPING_RESULT_CACHE_TIME)
         logger.info(f"Resultados de scraping guardados en caché para: {date_str}")
     
     def get_api_response(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -65,7 +293,7 @@ class CacheService:
         params_str = json.dumps(params, sort_keys=True)
         identifier = f"{endpoint}:{self._hash_url(params_str)}"
         key = self._generate_key("api", identifier)
-        response = cache.get(key)
+        response = self._get(key)
         if response:
             logger.info(f"Respuesta API encontrada en caché: {endpoint}")
         return response
@@ -75,29 +303,54 @@ class CacheService:
         params_str = json.dumps(params, sort_keys=True)
         identifier = f"{endpoint}:{self._hash_url(params_str)}"
         key = self._generate_key("api", identifier)
-        cache.set(key, response, self.API_RESPONSE_CACHE_TIME)
+        self._set(key, response, self.API_RESPONSE_CACHE_TIME)
         logger.info(f"Respuesta API guardada en caché: {endpoint}")
     
     def invalidate_scraping_cache(self, date: datetime) -> None:
         """Invalida el caché de scraping para una fecha específica"""
         date_str = date.strftime("%Y-%m-%d")
         key = self._generate_key("scraping", date_str)
+        self.memory.delete(key)
         cache.delete(key)
         logger.info(f"Caché de scraping invalidado para: {date_str}")
     
     def get_or_set(self, key: str, callable_func, timeout: int = None) -> Any:
         """Obtiene un valor del caché o lo genera y guarda si no existe"""
-        value = cache.get(key)
+        value = self._get(key)
         if value is None:
             value = callable_func()
-            cache.set(key, value, timeout or self.SCRAPING_RESULT_CACHE_TIME)
+            self._set(key, value, timeout or self.SCRAPING_RESULT_CACHE_TIME)
         return value
     
+    def enforce_disk_budget(self) -> int:
+        """
+        Aplica el presupuesto en bytes al caché de Django cuando es FileBasedCache
+        (el de producción). Retorna los bytes liberados.
+        """
+        self._bytes_since_budget_check = 0
+        reclaimed = enforce_directory_budget(self.blob_store.directory, get_policy('blob_cache'),
+                                             f'*{BlobStore.SUFFIX}')
+        cache_dir = self._file_cache_dir()
+        if cache_dir is not None:
+            reclaimed += enforce_directory_budget(cache_dir, self.eviction_policy,
+                                                  f'*{FileBasedCache.cache_suffix}')
+        return reclaimed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de aciertos por nivel y de desalojos del caché"""
+        stats = self.eviction_policy.get_stats()
+        stats['tiers'] = {
+            'memory': self.memory.get_stats(),
+            'disk': self.disk_stats.as_dict(),
+            'blob': self.blob_store.stats.as_dict(),
+        }
+        return stats
+    
     def clear_old_cache(self) -> None:
         """Limpia entradas antiguas del caché (se puede llamar desde una tarea periódica)"""
-        # Django Redis maneja la expiración automáticamente,
-        # pero podemos implementar lógica adicional si es necesario
-        logger.info("Limpieza de caché ejecutada")
+        # El backend maneja la expiración; aquí se aplica el presupuesto en disco
+        liberados = self.enforce_disk_budget()
+        logger.info(f"Limpieza de caché ejecutada ({liberados / (1024 * 1024):.1f} MB liberados)")
 
 
 # Instancia global del servicio
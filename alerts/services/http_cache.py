@@ -0,0 +1,311 @@
+"""
+Caché HTTP con solicitudes condicionales para los scrapers
+
+Las páginas índice (portada de hechos CMF, circulares SII, legislación DT)
+casi nunca cambian entre corridas. Este módulo guarda por URL el último cuerpo
+y sus validadores (ETag / Last-Modified) y los envía como If-None-Match /
+If-Modified-Since: ante un 304 se reutiliza el cuerpo guardado sin
+descargarlo de nuevo.
+
+La búsqueda del Congreso queda fuera: es un formulario ASP.NET cuyo estado
+(__VIEWSTATE, __EVENTVALIDATION) depende de la sesión, y lo reutiliza
+alerts.services.aspnet_form.
+
+Para servidores que no entregan validadores se compara un hash del contenido
+y solo se reescribe el registro si cambió (las estadísticas cuentan ambos
+casos).
+
+Los cuerpos guardados respetan el presupuesto en bytes del namespace
+'http_cache' (ver cache_eviction): al superarlo se desalojan respuestas por
+LRU o LFU según CACHE_EVICTION_HTTP_CACHE, igual que en el caché de PDFs.
+
+El índice vive en HTTP_CACHE_DIR o, sin esa variable, en el temporal del
+sistema. En Heroku el disco del dyno es efímero y cada corrida del Scheduler
+parte sin validadores: ahí el caché dura lo que dura el proceso y solo evita
+descargas repetidas dentro de una misma corrida.
+
+No depende de Django, así que se puede usar desde scripts/scrapers:
+
+    from alerts.services.http_cache import http_cache
+    response = http_cache.get(url, session=self.session, timeout=30)
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from alerts.services.cache_eviction import get_policy
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    last_access REAL NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_RECENCY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+CREATE INDEX IF NOT EXISTS idx_responses_hits ON responses(hits, last_access);
+"""
+
+# Columnas de desalojo agregadas después de la primera versión del índice
+_RECENCY_COLUMNS = {
+    'size': 'INTEGER NOT NULL DEFAULT 0',
+    'last_access': 'REAL NOT NULL DEFAULT 0',
+    'hits': 'INTEGER NOT NULL DEFAULT 0',
+}
+
+# Cabeceras de la respuesta que se conservan para reconstruirla ante un 304
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Content-Language')
+
+
+class ConditionalHTTPCache:
+    """Cliente GET con validadores HTTP persistidos en un índice SQLite"""
+
+    # Fracción del presupuesto escrita entre recálculos del total desde el índice
+    BUDGET_SYNC_FRACTION = 0.1
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get('HTTP_CACHE_DIR') or Path(tempfile.gettempdir()) / "http_conditional_cache"
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.sqlite3"
+        self.eviction_policy = get_policy('http_cache')
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # Total de bytes guardados estimado en este proceso (None: sin calcular)
+        self._total_lock = threading.Lock()
+        self._total_bytes = None
+        self._bytes_since_sync = 0
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'unchanged_by_hash': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,
+        }
+        self._init_index()
+
+    def _init_index(self):
+        """Crea el índice y agrega las columnas de desalojo a índices de versiones anteriores"""
+        try:
+            conn = self._connect()
+            # Solo tiene efecto al crear el archivo: permite devolver al disco lo desalojado
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            for column, definition in _RECENCY_COLUMNS.items():
+                if column not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE responses ADD COLUMN {column} {definition}")
+                    except sqlite3.OperationalError:
+                        # Otro proceso agregó la columna al mismo tiempo
+                        pass
+            if 'size' not in columns:
+                conn.execute("UPDATE responses SET size = LENGTH(body)")
+            conn.executescript(_RECENCY_INDEXES)
+        except Exception as e:
+            logger.error(f"Error inicializando caché HTTP: {e}")
+
+    def _connect(self):
+        """Conexión SQLite propia de cada hilo"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _get_cache_key(url):
+        return hashlib.md5(url.encode()).hexdigest()
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _load(self, cache_key):
+        try:
+            return self._connect().execute(
+                "SELECT etag, last_modified, content_hash, headers, body FROM responses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Error leyendo caché HTTP: {e}")
+            return None
+
+    def _touch(self, cache_key):
+        """Marca un uso del cuerpo guardado (recencia y frecuencia para el desalojo)"""
+        try:
+            self._connect().execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE cache_key = ?",
+                (time.time(), cache_key)
+            )
+        except Exception as e:
+            logger.error(f"Error actualizando caché HTTP: {e}")
+
+    def _store(self, cache_key, url, response, content_hash):
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        size = len(response.content)
+        try:
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM responses WHERE cache_key = ?", (cache_key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(cache_key, url, etag, last_modified, content_hash, headers, body, size, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (cache_key, url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 content_hash, json.dumps(headers), response.content, size, time.time())
+            )
+        except Exception as e:
+            logger.error(f"Error guardando en caché HTTP: {e}")
+            return
+
+        with self._total_lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size - (previous[0] if previous else 0)
+            self._bytes_since_sync += size
+            check = (self._total_bytes is None or self._total_bytes > self.eviction_policy.max_bytes
+                     or self._bytes_since_sync >= self.eviction_policy.max_bytes * self.BUDGET_SYNC_FRACTION)
+        if check:
+            self.enforce_budget()
+
+    def enforce_budget(self):
+        """Desaloja respuestas (LRU/LFU según la política) si el caché excede su presupuesto en bytes"""
+        policy = self.eviction_policy
+        try:
+            conn = self._connect()
+            total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            with self._total_lock:
+                self._total_bytes = total_bytes
+                self._bytes_since_sync = 0
+            if total_bytes <= policy.max_bytes:
+                return
+            order_by = "hits, last_access" if policy.order == 'lfu' else "last_access, hits"
+            candidates = conn.execute(f"SELECT cache_key, size FROM responses ORDER BY {order_by}").fetchall()
+            sizes = dict(candidates)
+            victims = policy.select_victims(total_bytes, candidates)
+            if not victims:
+                return
+            conn.executemany("DELETE FROM responses WHERE cache_key = ?", [(key,) for key in victims])
+            conn.execute("PRAGMA incremental_vacuum")
+        except Exception as e:
+            logger.error(f"Error aplicando presupuesto del caché HTTP: {e}")
+            return
+
+        reclaimed = sum(sizes[key] for key in victims)
+        with self._total_lock:
+            self._total_bytes -= reclaimed
+        policy.record_eviction(len(victims), reclaimed)
+
+    def get(self, url, session=None, headers=None, params=None, **kwargs):
+        """
+        GET condicional.
+
+        Args:
+            url: URL a descargar
+            session: requests.Session a usar (cookies y cabeceras del scraper)
+            headers, params, **kwargs: Igual que en requests.get
+
+        Returns:
+            requests.Response; ante un 304, una respuesta 200 armada con el
+            cuerpo guardado.
+        """
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        cache_key = self._get_cache_key(full_url)
+        cached = self._load(cache_key)
+
+        request_headers = dict(headers or {})
+        if cached:
+            etag, last_modified = cached[0], cached[1]
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+        response = (session or requests).get(full_url, headers=request_headers, **kwargs)
+        self._count(requests=1)
+
+        if response.status_code == 304 and cached:
+            self._touch(cache_key)
+            self.eviction_policy.record_hit()
+            return self._rebuild_response(response, cached)
+
+        if response.status_code != 200:
+            return response
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        unchanged = bool(cached) and cached[2] == content_hash
+        self._count(bytes_downloaded=len(response.content), unchanged_by_hash=int(unchanged))
+        if not unchanged or response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self._store(cache_key, full_url, response, content_hash)
+        else:
+            self._touch(cache_key)
+        if unchanged:
+            self.eviction_policy.record_hit()
+        else:
+            self.eviction_policy.record_miss()
+        return response
+
+    def _rebuild_response(self, not_modified, cached):
+        """Arma una respuesta 200 con el cuerpo guardado a partir del 304 del servidor"""
+        body = cached[4]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict(json.loads(cached[3]))
+        # El 304 puede traer validadores nuevos
+        for name in ('ETag', 'Last-Modified'):
+            if name in not_modified.headers:
+                response.headers[name] = not_modified.headers[name]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+
+        self._count(not_modified=1, bytes_saved=len(body))
+        logger.info(f"♻️ 304 Not Modified, cuerpo reutilizado del caché: {response.url[:60]}")
+        return response
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def log_summary(self):
+        """Resumen de la corrida: solicitudes, 304, contenido sin cambios y bytes ahorrados"""
+        stats = self.get_stats()
+        if not stats['requests']:
+            return
+        logger.info(
+            f"🌐 Caché HTTP: {stats['requests']} solicitudes, {stats['not_modified']} no modificadas (304), "
+            f"{stats['unchanged_by_hash']} sin cambios por hash, "
+            f"{stats['bytes_saved'] / 1024:.1f} KB ahorrados, {stats['bytes_downloaded'] / 1024:.1f} KB descargados"
+        )
+
+
+# Instancia global del caché HTTP
+http_cache = ConditionalHTTPCache()
+atexit.register(http_cache.log_summary)
@@ -1,8 +1,21 @@
 """
 Servicio para registrar y gestionar métricas del sistema
+
+MetricsCollector puede trabajar en modo buffered: los contadores de la sesión
+y los PDFProcessingMetric se acumulan en memoria y se escriben con
+bulk_create/bulk_update en flush(), que se llama al cerrar cada etapa
+(etapa()), al terminar la sesión, cuando pasan FLUSH_INTERVALO segundos o se
+juntan FLUSH_MAX_PENDIENTES registros, y al salir el proceso (atexit). Si el
+scraping lanza una excepción, las métricas acumuladas se escriben igual.
+
+Las métricas nunca interrumpen el scraping: si no se puede crear la fila de la
+sesión, el recolector queda inactivo, y un flush que falla se registra en el
+log y conserva lo pendiente para el siguiente.
 """
+import atexit
+import os
+import threading
 import time
-import psutil
 import logging
 from contextlib import contextmanager
 from datetime import datetime
@@ -11,11 +24,28 @@ from alerts.models import ScrapingMetric, PDFProcessingMetric, APICallMetric
 
 logger = logging.getLogger(__name__)
 
+# Campos de ScrapingMetric que cambian durante la sesión
+CAMPOS_CONTADORES = ['total_publicaciones', 'publicaciones_relevantes', 'pdfs_descargados', 'pdfs_desde_cache']
+
+# Campos de PDFProcessingMetric que se pueden modificar después de escrito
+CAMPOS_PDF = ['exitoso', 'mensaje_error', 'metodo_extraccion', 'tiempo_extraccion',
+              'tiempo_analisis', 'tiempo_total', 'num_paginas', 'tamano_bytes']
+
 
 class MetricsCollector:
     """Recolector de métricas para el proceso de scraping"""
-    
-    def __init__(self):
+
+    # Flush automático en modo buffered
+    FLUSH_INTERVALO = float(os.getenv('METRICS_FLUSH_SEGUNDOS', '30'))
+    FLUSH_MAX_PENDIENTES = 200
+
+    def __init__(self, buffered: bool = False):
+        """
+        Args:
+            buffered: Acumular métricas en memoria y escribirlas por lotes
+                      en lugar de guardar en cada llamada.
+        """
+        self.buffered = buffered
         self.current_metric: Optional[ScrapingMetric] = None
         self.start_time: Optional[float] = None
         self.pdf_counters = {
@@ -24,23 +54,39 @@ class MetricsCollector:
             'descargados': 0
         }
         self.pdf_times = []
-        
-    def start_scraping(self, fecha: datetime) -> ScrapingMetric:
-        """Inicia el registro de métricas para una sesión de scraping"""
+
+        # Estado del modo buffered
+        self._lock = threading.RLock()
+        self._pdfs_nuevos = []
+        self._pdfs_modificados = {}
+        self._contadores_sucios = False
+        self._ultimo_flush = time.monotonic()
+
+    def start_scraping(self, fecha: datetime) -> Optional[ScrapingMetric]:
+        """Inicia el registro de métricas para una sesión de scraping (None si no se pudo)"""
         self.start_time = time.time()
-        self.current_metric = ScrapingMetric.objects.create(
-            fecha_scraping=fecha,
-            exitoso=False  # Se marcará como exitoso al final si todo va bien
-        )
-        
-        # Registrar uso de memoria inicial
+        self._ultimo_flush = time.monotonic()
+
+        # Registrar uso de memoria inicial (psutil es opcional)
+        memoria_usada_mb = None
         try:
+            import psutil
             process = psutil.Process()
-            self.current_metric.memoria_usada_mb = process.memory_info().rss / 1024 / 1024
-            self.current_metric.save()
+            memoria_usada_mb = process.memory_info().rss / 1024 / 1024
         except:
             pass
-            
+
+        # La fila de la sesión se crea de inmediato para que quede registro aunque el proceso muera
+        try:
+            self.current_metric = ScrapingMetric.objects.create(
+                fecha_scraping=fecha,
+                exitoso=False,  # Se marcará como exitoso al final si todo va bien
+                memoria_usada_mb=memoria_usada_mb
+            )
+        except Exception as e:
+            logger.error(f"No se pudo iniciar el registro de métricas: {e}")
+            self.current_metric = None
+
         return self.current_metric
     
     def end_scraping(self, exitoso: bool = True, mensaje_error: str = None):
@@ -60,30 +106,101 @@ class MetricsCollector:
         # Calcular promedios
         if self.pdf_times:
             self.current_metric.tiempo_descarga_promedio = sum(self.pdf_times) / len(self.pdf_times)
-            
-        self.current_metric.save()
-        
+
+        with self._lock:
+            try:
+                self._flush_pdfs()
+                self.current_metric.save()
+                self._contadores_sucios = False
+            except Exception as e:
+                logger.error(f"Error guardando métricas de la sesión: {e}")
+
     def add_publicacion(self, es_relevante: bool = False):
         """Registra una publicación procesada"""
         if self.current_metric:
             self.current_metric.total_publicaciones += 1
             if es_relevante:
                 self.current_metric.publicaciones_relevantes += 1
+            self._guardar_contadores()
+
+    def flush(self):
+        """Escribe en la base de datos las métricas acumuladas (modo buffered)"""
+        with self._lock:
+            self._ultimo_flush = time.monotonic()
+            try:
+                self._flush_pdfs()
+                if self._contadores_sucios and self.current_metric:
+                    self.current_metric.pdfs_descargados = self.pdf_counters['descargados']
+                    self.current_metric.pdfs_desde_cache = self.pdf_counters['desde_cache']
+                    self.current_metric.save(update_fields=CAMPOS_CONTADORES)
+                    self._contadores_sucios = False
+            except Exception as e:
+                logger.error(f"Error escribiendo métricas acumuladas: {e}")
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        """Delimita una etapa del scraping; al salir (incluso con error) se hace flush"""
+        inicio = time.time()
+        try:
+            yield
+        finally:
+            if self.buffered:
+                self.flush()
+            logger.debug(f"Etapa '{nombre}' completada en {time.time() - inicio:.2f}s")
+
+    def _flush_pdfs(self):
+        """bulk_create de los PDFs nuevos y bulk_update de los ya escritos que cambiaron"""
+        if self._pdfs_nuevos:
+            PDFProcessingMetric.objects.bulk_create(self._pdfs_nuevos, batch_size=self.FLUSH_MAX_PENDIENTES)
+            self._pdfs_nuevos = []
+        if self._pdfs_modificados:
+            PDFProcessingMetric.objects.bulk_update(
+                list(self._pdfs_modificados.values()), CAMPOS_PDF, batch_size=self.FLUSH_MAX_PENDIENTES
+            )
+            self._pdfs_modificados = {}
+
+    def _flush_si_corresponde(self):
+        pendientes = len(self._pdfs_nuevos) + len(self._pdfs_modificados)
+        if (pendientes >= self.FLUSH_MAX_PENDIENTES
+                or time.monotonic() - self._ultimo_flush >= self.FLUSH_INTERVALO):
+            self.flush()
+
+    def _guardar_contadores(self):
+        if not self.buffered:
             self.current_metric.save()
-    
+            return
+        with self._lock:
+            self._contadores_sucios = True
+            self._flush_si_corresponde()
+
+    def _guardar_pdf(self, pdf_metric: PDFProcessingMetric):
+        """save() inmediato o, en modo buffered, encolar para el próximo flush"""
+        if not self.buffered:
+            pdf_metric.save()
+            return
+        with self._lock:
+            if pdf_metric.pk is None:
+                if not any(p is pdf_metric for p in self._pdfs_nuevos):
+                    self._pdfs_nuevos.append(pdf_metric)
+            else:
+                self._pdfs_modificados[pdf_metric.pk] = pdf_metric
+            self._flush_si_corresponde()
+
     @contextmanager
     def track_pdf_processing(self, url: str, titulo: str):
         """Context manager para trackear el procesamiento de un PDF"""
         start_time = time.time()
         pdf_metric = None
-        
+
         if self.current_metric:
-            pdf_metric = PDFProcessingMetric.objects.create(
+            pdf_metric = PDFProcessingMetric(
                 scraping_metric=self.current_metric,
                 url_pdf=url,
                 titulo=titulo[:500]  # Limitar longitud del título
             )
-        
+            if not self.buffered:
+                pdf_metric.save()
+
         try:
             yield pdf_metric
             if pdf_metric:
@@ -96,28 +213,33 @@ class MetricsCollector:
         finally:
             if pdf_metric:
                 total_time = time.time() - start_time
-                pdf_metric.save()
+                pdf_metric.tiempo_total = total_time
+                self._guardar_pdf(pdf_metric)
                 self.pdf_times.append(total_time)
     
     def record_pdf_download(self, tiempo_descarga: float, desde_cache: bool = False):
         """Registra una descarga de PDF"""
-        if desde_cache:
-            self.pdf_counters['desde_cache'] += 1
-        else:
-            self.pdf_counters['descargados'] += 1
-            
+        # Se llama desde los hilos del generador
+        with self._lock:
+            if desde_cache:
+                self.pdf_counters['desde_cache'] += 1
+            else:
+                self.pdf_counters['descargados'] += 1
+            if self.buffered and self.current_metric:
+                self._guardar_contadores()
+
     def record_pdf_extraction(self, pdf_metric: PDFProcessingMetric, metodo: str, tiempo: float):
         """Registra el método y tiempo de extracción de un PDF"""
         if pdf_metric:
             pdf_metric.metodo_extraccion = metodo
             pdf_metric.tiempo_extraccion = tiempo
-            pdf_metric.save()
+            self._guardar_pdf(pdf_metric)
     
     def record_pdf_analysis(self, pdf_metric: PDFProcessingMetric, tiempo: float):
         """Registra el tiempo de análisis (resumen) de un PDF"""
         if pdf_metric:
             pdf_metric.tiempo_analisis = tiempo
-            pdf_metric.save()
+            self._guardar_pdf(pdf_metric)
     
     def record_pdf_info(self, pdf_metric: PDFProcessingMetric, num_paginas: int = None, tamano_bytes: int = None):
         """Registra información adicional del PDF"""
@@ -126,7 +248,7 @@ class MetricsCollector:
                 pdf_metric.num_paginas = num_paginas
             if tamano_bytes:
                 pdf_metric.tamano_bytes = tamano_bytes
-            pdf_metric.save()
+            self._guardar_pdf(pdf_metric)
 
 
 class APIMetricsCollector:
@@ -165,5 +287,8 @@ class APIMetricsCollector:
 
 
 # Instancias globales para uso fácil
-metrics_collector = MetricsCollector()
-api_metrics = APIMetricsCollector()
\ No newline at end of file
+metrics_collector = MetricsCollector(buffered=os.getenv('METRICS_BUFFERED', '1') == '1')
+api_metrics = APIMetricsCollector()
+
+# Lo acumulado que no alcanzó a escribirse se guarda al salir el proceso
+atexit.register(metrics_collector.flush)
\ No newline at end of file
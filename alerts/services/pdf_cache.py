@@ -1,17 +1,56 @@
 """
 Sistema de caché para PDFs de CMF
 Almacena PDFs descargados para evitar descargas repetidas y mejorar confiabilidad
+
+Los PDFs se guardan como archivos y su metadata en un índice SQLite
+(index.sqlite3) con inserción y búsqueda O(1) por clave e índices por
+antigüedad y tamaño para la limpieza. SQLite en modo WAL permite usar el
+caché desde varios hilos y procesos a la vez.
+
+Además de la expiración por antigüedad, el caché respeta el presupuesto en
+bytes del namespace 'pdf_cache' (ver cache_eviction), desalojando por LRU o
+LFU según CACHE_EVICTION_PDF_CACHE. put() lleva un total de bytes en memoria
+y solo consulta el índice completo cuando ese total supera el presupuesto o
+cuando se escribió BUDGET_SYNC_FRACTION del presupuesto desde la última
+consulta (otros procesos también escriben en el índice).
 """
 import os
 import hashlib
 import json
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
 
+from alerts.services.cache_eviction import get_policy
+
 logger = logging.getLogger(__name__)
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_size ON entries(size);
+"""
+
+_RECENCY_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_hits ON entries(hits, last_access);
+"""
+
+
 class PDFCache:
+    # Fracción del presupuesto escrita entre recálculos del total desde el índice
+    BUDGET_SYNC_FRACTION = 0.1
+
     def __init__(self, cache_dir=None, max_age_hours=24):
         """
         Inicializa el sistema de caché de PDFs
@@ -28,26 +67,69 @@ class PDFCache:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.max_age = timedelta(hours=max_age_hours)
-        self.metadata_file = self.cache_dir / "metadata.json"
-        self.metadata = self._load_metadata()
+        self.index_file = self.cache_dir / "index.sqlite3"
+        self.eviction_policy = get_policy('pdf_cache')
+        self._local = threading.local()
+        # Total de bytes del índice estimado en este proceso (None: sin calcular)
+        self._total_lock = threading.Lock()
+        self._total_bytes = None
+        self._bytes_since_sync = 0
+        self._init_index()
         
-    def _load_metadata(self):
-        """Carga metadata del caché desde archivo"""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Error cargando metadata de caché: {e}")
-        return {}
+    def _connect(self):
+        """Conexión SQLite propia de cada hilo (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
     
-    def _save_metadata(self):
-        """Guarda metadata del caché a archivo"""
+    def _init_index(self):
+        """Crea el índice y migra el metadata.json antiguo si existe"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2, default=str)
+            conn = self._connect()
+            conn.executescript(_SCHEMA)
+            # Los índices creados por versiones anteriores no tienen columnas de recencia
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            for column in ('last_access', 'hits'):
+                if column not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE entries ADD COLUMN {column} "
+                                     f"{'REAL' if column == 'last_access' else 'INTEGER'} NOT NULL DEFAULT 0")
+                    except sqlite3.OperationalError:
+                        # Otro proceso agregó la columna al mismo tiempo
+                        pass
+            conn.executescript(_RECENCY_INDEXES)
+            self._migrate_legacy_metadata(conn)
+        except Exception as e:
+            logger.error(f"Error inicializando índice de caché: {e}")
+
+    def _migrate_legacy_metadata(self, conn):
+        """Importa el metadata.json de versiones anteriores del caché"""
+        legacy_file = self.cache_dir / "metadata.json"
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                metadata = json.load(f)
+            rows = []
+            for key, info in metadata.items():
+                if self._get_cache_path(key).exists():
+                    timestamp = datetime.fromisoformat(info['timestamp']).timestamp()
+                    rows.append((key, info['url'], timestamp, info.get('size', 0), timestamp))
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (cache_key, url, timestamp, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", rows
+            )
+            legacy_file.rename(legacy_file.with_suffix('.json.migrated'))
+            logger.info(f"Metadata de caché migrada a SQLite: {len(rows)} entradas")
+        except FileNotFoundError:
+            # Otro proceso ya hizo la migración
+            pass
         except Exception as e:
-            logger.error(f"Error guardando metadata de caché: {e}")
+            logger.warning(f"Error migrando metadata de caché: {e}")
     
     def _get_cache_key(self, url):
         """Genera una clave única para la URL"""
@@ -57,15 +139,15 @@ class PDFCache:
         """Obtiene la ruta del archivo cacheado"""
         return self.cache_dir / f"{cache_key}.pdf"
     
+    def _min_valid_timestamp(self):
+        return time.time() - self.max_age.total_seconds()
+
     def _is_cache_valid(self, cache_key):
         """Verifica si el caché es válido (no ha expirado)"""
-        if cache_key not in self.metadata:
-            return False
-        
-        cached_time = datetime.fromisoformat(self.metadata[cache_key]['timestamp'])
-        age = datetime.now() - cached_time
-        
-        return age < self.max_age
+        row = self._connect().execute(
+            "SELECT timestamp FROM entries WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        return row is not None and row[0] >= self._min_valid_timestamp()
     
     def get(self, url):
         """
@@ -80,14 +162,23 @@ class PDFCache:
         cache_key = self._get_cache_key(url)
         cache_path = self._get_cache_path(cache_key)
         
-        if cache_path.exists() and self._is_cache_valid(cache_key):
-            try:
+        try:
+            if self._is_cache_valid(cache_key):
                 with open(cache_path, 'rb') as f:
-                    logger.info(f"✅ PDF obtenido del caché: {url[:50]}...")
-                    return f.read()
-            except Exception as e:
-                logger.error(f"Error leyendo PDF del caché: {e}")
+                    content = f.read()
+                self._connect().execute(
+                    "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE cache_key = ?",
+                    (time.time(), cache_key)
+                )
+                self.eviction_policy.record_hit()
+                logger.info(f"✅ PDF obtenido del caché: {url[:50]}...")
+                return content
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error leyendo PDF del caché: {e}")
         
+        self.eviction_policy.record_miss()
         return None
     
     def put(self, url, pdf_content):
@@ -105,65 +196,126 @@ class PDFCache:
         cache_path = self._get_cache_path(cache_key)
         
         try:
-            # Guardar PDF
-            with open(cache_path, 'wb') as f:
+            # Escribir a un archivo temporal y renombrar: un lector nunca ve un PDF a medias
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
                 f.write(pdf_content)
+            os.replace(tmp_path, cache_path)
             
-            # Actualizar metadata
-            self.metadata[cache_key] = {
-                'url': url,
-                'timestamp': datetime.now().isoformat(),
-                'size': len(pdf_content)
-            }
-            self._save_metadata()
+            # Actualizar índice (una fila, sin reescribir el resto)
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM entries WHERE cache_key = ?", (cache_key,)).fetchone()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (cache_key, url, timestamp, size, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (cache_key, url, now, len(pdf_content), now)
+            )
             
             logger.info(f"📦 PDF guardado en caché: {url[:50]}...")
         except Exception as e:
             logger.error(f"Error guardando PDF en caché: {e}")
+            return
+
+        with self._total_lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(pdf_content) - (previous[0] if previous else 0)
+            self._bytes_since_sync += len(pdf_content)
+            check = (self._total_bytes is None or self._total_bytes > self.eviction_policy.max_bytes
+                     or self._bytes_since_sync >= self.eviction_policy.max_bytes * self.BUDGET_SYNC_FRACTION)
+        if check:
+            self.enforce_budget()
+
+    def enforce_budget(self):
+        """Desaloja entradas (LRU/LFU según la política) si el caché excede su presupuesto en bytes"""
+        policy = self.eviction_policy
+        try:
+            conn = self._connect()
+            total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            with self._total_lock:
+                self._total_bytes = total_bytes
+                self._bytes_since_sync = 0
+            if total_bytes <= policy.max_bytes:
+                return
+            order_by = "hits, last_access" if policy.order == 'lfu' else "last_access, hits"
+            candidates = conn.execute(f"SELECT cache_key, size FROM entries ORDER BY {order_by}")
+            sizes = {}
+
+            def tracked(rows):
+                for key, size in rows:
+                    sizes[key] = size
+                    yield key, size
+
+            victims = policy.select_victims(total_bytes, tracked(candidates))
+        except Exception as e:
+            logger.error(f"Error aplicando presupuesto del caché de PDFs: {e}")
+            return
+
+        for cache_key in victims:
+            try:
+                self._get_cache_path(cache_key).unlink(missing_ok=True)
+            except Exception as e:
+                logger.error(f"Error eliminando caché: {e}")
+        if victims:
+            conn.executemany("DELETE FROM entries WHERE cache_key = ?", [(key,) for key in victims])
+        reclaimed = sum(sizes[key] for key in victims)
+        with self._total_lock:
+            self._total_bytes -= reclaimed
+        policy.record_eviction(len(victims), reclaimed)
     
     def clear_old(self):
         """Limpia entradas de caché obsoletas"""
-        current_time = datetime.now()
-        keys_to_remove = []
-        
-        for cache_key, info in self.metadata.items():
-            cached_time = datetime.fromisoformat(info['timestamp'])
-            if current_time - cached_time > self.max_age:
-                keys_to_remove.append(cache_key)
-                cache_path = self._get_cache_path(cache_key)
-                if cache_path.exists():
-                    try:
-                        cache_path.unlink()
-                        logger.info(f"🗑️ Caché obsoleto eliminado: {cache_key}")
-                    except Exception as e:
-                        logger.error(f"Error eliminando caché: {e}")
+        try:
+            conn = self._connect()
+            cutoff = self._min_valid_timestamp()
+            # Solo se recorren las entradas vencidas, vía el índice por antigüedad
+            expired = conn.execute(
+                "SELECT cache_key, size FROM entries WHERE timestamp < ?", (cutoff,)
+            ).fetchall()
+        except Exception as e:
+            logger.error(f"Error consultando caché obsoleto: {e}")
+            return
         
-        # Actualizar metadata
-        for key in keys_to_remove:
-            del self.metadata[key]
+        removed = 0
+        removed_bytes = 0
+        for cache_key, size in expired:
+            try:
+                # Fila y archivo bajo la misma condición: si otro proceso renovó
+                # la entrada entre la consulta y el borrado, el PDF se conserva
+                deleted = conn.execute(
+                    "DELETE FROM entries WHERE cache_key = ? AND timestamp < ?", (cache_key, cutoff)
+                ).rowcount
+                if deleted:
+                    self._get_cache_path(cache_key).unlink(missing_ok=True)
+                    removed += 1
+                    removed_bytes += size
+                    logger.info(f"🗑️ Caché obsoleto eliminado: {cache_key}")
+            except Exception as e:
+                logger.error(f"Error eliminando caché: {e}")
         
-        if keys_to_remove:
-            self._save_metadata()
-            logger.info(f"Limpieza de caché completada: {len(keys_to_remove)} archivos eliminados")
+        if removed:
+            with self._total_lock:
+                if self._total_bytes is not None:
+                    self._total_bytes -= removed_bytes
+            logger.info(f"Limpieza de caché completada: {removed} archivos eliminados")
     
     def get_stats(self):
         """Obtiene estadísticas del caché"""
-        total_size = 0
-        valid_count = 0
-        expired_count = 0
-        
-        for cache_key, info in self.metadata.items():
-            total_size += info.get('size', 0)
-            if self._is_cache_valid(cache_key):
-                valid_count += 1
-            else:
-                expired_count += 1
+        total_files, total_size, valid_count = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+            "COALESCE(SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END), 0) FROM entries",
+            (self._min_valid_timestamp(),)
+        ).fetchone()
         
+        eviction = self.eviction_policy.get_stats()
         return {
-            'total_files': len(self.metadata),
+            'total_files': total_files,
             'valid_files': valid_count,
-            'expired_files': expired_count,
-            'total_size_mb': total_size / (1024 * 1024)
+            'expired_files': total_files - valid_count,
+            'total_size_mb': total_size / (1024 * 1024),
+            'max_size_mb': eviction['max_mb'],
+            'hit_ratio': eviction['hit_ratio'],
+            'bytes_reclaimed': eviction['bytes_reclaimed'],
         }
 
 # Instancia global del caché
@@ -2,6 +2,9 @@
 Servicio mejorado para extracción de texto de PDFs con múltiples métodos de fallback
 """
 import logging
+import re
+import string
+import zlib
 from io import BytesIO
 from typing import Tuple, Optional
 import PyPDF2
@@ -15,27 +18,64 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+# Patrones precompilados para la extracción forzada (operan sobre bytes)
+_LITERAL_RE = re.compile(rb'\(((?:[^()\\]|\\.)*)\)')
+_PRINTABLE_RUN_RE = re.compile(rb'[\x20-\x7E]{20,}')
+_NON_PRINTABLE_RE = re.compile(rb'[^\x20-\x7E\n\r\t]+')
+_WHITESPACE_RE = re.compile(rb'\s+')
+
+# Validación de texto: se evalúa una ventana muestreada, no el documento completo
+_VALIDITY_SAMPLE_CHARS = 6000
+_LEGIBLE_ASCII_TABLE = str.maketrans(
+    '', '', string.ascii_letters + string.digits + string.whitespace + '.,;:-()[]{}/@#$%&*+=|<>"\''
+)
+_FORCE_TEXT_LIMIT = 10000
+
+# OCR adaptativo: primera pasada a baja resolución y reintento solo de las
+# páginas con confianza baja o poco texto, a alta resolución y con preprocesamiento
+OCR_LOW_DPI = 150
+OCR_HIGH_DPI = 300
+OCR_MIN_CONFIDENCE = 70
+OCR_MIN_CHARS = 40
+
 
 class PDFExtractor:
     """Extractor robusto de texto de PDFs con múltiples métodos de fallback"""
     
-    def __init__(self):
+    def __init__(self, ocr_mode: str = 'adaptive'):
+        """
+        Args:
+            ocr_mode: 'adaptive' (una sola rasterización, reintento por página
+                según confianza de tesseract) o 'legacy' (OCR básico y luego
+                OCR mejorado sobre el documento completo)
+        """
         self.methods_priority = [
             ('pypdf2', self._extract_with_pypdf2),
             ('pdfminer', self._extract_with_pdfminer),
             ('pypdf_fallback', self._extract_with_pypdf_fallback),
             ('force_text', self._extract_force_text),
-            ('ocr', self._extract_with_ocr),
-            ('ocr_enhanced', self._extract_with_enhanced_ocr)
         ]
+        if ocr_mode == 'legacy':
+            self.methods_priority += [
+                ('ocr', self._extract_with_ocr),
+                ('ocr_enhanced', self._extract_with_enhanced_ocr)
+            ]
+        else:
+            self.methods_priority.append(('ocr_adaptive', self._extract_with_adaptive_ocr))
     
-    def extract_text(self, pdf_content: bytes, max_pages: int = 2) -> Tuple[str, str]:
+    def extract_text(self, pdf_content: bytes, max_pages: int = 2,
+                     max_chars: Optional[int] = None) -> Tuple[str, str]:
         """
         Extrae texto de un PDF usando múltiples métodos con fallback automático.
         
         Args:
             pdf_content: Contenido del PDF en bytes
             max_pages: Número máximo de páginas a procesar
+            max_chars: Presupuesto de caracteres del consumidor. Si se indica,
+                la extracción se detiene en la primera página que lo alcanza
+                (el texto se devuelve por páginas completas, sin truncar).
+                La extracción forzada no distingue páginas: ignora el
+                presupuesto y entrega hasta _FORCE_TEXT_LIMIT caracteres.
             
         Returns:
             Tupla (texto_extraido, metodo_usado)
@@ -43,7 +83,7 @@ class PDFExtractor:
         for method_name, method_func in self.methods_priority:
             try:
                 logger.info(f"Intentando extracción con método: {method_name}")
-                text = method_func(pdf_content, max_pages)
+                text = method_func(pdf_content, max_pages, max_chars)
                 
                 # Validar que el texto extraído sea útil
                 if self._is_valid_text(text):
@@ -64,22 +104,47 @@ class PDFExtractor:
         if not text or len(text.strip()) < min_length:
             return False
         
-        # Contar palabras reales (no solo caracteres)
-        words = text.split()
+        # Contar palabras reales (no solo caracteres); basta con encontrar las mínimas
+        words = text.split(maxsplit=min_word_count)
         if len(words) < min_word_count:
             return False
         
         # Verificar que no sea solo basura - MUY leniente
         # Aceptar cualquier texto que tenga al menos 30% de caracteres legibles
-        alphanumeric_ratio = sum(c.isalnum() or c.isspace() or c in '.,;:-()[]{}/@#$%&*+=|<>"\'' for c in text) / len(text)
+        alphanumeric_ratio = self._legible_ratio(self._sample_text(text))
         if alphanumeric_ratio < 0.3:  # MUY leniente
             return False
         
         return True
     
-    def _extract_with_pypdf2(self, pdf_content: bytes, max_pages: int) -> str:
+    @staticmethod
+    def _sample_text(text: str, size: int = _VALIDITY_SAMPLE_CHARS) -> str:
+        """Toma una ventana representativa (inicio, centro y final) del texto"""
+        if len(text) <= size:
+            return text
+        third = size // 3
+        middle = len(text) // 2
+        return text[:third] + text[middle - third // 2:middle + third // 2] + text[-third:]
+    
+    @staticmethod
+    def _legible_ratio(text: str) -> float:
+        """Proporción de caracteres legibles, resolviendo el ASCII con str.translate"""
+        if not text:
+            return 0.0
+        # Lo que sobrevive a la tabla es no-ASCII o basura: solo eso se revisa en Python
+        residue = text.translate(_LEGIBLE_ASCII_TABLE)
+        illegible = sum(1 for c in residue if not (c.isalnum() or c.isspace()))
+        return (len(text) - illegible) / len(text)
+    
+    @staticmethod
+    def _budget_reached(parts, max_chars: Optional[int]) -> bool:
+        """Indica si las páginas acumuladas ya cubren el presupuesto de caracteres"""
+        return max_chars is not None and sum(len(p) for p in parts) >= max_chars
+    
+    def _extract_with_pypdf2(self, pdf_content: bytes, max_pages: int,
+                             max_chars: Optional[int] = None) -> str:
         """Extrae texto usando PyPDF2"""
-        text = ""
+        parts = []
         with BytesIO(pdf_content) as pdf_file:
             reader = PyPDF2.PdfReader(pdf_file)
             num_pages = min(len(reader.pages), max_pages)
@@ -88,33 +153,64 @@ class PDFExtractor:
                 page = reader.pages[i]
                 page_text = page.extract_text()
                 if page_text:
-                    text += page_text + "\n"
+                    parts.append(page_text + "\n")
+                if self._budget_reached(parts, max_chars):
+                    break
         
-        return text.strip()
+        return "".join(parts).strip()
     
-    def _extract_with_pdfminer(self, pdf_content: bytes, max_pages: int) -> str:
+    def _extract_with_pdfminer(self, pdf_content: bytes, max_pages: int,
+                               max_chars: Optional[int] = None) -> str:
         """Extrae texto usando PDFMiner"""
+        if max_chars is None:
+            with BytesIO(pdf_content) as pdf_file:
+                text = extract_text(pdf_file, maxpages=max_pages)
+            return text.strip()
+        
+        # Con presupuesto: interpretar página a página para poder cortar antes
+        from io import StringIO
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        
+        output = StringIO()
         with BytesIO(pdf_content) as pdf_file:
-            text = extract_text(pdf_file, maxpages=max_pages)
-        return text.strip()
+            rsrcmgr = PDFResourceManager()
+            device = TextConverter(rsrcmgr, output, laparams=LAParams())
+            interpreter = PDFPageInterpreter(rsrcmgr, device)
+            try:
+                for page in PDFPage.get_pages(pdf_file, maxpages=max_pages):
+                    interpreter.process_page(page)
+                    if output.tell() >= max_chars:
+                        break
+            finally:
+                device.close()
+        return output.getvalue().strip()
     
-    def _extract_with_ocr(self, pdf_content: bytes, max_pages: int) -> str:
+    def _extract_with_ocr(self, pdf_content: bytes, max_pages: int,
+                          max_chars: Optional[int] = None) -> str:
         """Extrae texto usando OCR básico"""
-        text = ""
-        images = convert_from_bytes(pdf_content, first_page=1, last_page=max_pages, dpi=200)
-        
-        for i, image in enumerate(images):
-            logger.info(f"Procesando página {i+1} con OCR")
-            page_text = pytesseract.image_to_string(image, lang='spa')
-            text += page_text + "\n"
+        parts = []
+        # Rasterizar de a una página: el OCR es el método más caro
+        for page_num in range(1, max_pages + 1):
+            images = convert_from_bytes(pdf_content, first_page=page_num, last_page=page_num, dpi=200)
+            if not images:
+                break
+            logger.info(f"Procesando página {page_num} con OCR")
+            page_text = pytesseract.image_to_string(images[0], lang='spa')
+            parts.append(page_text + "\n")
+            if self._budget_reached(parts, max_chars):
+                break
         
-        return text.strip()
+        return "".join(parts).strip()
     
-    def _extract_with_pypdf_fallback(self, pdf_content: bytes, max_pages: int) -> str:
+    def _extract_with_pypdf_fallback(self, pdf_content: bytes, max_pages: int,
+                                     max_chars: Optional[int] = None) -> str:
         """Extrae texto usando pypdf (alternativa a PyPDF2)"""
         try:
             import pypdf
-            text = ""
+            parts = []
             with BytesIO(pdf_content) as pdf_file:
                 reader = pypdf.PdfReader(pdf_file)
                 num_pages = min(len(reader.pages), max_pages)
@@ -123,47 +219,100 @@ class PDFExtractor:
                     page = reader.pages[i]
                     page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\n"
+                        parts.append(page_text + "\n")
+                    if self._budget_reached(parts, max_chars):
+                        break
             
-            return text.strip()
+            return "".join(parts).strip()
         except:
             return ""
     
-    def _extract_force_text(self, pdf_content: bytes, max_pages: int) -> str:
-        """Extracción forzada buscando cualquier texto legible en el PDF"""
+    def _extract_force_text(self, pdf_content: bytes, max_pages: int,
+                            max_chars: Optional[int] = None) -> str:
+        """
+        Extracción forzada buscando cualquier texto legible en el PDF.
+        
+        Solo recorre streams de contenido (descomprimiendo FlateDecode); los
+        streams binarios (imágenes, fuentes) se descartan sin escanearse.
+        
+        Sin límites de página no se puede respetar max_chars sin cortar texto,
+        así que se ignora y el resultado se limita a _FORCE_TEXT_LIMIT.
+        """
         try:
-            # Decodificar el PDF buscando texto
-            pdf_str = pdf_content.decode('latin-1', errors='ignore')
+            limit = _FORCE_TEXT_LIMIT
+            if b'stream' in pdf_content:
+                content_streams = list(self._iter_content_streams(pdf_content))
+            else:
+                # PDF sin streams: escanear el binario completo
+                content_streams = [pdf_content]
             
-            # Buscar patrones de texto entre delimitadores de PDF
-            import re
             # Buscar texto entre paréntesis (formato común en PDFs)
-            matches = re.findall(r'\((.*?)\)', pdf_str)
-            text = ' '.join(matches)
+            chunks = []
+            collected = 0
+            for data in content_streams:
+                for match in _LITERAL_RE.finditer(data):
+                    chunks.append(match.group(1))
+                    collected += len(match.group(1)) + 1
+                    if collected >= limit:
+                        break
+                if collected >= limit:
+                    break
+            text = b' '.join(chunks)
             
             # También buscar secuencias de caracteres imprimibles
             if len(text) < 100:
-                ascii_matches = re.findall(r'[\x20-\x7E]{20,}', pdf_str)
-                text += ' '.join(ascii_matches)
+                runs = []
+                for data in content_streams:
+                    runs.extend(_PRINTABLE_RUN_RE.findall(data))
+                    if sum(len(r) for r in runs) >= limit:
+                        break
+                text += b' '.join(runs)
             
             # Limpiar el texto
-            text = re.sub(r'[^\x20-\x7E\n\r\t]+', ' ', text)
-            text = re.sub(r'\s+', ' ', text)
+            text = _NON_PRINTABLE_RE.sub(b' ', text)
+            text = _WHITESPACE_RE.sub(b' ', text)
             
-            return text.strip()[:10000]  # Limitar a 10k caracteres
-        except:
+            return text.decode('latin-1').strip()[:limit]
+        except Exception:
             return ""
     
-    def _extract_with_enhanced_ocr(self, pdf_content: bytes, max_pages: int) -> str:
+    @staticmethod
+    def _iter_content_streams(pdf_content: bytes):
+        """Genera los streams del PDF que contienen operadores de texto (BT ... ET)"""
+        pos = 0
+        while True:
+            start = pdf_content.find(b'stream', pos)
+            if start == -1:
+                return
+            end = pdf_content.find(b'endstream', start + 6)
+            if end == -1:
+                return
+            pos = end + 9
+            # El diccionario del objeto precede al stream: descartar imágenes sin leerlas
+            header = pdf_content[max(0, start - 200):start]
+            obj_pos = header.rfind(b'obj')
+            if b'/Image' in (header[obj_pos:] if obj_pos != -1 else header):
+                continue
+            raw = pdf_content[start + 6:end].lstrip(b'\r\n')
+            try:
+                data = zlib.decompressobj().decompress(raw)
+            except zlib.error:
+                data = raw
+            if b'BT' in data:
+                yield data
+    
+    def _extract_with_enhanced_ocr(self, pdf_content: bytes, max_pages: int,
+                                   max_chars: Optional[int] = None) -> str:
         """Extrae texto usando OCR mejorado con preprocesamiento de imagen"""
-        text = ""
-        images = convert_from_bytes(pdf_content, first_page=1, last_page=max_pages, dpi=300)
-        
-        for i, image in enumerate(images):
-            logger.info(f"Procesando página {i+1} con OCR mejorado")
+        parts = []
+        for page_num in range(1, max_pages + 1):
+            images = convert_from_bytes(pdf_content, first_page=page_num, last_page=page_num, dpi=300)
+            if not images:
+                break
+            logger.info(f"Procesando página {page_num} con OCR mejorado")
             
             # Preprocesar imagen para mejorar OCR
-            processed_image = self._preprocess_image_for_ocr(image)
+            processed_image = self._preprocess_image_for_ocr(images[0])
             
             # Configuración mejorada de Tesseract
             custom_config = r'--oem 3 --psm 6'
@@ -173,9 +322,91 @@ class PDFExtractor:
                 config=custom_config
             )
             
-            text += page_text + "\n"
+            parts.append(page_text + "\n")
+            if self._budget_reached(parts, max_chars):
+                break
+        
+        return "".join(parts).strip()
+    
+    def _extract_with_adaptive_ocr(self, pdf_content: bytes, max_pages: int,
+                                   max_chars: Optional[int] = None) -> str:
+        """
+        OCR adaptativo por página.
+        
+        Cada página se rasteriza una sola vez a OCR_HIGH_DPI. La primera pasada
+        usa esa imagen reducida a OCR_LOW_DPI; solo si la confianza media de
+        tesseract queda bajo OCR_MIN_CONFIDENCE o el texto tiene menos de
+        OCR_MIN_CHARS caracteres se reintenta con la misma imagen a resolución
+        completa y preprocesada. Si el reintento falla se conserva el texto de
+        la primera pasada.
+        """
+        parts = []
+        factor = max(1, OCR_HIGH_DPI // OCR_LOW_DPI)
+        for page_num in range(1, max_pages + 1):
+            images = convert_from_bytes(pdf_content, first_page=page_num, last_page=page_num, dpi=OCR_HIGH_DPI)
+            if not images:
+                break
+            page_image = images[0]
+            
+            page_text, confidence = self._ocr_with_confidence(page_image.reduce(factor))
+            logger.info(f"OCR página {page_num} a {OCR_LOW_DPI} DPI: confianza {confidence:.0f}")
+            
+            if confidence < OCR_MIN_CONFIDENCE or len(page_text.strip()) < OCR_MIN_CHARS:
+                logger.info(f"Reintentando página {page_num} a {OCR_HIGH_DPI} DPI con preprocesamiento")
+                try:
+                    enhanced_text, enhanced_confidence = self._ocr_with_confidence(
+                        self._preprocess_if_available(page_image),
+                        config=r'--oem 3 --psm 6'
+                    )
+                except Exception as e:
+                    logger.warning(f"Reintento de OCR falló en página {page_num}: {e}")
+                else:
+                    if (enhanced_confidence >= confidence
+                            or len(page_text.strip()) < OCR_MIN_CHARS <= len(enhanced_text.strip())):
+                        page_text = enhanced_text
+            
+            parts.append(page_text + "\n")
+            if self._budget_reached(parts, max_chars):
+                break
+        
+        return "".join(parts).strip()
+    
+    def _ocr_with_confidence(self, image: Image, config: str = '') -> Tuple[str, float]:
+        """Ejecuta tesseract y retorna (texto, confianza media de las palabras)"""
+        data = pytesseract.image_to_data(
+            image, lang='spa', config=config, output_type=pytesseract.Output.DICT
+        )
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            if not word:
+                continue
+            conf = float(data['conf'][i])
+            if conf >= 0:
+                confidences.append(conf)
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+        
+        # Reconstruir el texto respetando bloques/párrafos/líneas de tesseract
+        text_lines = []
+        previous_paragraph = None
+        for (block, paragraph, _), words in lines.items():
+            if previous_paragraph is not None and (block, paragraph) != previous_paragraph:
+                text_lines.append("")
+            text_lines.append(" ".join(words))
+            previous_paragraph = (block, paragraph)
         
-        return text.strip()
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return "\n".join(text_lines), confidence
+    
+    def _preprocess_if_available(self, image: Image) -> Image:
+        """Imagen preprocesada con OpenCV o, si no está instalado, en escala de grises"""
+        try:
+            return self._preprocess_image_for_ocr(image)
+        except ImportError:
+            logger.debug("OpenCV no disponible, reintento de OCR sin preprocesamiento")
+            return image.convert('L')
     
     def _preprocess_image_for_ocr(self, image: Image) -> Image:
         """Preprocesa una imagen para mejorar la calidad del OCR"""
@@ -200,13 +431,15 @@ class PDFExtractor:
         # Convertir de vuelta a PIL Image
         return Image.fromarray(denoised)
     
-    def extract_text_from_url(self, url: str, max_pages: int = 2) -> Tuple[str, str]:
+    def extract_text_from_url(self, url: str, max_pages: int = 2,
+                              max_chars: Optional[int] = None) -> Tuple[str, str]:
         """
         Descarga y extrae texto de un PDF desde una URL.
         
         Args:
             url: URL del PDF
             max_pages: Número máximo de páginas a procesar
+            max_chars: Presupuesto de caracteres (ver extract_text)
             
         Returns:
             Tupla (texto_extraido, metodo_usado)
@@ -221,7 +454,7 @@ class PDFExtractor:
             response.raise_for_status()
             
             # Extraer texto
-            return self.extract_text(response.content, max_pages)
+            return self.extract_text(response.content, max_pages, max_chars)
             
         except Exception as e:
             logger.error(f"Error descargando PDF desde {url}: {str(e)}")
@@ -0,0 +1,89 @@
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from alerts.services.aspnet_form import ERRORES_VALIDACION, FormularioASPNET
+
+
+URL = 'https://www.camara.cl/legislacion/ProyectosDeLey/proyectos_ley.aspx'
+
+
+def respuesta(html, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = html.encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+
+def pagina(viewstate, cuerpo=''):
+    return (
+        f"<html><body><form><input type='hidden' name='__VIEWSTATE' value='{viewstate}'/>"
+        f"<input type='hidden' name='__VIEWSTATEGENERATOR' value='GEN'/>"
+        f"<input type='hidden' name='__EVENTVALIDATION' value='EV-{viewstate}'/>{cuerpo}</form></body></html>"
+    )
+
+
+class SesionFalsa:
+    """GET entrega el formulario; cada POST entrega la siguiente respuesta de la lista"""
+
+    def __init__(self, posts):
+        self.posts = list(posts)
+        self.gets = 0
+        self.datos_post = []
+
+    def get(self, url, timeout=None):
+        self.gets += 1
+        return respuesta(pagina(f'GET{self.gets}'))
+
+    def post(self, url, data=None, timeout=None):
+        self.datos_post.append(data)
+        return self.posts.pop(0)
+
+
+class FormularioASPNETTest(SimpleTestCase):
+    """Reutilización del estado y reintento ante un rechazo de ASP.NET"""
+
+    def test_reutiliza_el_estado_del_postback_anterior(self):
+        sesion = SesionFalsa([respuesta(pagina('POST1')), respuesta(pagina('POST2'))])
+        formulario = FormularioASPNET(sesion, URL)
+
+        formulario.enviar({'campo': 'a'})
+        formulario.enviar({'campo': 'b'})
+
+        self.assertEqual(sesion.gets, 1)
+        self.assertEqual(sesion.datos_post[1]['__VIEWSTATE'], 'POST1')
+
+    def test_rechazo_refresca_una_vez_y_reintenta_una_vez(self):
+        for error in ERRORES_VALIDACION:
+            with self.subTest(error=error):
+                sesion = SesionFalsa([
+                    respuesta(pagina('POST1')),
+                    respuesta(f"<html><body>{error}</body></html>"),
+                    respuesta(pagina('POST2', 'resultados')),
+                ])
+                formulario = FormularioASPNET(sesion, URL)
+                formulario.enviar({'campo': 'a'})
+
+                with mock.patch.object(formulario, 'refrescar', wraps=formulario.refrescar) as refrescar:
+                    response = formulario.enviar({'campo': 'b'})
+
+                self.assertEqual(refrescar.call_count, 1)
+                self.assertEqual(len(sesion.datos_post), 3)
+                # El reintento lleva el estado recién obtenido con GET
+                self.assertEqual(sesion.datos_post[2]['__VIEWSTATE'], 'GET2')
+                self.assertIn('resultados', response.text)
+                self.assertEqual(formulario.stats['rechazos'], 1)
+
+    def test_segundo_rechazo_no_vuelve_a_reintentar(self):
+        error = f"<html><body>{ERRORES_VALIDACION[0]}</body></html>"
+        sesion = SesionFalsa([respuesta(error), respuesta(error)])
+        formulario = FormularioASPNET(sesion, URL)
+        formulario._estado = {'__VIEWSTATE': 'VIEJO'}
+
+        with mock.patch.object(formulario, 'refrescar', wraps=formulario.refrescar) as refrescar:
+            formulario.enviar({'campo': 'a'})
+
+        self.assertEqual(refrescar.call_count, 1)
+        self.assertEqual(len(sesion.datos_post), 2)
@@ -0,0 +1,90 @@
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from alerts.services.cache_service import CacheService, EntradaDisco, MemoryTier
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'test-cache-service'}})
+class CacheServiceNivelesTest(SimpleTestCase):
+    """Promoción de disco a memoria y copias de los valores en memoria"""
+
+    def setUp(self):
+        cache.clear()
+        self.servicio = CacheService()
+
+    def expiracion_en_memoria(self, clave):
+        return self.servicio.memory._entries[clave][0] - time.monotonic()
+
+    def test_acierto_de_disco_se_promueve_con_el_ttl_restante(self):
+        cache.set('scraping:2025-09-18', EntradaDisco(time.time() + 100, {'total': 3}), 3600)
+
+        self.assertEqual(self.servicio._get('scraping:2025-09-18'), {'total': 3})
+        self.assertAlmostEqual(self.expiracion_en_memoria('scraping:2025-09-18'), 100, delta=2)
+        self.assertEqual(self.servicio.disk_stats.hits, 1)
+
+        # La segunda lectura sale de memoria
+        self.assertEqual(self.servicio._get('scraping:2025-09-18'), {'total': 3})
+        self.assertEqual(self.servicio.disk_stats.hits, 1)
+        self.assertEqual(self.servicio.memory.stats.hits, 1)
+
+    def test_entrada_de_disco_vencida_no_se_entrega(self):
+        cache.set('scraping:2025-09-18', EntradaDisco(time.time() - 1, {'total': 3}), 3600)
+
+        self.assertIsNone(self.servicio._get('scraping:2025-09-18'))
+        self.assertNotIn('scraping:2025-09-18', self.servicio.memory._entries)
+
+    def test_valor_antiguo_sin_expiracion_se_entrega_sin_promover(self):
+        cache.set('api:antiguo', {'ok': True}, 3600)
+
+        self.assertEqual(self.servicio._get('api:antiguo'), {'ok': True})
+        self.assertNotIn('api:antiguo', self.servicio.memory._entries)
+
+    def test_set_guarda_en_ambos_niveles_con_el_mismo_ttl(self):
+        self.servicio._set('api:clave', {'ok': True}, 60)
+
+        entrada = cache.get('api:clave')
+        self.assertIsInstance(entrada, EntradaDisco)
+        self.assertAlmostEqual(entrada.expira - time.time(), 60, delta=2)
+        self.assertAlmostEqual(self.expiracion_en_memoria('api:clave'), 60, delta=2)
+
+    def test_cada_get_entrega_una_copia(self):
+        self.servicio._set('scraping:2025-09-18', {'hechos': [1, 2]}, 60)
+
+        primero = self.servicio._get('scraping:2025-09-18')
+        primero['hechos'].append(3)
+
+        self.assertEqual(self.servicio._get('scraping:2025-09-18'), {'hechos': [1, 2]})
+
+
+class MemoryTierTest(SimpleTestCase):
+    """LRU limitado en bytes con expiración por entrada"""
+
+    def test_desaloja_la_menos_usada_al_superar_el_limite(self):
+        nivel = MemoryTier(max_bytes=400)
+        nivel.set('a', b'a' * 100, 60)
+        nivel.set('b', b'b' * 100, 60)
+        nivel.set('c', b'c' * 100, 60)
+        nivel.get('a')
+        nivel.set('d', b'd' * 100, 60)
+        nivel.set('e', b'e' * 100, 60)
+
+        self.assertIsNone(nivel.get('b'))
+        self.assertEqual(nivel.get('a'), b'a' * 100)
+        self.assertLessEqual(nivel.current_bytes, 400)
+
+    def test_entrada_vencida_se_descarta(self):
+        nivel = MemoryTier(max_bytes=1000)
+        nivel.set('a', b'valor', 0.01)
+        time.sleep(0.02)
+
+        self.assertIsNone(nivel.get('a'))
+        self.assertEqual(nivel.current_bytes, 0)
+
+    def test_valor_grande_no_entra(self):
+        nivel = MemoryTier(max_bytes=1000)
+        nivel.set('grande', b'x' * 300, 60)
+
+        self.assertIsNone(nivel.get('grande'))
@@ -0,0 +1,96 @@
+from contextlib import redirect_stdout
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase
+
+from alerts import scraper_sii
+from alerts.models import DocumentoSII
+
+
+def documento(numero, fecha, url=None, fuente='', descripcion=None):
+    return {
+        'numero': str(numero), 'fecha_publicacion': fecha, 'fuente': fuente,
+        'descripcion': descripcion or f'Descripción {numero}',
+        'url': url or f'https://www.sii.cl/normativa_legislacion/circulares/{fecha.year}/circu{numero}.pdf',
+    }
+
+
+class SincronizarDocumentoSIITest(TestCase):
+    """Índices anuales con numeración que se reinicia y publicaciones del día"""
+
+    def test_el_mismo_numero_en_otro_anio_es_otro_documento(self):
+        DocumentoSII.sincronizar('CIRCULAR', 2024, [documento(1, date(2024, 1, 3)), documento(70, date(2024, 12, 30))])
+
+        actualizados, agregados = DocumentoSII.sincronizar('CIRCULAR', 2025, [documento(1, date(2025, 1, 2))])
+
+        self.assertEqual((actualizados, agregados), (0, 1))
+        self.assertEqual(
+            sorted(DocumentoSII.objects.values_list('anio', 'numero', 'fecha_publicacion')),
+            [(2024, '1', date(2024, 1, 3)), (2024, '70', date(2024, 12, 30)), (2025, '1', date(2025, 1, 2))],
+        )
+
+    def test_existentes_solo_actualizan_enlace_fecha_y_fuente(self):
+        DocumentoSII.sincronizar('CIRCULAR', 2025, [documento(5, date(2025, 1, 8), descripcion='Título original')])
+        describir = mock.Mock(side_effect=lambda dato: f"Nuevo {dato['numero']}")
+
+        actualizados, agregados = DocumentoSII.sincronizar('CIRCULAR', 2025, [
+            documento(5, date(2025, 1, 9), url='https://www.sii.cl/circu5-v2.pdf', fuente='SII',
+                      descripcion='Otro título'),
+            documento(6, date(2025, 1, 9)),
+        ], describir=describir)
+
+        self.assertEqual((actualizados, agregados), (1, 1))
+        self.assertEqual([c.args[0]['numero'] for c in describir.call_args_list], ['6'])
+        circular = DocumentoSII.objects.get(anio=2025, numero='5')
+        self.assertEqual(circular.titulo, 'Título original')
+        self.assertEqual((circular.url, circular.fecha_publicacion, circular.fuente),
+                         ('https://www.sii.cl/circu5-v2.pdf', date(2025, 1, 9), 'SII'))
+
+    def test_sin_cambios_no_actualiza(self):
+        datos = [documento(5, date(2025, 1, 8))]
+        DocumentoSII.sincronizar('CIRCULAR', 2025, datos)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(DocumentoSII.sincronizar('CIRCULAR', 2025, datos), (0, 0))
+
+    def test_publicaciones_del_dia_cruzan_el_cambio_de_anio(self):
+        # El índice 2024 aún publica el 2 de enero y el de 2025 ya empezó
+        DocumentoSII.sincronizar('CIRCULAR', 2024, [documento(71, date(2025, 1, 2)), documento(70, date(2024, 12, 30))])
+        DocumentoSII.sincronizar('CIRCULAR', 2025, [documento(1, date(2025, 1, 2)), documento(2, date(2025, 1, 2))])
+        DocumentoSII.sincronizar('RESOLUCION', 2025, [documento(3, date(2025, 1, 2))])
+        DocumentoSII.sincronizar('JURISPRUDENCIA', 2025, [documento(9, date(2025, 1, 2))])
+        DocumentoSII.objects.filter(tipo_documento='JURISPRUDENCIA').update(es_relevante=False)
+
+        publicaciones = DocumentoSII.publicaciones_del_dia(date(2025, 1, 2))
+
+        self.assertEqual([(p['tipo'], p['numero']) for p in publicaciones],
+                         [('Circular', '71'), ('Circular', '2'), ('Circular', '1'), ('Resolución Exenta', '3')])
+        self.assertEqual(publicaciones[0]['fecha_publicacion'], '2 de enero de 2025')
+        self.assertEqual(DocumentoSII.publicaciones_del_dia(date(2025, 1, 3)), [])
+
+
+class SincronizarDocumentosSIITest(TestCase):
+    """sincronizar_documentos_sii guarda cada índice bajo el año pedido"""
+
+    def test_guarda_en_el_anio_del_indice_y_omite_sin_fecha(self):
+        indices = {
+            'circulares': [
+                {'numero': '1', 'fecha': '2 de enero de 2025', 'titulo': 'Circular 1',
+                 'descripcion': 'Instruye sobre IVA', 'url_pdf': 'https://www.sii.cl/circu1.pdf'},
+                {'numero': '2', 'fecha': '', 'titulo': 'Sin fecha', 'descripcion': ''},
+            ],
+            'resoluciones_exentas': [],
+            'jurisprudencia_administrativa': [],
+        }
+        with mock.patch.object(scraper_sii, 'obtener_indices_sii_concurrente', return_value=(indices, {})), \
+                mock.patch.object(scraper_sii, 'mejorar_descripcion_tributaria', return_value='IVA en servicios digitales'), \
+                redirect_stdout(StringIO()):
+            resultado = scraper_sii.sincronizar_documentos_sii(year=2025)
+
+        self.assertEqual(resultado['circulares'], (0, 1))
+        circular = DocumentoSII.objects.get()
+        self.assertEqual((circular.anio, circular.numero, circular.fecha_publicacion),
+                         (2025, '1', date(2025, 1, 2)))
+        self.assertEqual(circular.titulo, 'IVA en servicios digitales')
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.test import TestCase
+
+from alerts.models import HechoCMFPublicado
+
+
+FECHA = date(2025, 9, 17)
+
+
+def dato(entidad, numero, url):
+    return {'entidad': entidad, 'numero_documento': numero, 'materia': 'Dividendo provisorio', 'url_pdf': url}
+
+
+class HechosDelDiaTest(TestCase):
+    """Consulta por fecha y actualización de enlaces de HechoCMFPublicado"""
+
+    def test_solo_los_hechos_de_la_fecha_en_formato_del_json(self):
+        HechoCMFPublicado.upsert_dia(FECHA, [dato('BANCO DE CHILE', '2025090001', 'https://cmf/1.pdf'),
+                                             dato('FALABELLA S.A.', '2025090002', 'https://cmf/2.pdf')],
+                                     es_ipsa=lambda entidad: entidad == 'BANCO DE CHILE')
+        HechoCMFPublicado.upsert_dia(date(2025, 9, 16), [dato('CMPC', '2025089999', 'https://cmf/0.pdf')])
+
+        hechos = HechoCMFPublicado.hechos_del_dia(FECHA)
+
+        self.assertEqual([h['entidad'] for h in hechos], ['BANCO DE CHILE', 'FALABELLA S.A.'])
+        self.assertEqual(hechos[0]['fecha'], '17-09-2025')
+        self.assertEqual(hechos[0]['numero_documento'], '2025090001')
+        self.assertEqual(hechos[0]['url_pdf'], 'https://cmf/1.pdf')
+        self.assertTrue(hechos[0]['es_ipsa'])
+        self.assertFalse(hechos[1]['es_ipsa'])
+        self.assertEqual(HechoCMFPublicado.hechos_del_dia(date(2025, 9, 15)), [])
+
+    def test_upsert_actualiza_enlaces_sin_duplicar(self):
+        HechoCMFPublicado.upsert_dia(FECHA, [dato('BANCO DE CHILE', '2025090001', 'https://cmf/viejo.pdf')])
+
+        actualizados, agregados = HechoCMFPublicado.upsert_dia(
+            FECHA, [dato('BANCO DE CHILE', '2025090001', 'https://cmf/nuevo.pdf')])
+
+        self.assertEqual((actualizados, agregados), (1, 0))
+        hechos = HechoCMFPublicado.hechos_del_dia(FECHA)
+        self.assertEqual(len(hechos), 1)
+        self.assertEqual(hechos[0]['url_pdf'], 'https://cmf/nuevo.pdf')
+
+    def test_registro_importado_sin_numero_se_completa(self):
+        HechoCMFPublicado.objects.create(fecha=FECHA, entidad='CMPC', materia='Junta', url_pdf='')
+
+        actualizados, agregados = HechoCMFPublicado.upsert_dia(FECHA, [dato('CMPC', '2025090003', 'https://cmf/3.pdf')])
+
+        self.assertEqual((actualizados, agregados), (1, 0))
+        hecho, = HechoCMFPublicado.hechos_del_dia(FECHA)
+        self.assertEqual(hecho['numero_documento'], '2025090003')
+        self.assertTrue(hecho['tiene_pdf'])
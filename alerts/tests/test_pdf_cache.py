@@ -0,0 +1,86 @@
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from alerts.services.pdf_cache import PDFCache
+
+
+URL = 'https://www.cmfchile.cl/sitio/aplic/serdoc/ver_sgd.php?s567=abc&secuencia=-1&t=1700000000'
+
+
+class PDFCacheTest(SimpleTestCase):
+    """Guardado, lectura y expiración sobre el índice SQLite"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        self.cache = PDFCache(cache_dir=self.directorio, max_age_hours=24)
+
+    def fila(self, url):
+        return self.cache._connect().execute(
+            "SELECT url, size, hits FROM entries WHERE cache_key = ?", (self.cache._get_cache_key(url),)
+        ).fetchone()
+
+    def envejecer(self, url, horas):
+        self.cache._connect().execute(
+            "UPDATE entries SET timestamp = ? WHERE cache_key = ?",
+            (time.time() - horas * 3600, self.cache._get_cache_key(url))
+        )
+
+    def test_put_y_get(self):
+        self.cache.put(URL, b'%PDF-1.4 contenido')
+
+        self.assertEqual(self.cache.get(URL), b'%PDF-1.4 contenido')
+        self.assertEqual(self.fila(URL), (URL, len(b'%PDF-1.4 contenido'), 1))
+        self.assertIsNone(self.cache.get(URL + '&otro=1'))
+
+    def test_put_reemplaza_la_entrada(self):
+        self.cache.put(URL, b'version 1')
+        self.cache.put(URL, b'version 2 mas larga')
+
+        self.assertEqual(self.cache.get(URL), b'version 2 mas larga')
+        self.assertEqual(self.cache.get_stats()['total_files'], 1)
+
+    def test_entrada_vencida_no_se_entrega(self):
+        self.cache.put(URL, b'%PDF viejo')
+        self.envejecer(URL, 25)
+
+        self.assertIsNone(self.cache.get(URL))
+        self.assertEqual(self.cache.get_stats()['expired_files'], 1)
+
+    def test_clear_old_borra_fila_y_archivo_vencidos(self):
+        vigente = URL + '&vigente=1'
+        self.cache.put(URL, b'%PDF viejo')
+        self.cache.put(vigente, b'%PDF nuevo')
+        self.envejecer(URL, 25)
+
+        self.cache.clear_old()
+
+        self.assertIsNone(self.fila(URL))
+        self.assertFalse(self.cache._get_cache_path(self.cache._get_cache_key(URL)).exists())
+        self.assertEqual(self.cache.get(vigente), b'%PDF nuevo')
+
+    def test_archivo_borrado_por_fuera_es_un_miss(self):
+        self.cache.put(URL, b'%PDF')
+        self.cache._get_cache_path(self.cache._get_cache_key(URL)).unlink()
+
+        self.assertIsNone(self.cache.get(URL))
+
+    def test_migra_metadata_json_antiguo(self):
+        directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        clave = PDFCache._get_cache_key(None, URL)
+        (directorio / f"{clave}.pdf").write_bytes(b'%PDF antiguo')
+        (directorio / "metadata.json").write_text(json.dumps({
+            clave: {'url': URL, 'timestamp': (datetime.now() - timedelta(hours=1)).isoformat(), 'size': 12}
+        }))
+
+        cache = PDFCache(cache_dir=directorio)
+
+        self.assertEqual(cache.get(URL), b'%PDF antiguo')
+        self.assertFalse((directorio / "metadata.json").exists())
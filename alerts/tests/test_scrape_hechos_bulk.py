@@ -0,0 +1,79 @@
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from alerts.management.commands.scrape_hechos import Command
+from alerts.models import Empresa, HechoEsencial
+
+
+FECHA = timezone.make_aware(datetime(2025, 9, 17))
+FECHA_ANTERIOR = timezone.make_aware(datetime(2025, 9, 10))
+
+
+def hecho(url, empresa='BANCO DE CHILE', titulo='Dividendo provisorio'):
+    return {'fecha': FECHA, 'empresa': empresa, 'titulo': titulo, 'url': f'https://www.cmfchile.cl/{url}'}
+
+
+class ScrapeHechosBulkTest(TestCase):
+    """El modo --bulk inserta los hechos nuevos sin pisar los ya guardados"""
+
+    def setUp(self):
+        self.empresa = Empresa.objects.create(nombre='BANCO DE CHILE', es_ipsa=True)
+        self.obtener_resumen = mock.patch.object(
+            Command, 'obtener_resumen_pdf', autospec=True,
+            side_effect=lambda comando, h: f'Resumen de {h.url}',
+        ).start()
+        mock.patch.object(Command, 'setup_driver').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def guardar(self, url, **campos):
+        return HechoEsencial.objects.create(
+            empresa=self.empresa, url=f'https://www.cmfchile.cl/{url}', titulo='Título guardado',
+            fecha_publicacion=FECHA_ANTERIOR, **campos,
+        )
+
+    def ejecutar(self, hechos):
+        with mock.patch.object(Command, 'scrape_hechos_esenciales', return_value=hechos):
+            call_command('scrape_hechos', '--bulk', '--workers', '2', stdout=StringIO())
+
+    def test_hecho_completo_existente_no_se_modifica(self):
+        existente = self.guardar('1', resumen='Resumen guardado', categoria='IMPORTANTE',
+                                 relevancia_profesional=7.5)
+
+        self.ejecutar([hecho('1', titulo='Título nuevo'), hecho('2')])
+
+        existente.refresh_from_db()
+        self.assertEqual(existente.titulo, 'Título guardado')
+        self.assertEqual(existente.resumen, 'Resumen guardado')
+        self.assertEqual(existente.categoria, 'IMPORTANTE')
+        self.assertEqual(existente.relevancia_profesional, 7.5)
+        self.assertEqual(existente.fecha_publicacion, FECHA_ANTERIOR)
+        self.assertEqual(HechoEsencial.objects.count(), 2)
+        self.assertEqual(Empresa.objects.count(), 1)
+        self.assertEqual([c.args[1].url for c in self.obtener_resumen.call_args_list],
+                         ['https://www.cmfchile.cl/2'])
+
+    def test_existente_sin_resumen_se_completa_sin_pisar_sus_datos(self):
+        existente = self.guardar('1')
+
+        self.ejecutar([hecho('1', titulo='Título nuevo')])
+
+        existente.refresh_from_db()
+        self.assertEqual(existente.resumen, 'Resumen de https://www.cmfchile.cl/1')
+        self.assertEqual(existente.titulo, 'Título guardado')
+        self.assertEqual(existente.fecha_publicacion, FECHA_ANTERIOR)
+        self.assertIsNotNone(existente.relevancia)
+
+    def test_nuevos_crean_empresa_y_url_repetida_se_guarda_una_vez(self):
+        self.ejecutar([hecho('3', empresa='FALABELLA S.A.', titulo='Primera versión'),
+                       hecho('3', empresa='FALABELLA S.A.', titulo='Segunda versión'),
+                       hecho('4', empresa='')])
+
+        nuevo = HechoEsencial.objects.get()
+        self.assertEqual(nuevo.titulo, 'Segunda versión')
+        self.assertEqual(nuevo.empresa.nombre, 'FALABELLA S.A.')
+        self.assertEqual(nuevo.resumen, 'Resumen de https://www.cmfchile.cl/3')
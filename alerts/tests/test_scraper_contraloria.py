@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+
+from bs4 import BeautifulSoup
+from django.test import TestCase
+
+from alerts.models import ReglamentoContraloria
+from scripts.scrapers.scraper_contraloria_reglamentos import ScraperContraloriaReglamentos
+
+
+HOY = date(2025, 9, 18)
+
+
+def fila(numero, fecha, estado='En trámite'):
+    return (
+        f"<tr><td>+</td><td>{numero}</td><td>2025</td><td>Ministerio de Hacienda</td>"
+        f"<td>Subsecretaría de Hacienda</td><td>Aprueba reglamento número {numero} sobre materias tributarias</td>"
+        f"<td>{fecha:%d/%m/%Y}</td><td>{estado}</td><td></td></tr>"
+    )
+
+
+def pagina(filas):
+    # La tabla principal es la primera con más de 100 filas
+    relleno = [fila(9000 + i, HOY - timedelta(days=400)) for i in range(110)]
+    return BeautifulSoup(
+        "<table><tr><th>Número</th></tr>" + "".join(filas + relleno) + "</table>", 'html.parser'
+    )
+
+
+def guardar(numero, fecha, estado='En trámite'):
+    ReglamentoContraloria.objects.create(
+        numero=str(numero), anio='2025', ministerio='Ministerio de Hacienda',
+        materia=f'Reglamento {numero}', fecha_ingreso=fecha, estado=estado,
+    )
+
+
+class EscaneoReglamentosTest(TestCase):
+    """Corte del recorrido de la tabla por reglamentos ya guardados"""
+
+    def setUp(self):
+        self.scraper = ScraperContraloriaReglamentos()
+        self.conocidos = list(range(100, 100 + ScraperContraloriaReglamentos.CONOCIDAS_PARA_CORTAR + 2))
+        for numero in self.conocidos:
+            guardar(numero, HOY - timedelta(days=2))
+
+    def escanear(self, filas):
+        return self.scraper._extraer_reglamentos_tabla(pagina(filas), datetime.combine(HOY, datetime.min.time()))
+
+    def test_ingreso_tardio_entre_filas_guardadas(self):
+        filas = [fila(200, HOY), fila(self.conocidos[0], HOY - timedelta(days=2)), fila(201, HOY)]
+        filas += [fila(n, HOY - timedelta(days=2)) for n in self.conocidos[1:]]
+
+        numeros = {r['numero'] for r in self.escanear(filas)}
+
+        self.assertEqual(numeros, {'200', '201'})
+
+    def test_corta_tras_conocidas_seguidas(self):
+        filas = [fila(n, HOY - timedelta(days=2)) for n in self.conocidos]
+        # Debajo de la marca: no se lee ni se guarda
+        filas.append(fila(300, HOY))
+
+        self.assertEqual(self.escanear(filas), [])
+        self.assertFalse(ReglamentoContraloria.objects.filter(numero='300').exists())
+
+    def test_actualiza_estado_de_reglamentos_guardados(self):
+        filas = [fila(self.conocidos[0], HOY - timedelta(days=2), estado='Tomado razón')]
+        filas += [fila(n, HOY - timedelta(days=2)) for n in self.conocidos[1:]]
+
+        self.escanear(filas)
+
+        reglamento = ReglamentoContraloria.objects.get(numero=str(self.conocidos[0]))
+        self.assertEqual(reglamento.estado, 'Tomado razón')
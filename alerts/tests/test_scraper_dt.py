@@ -0,0 +1,33 @@
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from scripts.scrapers.scraper_dt import ScraperDT
+
+
+PAGINA_DT = Path(__file__).resolve().parent.parent.parent / 'data' / 'legislacion_dt.html'
+
+
+class EscaneoDocumentosDTTest(SimpleTestCase):
+    """Corte por fecha del recorrido de la página de legislación"""
+
+    def setUp(self):
+        self.scraper = ScraperDT()
+        self.soup = BeautifulSoup(PAGINA_DT.read_text(encoding='utf-8'), 'html.parser')
+
+    def escanear(self, fecha):
+        return [d['numero'] for d in self.scraper.escanear_documentos_dt(self.soup, datetime.strptime(fecha, '%d-%m-%Y'))]
+
+    def test_ordinarios_despues_de_la_seccion_dictamenes(self):
+        self.assertEqual(
+            self.escanear('17-09-2025'),
+            ['DICTAMEN N° 731', 'ORD. N° 1204/45', 'ORD. N° 1201', 'ORD. N° 1198/44'],
+        )
+
+    def test_dia_solo_en_ordinarios(self):
+        self.assertEqual(self.escanear('16-09-2025'), ['ORD. N° 1187'])
+
+    def test_dia_solo_en_dictamenes(self):
+        self.assertEqual(self.escanear('02-09-2025'), ['DICTAMEN N° 702'])
@@ -0,0 +1,92 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from alerts.models import ProyectoLeyCongreso
+from scripts.scrapers.scraper_proyectos_ley_integrado import ScraperProyectosLeyIntegrado
+
+
+# El informe del 18-09-2025 busca los proyectos ingresados el 17/09/2025
+FECHA_INFORME = '18-09-2025'
+DIA_BUSCADO = '17/09/2025'
+
+
+def busqueda(*boletines):
+    return [
+        {'boletin': boletin, 'titulo': f'Proyecto {boletin}',
+         'url_detalle': f'https://www.camara.cl/legislacion/ProyectosDeLey/tramitacion.aspx?prmBOLETIN={boletin}'}
+        for boletin in boletines
+    ]
+
+
+def guardar(boletin, fecha_ingreso, resumen=''):
+    ProyectoLeyCongreso.objects.create(
+        boletin=boletin, titulo=f'Proyecto {boletin}', fecha_ingreso=fecha_ingreso, resumen=resumen,
+    )
+
+
+class ProyectosDiaAnteriorTest(TestCase):
+    """Filtro por fecha desde el registro guardado y enriquecimiento en dos fases"""
+
+    def setUp(self):
+        self.scraper = ScraperProyectosLeyIntegrado()
+        # Fecha de ingreso que entrega la página de detalle de cada boletín nuevo
+        self.fechas_detalle = {}
+
+        def metadatos(proyecto):
+            return dict(proyecto, fecha_ingreso=self.fechas_detalle[proyecto['boletin']])
+
+        def enriquecer(proyecto):
+            return dict(proyecto, resumen=f"Resumen del boletín {proyecto['boletin']}")
+
+        self.metadatos = mock.patch.object(self.scraper, 'obtener_metadatos_proyecto', side_effect=metadatos).start()
+        self.enriquecer = mock.patch.object(self.scraper, 'enriquecer_documento', side_effect=enriquecer).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def obtener(self, proyectos):
+        with mock.patch.object(self.scraper, '_buscar_proyectos_camara_recientes', return_value=proyectos):
+            return self.scraper.obtener_proyectos_dia_anterior(fecha_informe=FECHA_INFORME)
+
+    def test_guardado_con_otra_fecha_se_omite_sin_pedir_detalle(self):
+        guardar('16001-07', date(2025, 9, 10), resumen='Resumen guardado')
+
+        self.assertEqual(self.obtener(busqueda('16001-07')), [])
+        self.metadatos.assert_not_called()
+        self.enriquecer.assert_not_called()
+
+    def test_guardado_del_dia_con_resumen_se_usa_sin_enriquecer(self):
+        guardar('16002-05', date(2025, 9, 17), resumen='Resumen guardado')
+
+        proyectos = self.obtener(busqueda('16002-05'))
+
+        self.assertEqual([p['boletin'] for p in proyectos], ['16002-05'])
+        self.assertEqual(proyectos[0]['resumen'], 'Resumen guardado')
+        self.assertEqual(proyectos[0]['fecha_ingreso'], DIA_BUSCADO)
+        self.metadatos.assert_not_called()
+        self.enriquecer.assert_not_called()
+
+    def test_solo_se_enriquecen_los_que_pasan_el_filtro_de_fecha(self):
+        self.fechas_detalle = {'16003-03': DIA_BUSCADO, '16004-13': '15/09/2025', '16005-06': '17/9/2025'}
+
+        proyectos = self.obtener(busqueda('16003-03', '16004-13', '16005-06'))
+
+        self.assertEqual([p['boletin'] for p in proyectos], ['16003-03', '16005-06'])
+        self.assertEqual(self.metadatos.call_count, 3)
+        self.assertEqual(sorted(c.args[0]['boletin'] for c in self.enriquecer.call_args_list),
+                         ['16003-03', '16005-06'])
+        # El excluido queda guardado sin resumen para no pedir su detalle mañana
+        excluido = ProyectoLeyCongreso.objects.get(boletin='16004-13')
+        self.assertEqual(excluido.fecha_ingreso, date(2025, 9, 15))
+        self.assertEqual(excluido.resumen, '')
+        self.assertEqual(ProyectoLeyCongreso.objects.get(boletin='16003-03').resumen, 'Resumen del boletín 16003-03')
+
+    def test_guardado_del_dia_sin_resumen_se_vuelve_a_enriquecer(self):
+        guardar('16006-04', date(2025, 9, 17))
+        self.fechas_detalle = {'16006-04': DIA_BUSCADO}
+
+        proyectos = self.obtener(busqueda('16006-04'))
+
+        self.assertEqual(proyectos[0]['resumen'], 'Resumen del boletín 16006-04')
+        self.metadatos.assert_called_once()
+        self.enriquecer.assert_called_once()
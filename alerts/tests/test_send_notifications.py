@@ -0,0 +1,89 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from alerts.models import Empresa, HechoEsencial, NotificacionEnviada
+
+
+FECHA = timezone.make_aware(datetime(2025, 9, 17, 10))
+
+
+class SendNotificationsTest(TestCase):
+    """Un correo resumen por usuario y consultas que no crecen con usuarios ni hechos"""
+
+    def crear_usuario(self, username, *empresas, email=None):
+        usuario = User.objects.create_user(username, email=f'{username}@example.com' if email is None else email)
+        usuario.perfil.suscripciones.add(*empresas)
+        return usuario
+
+    def crear_hecho(self, empresa, n, **campos):
+        datos = {'resumen': f'Resumen {n}', 'relevancia': 2}
+        datos.update(campos)
+        return HechoEsencial.objects.create(
+            empresa=empresa, titulo=f'Hecho {n}', url=f'https://www.cmfchile.cl/{empresa.pk}/{n}',
+            fecha_publicacion=FECHA, **datos,
+        )
+
+    def ejecutar(self):
+        with CaptureQueriesContext(connection) as consultas:
+            call_command('send_notifications', stdout=StringIO())
+        return len(consultas)
+
+    def escenario(self, usuarios, hechos_por_empresa, sufijo):
+        empresas = [Empresa.objects.create(nombre=f'Empresa {sufijo}{i}') for i in range(2)]
+        for n in range(hechos_por_empresa):
+            for empresa in empresas:
+                self.crear_hecho(empresa, n)
+        for i in range(usuarios):
+            self.crear_usuario(f'usuario{sufijo}{i}', *empresas)
+
+    def test_un_correo_por_usuario_con_todos_sus_hechos(self):
+        banco = Empresa.objects.create(nombre='BANCO DE CHILE')
+        cmpc = Empresa.objects.create(nombre='CMPC')
+        h1, h2 = self.crear_hecho(banco, 1), self.crear_hecho(banco, 2)
+        h3 = self.crear_hecho(cmpc, 3)
+        sin_analizar = self.crear_hecho(cmpc, 4, resumen=None)
+        ana = self.crear_usuario('ana', banco, cmpc)
+        beto = self.crear_usuario('beto', cmpc)
+        self.crear_usuario('sin_correo', banco, email='')
+        NotificacionEnviada.objects.create(usuario=ana, hecho_esencial=h3)
+
+        self.ejecutar()
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['ana@example.com', 'beto@example.com'])
+        correo_ana = next(m for m in mail.outbox if m.to == ['ana@example.com'])
+        self.assertEqual(correo_ana.subject, '2 nuevos Hechos Esenciales de tus empresas')
+        correo_beto = next(m for m in mail.outbox if m.to == ['beto@example.com'])
+        self.assertEqual(correo_beto.subject, 'Alerta de Hecho Esencial: CMPC')
+        self.assertEqual(
+            set(NotificacionEnviada.objects.values_list('usuario__username', 'hecho_esencial_id')),
+            {('ana', h1.pk), ('ana', h2.pk), ('ana', h3.pk), ('beto', h3.pk)},
+        )
+        self.assertEqual(set(HechoEsencial.objects.filter(notificacion_enviada=True)), {h1, h2, h3})
+        sin_analizar.refresh_from_db()
+        self.assertFalse(sin_analizar.notificacion_enviada)
+
+        # Una segunda ejecución no vuelve a enviar
+        mail.outbox.clear()
+        self.ejecutar()
+        self.assertEqual(mail.outbox, [])
+
+    def test_consultas_no_crecen_con_usuarios_ni_hechos(self):
+        self.escenario(usuarios=1, hechos_por_empresa=1, sufijo='a')
+        pocas = self.ejecutar()
+        self.assertEqual(len(mail.outbox), 1)
+
+        mail.outbox.clear()
+        self.escenario(usuarios=6, hechos_por_empresa=5, sufijo='b')
+        muchas = self.ejecutar()
+
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(NotificacionEnviada.objects.count(), 2 + 6 * 10)
+        self.assertEqual(muchas, pocas)
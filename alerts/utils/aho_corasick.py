@@ -0,0 +1,91 @@
+"""
+Autómata Aho-Corasick para buscar muchos patrones literales en una sola pasada
+
+Se construye una vez (típicamente al importar el módulo que lo usa) y cada
+búsqueda recorre el texto una sola vez, sin importar cuántos patrones haya.
+Cada patrón lleva una etiqueta (p. ej. 'IPSA' o 'ESTRATEGICA'); la búsqueda
+retorna las etiquetas de los patrones que aparecen en el texto.
+"""
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+
+class AhoCorasick:
+    """
+    Buscador multi-patrón. Los patrones se comparan tal cual: la normalización
+    (mayúsculas, tildes) es responsabilidad de quien lo usa.
+    """
+
+    def __init__(self, patrones: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            patrones: Pares (patrón, etiqueta). Los patrones vacíos se ignoran.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._salida = [frozenset()]
+
+        etiquetas_por_estado: Dict[int, set] = {}
+        for patron, etiqueta in patrones:
+            if not patron:
+                continue
+            estado = 0
+            for caracter in patron:
+                siguiente = self._goto[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._salida.append(frozenset())
+                    self._goto[estado][caracter] = siguiente
+                estado = siguiente
+            etiquetas_por_estado.setdefault(estado, set()).add(etiqueta)
+
+        for estado, etiquetas in etiquetas_por_estado.items():
+            self._salida[estado] = frozenset(etiquetas)
+
+        self._construir_fallos()
+
+    def _construir_fallos(self):
+        """Enlaces de fallo por BFS; la salida de cada estado incluye la de su fallo"""
+        cola = list(self._goto[0].values())
+        i = 0
+        while i < len(cola):
+            estado = cola[i]
+            i += 1
+            for caracter, hijo in self._goto[estado].items():
+                cola.append(hijo)
+                fallo = self._fail[estado]
+                while fallo and caracter not in self._goto[fallo]:
+                    fallo = self._fail[fallo]
+                destino = self._goto[fallo].get(caracter, 0)
+                self._fail[hijo] = destino if destino != hijo else 0
+                self._salida[hijo] = self._salida[hijo] | self._salida[self._fail[hijo]]
+
+    def etiquetas(self, texto: str) -> FrozenSet[str]:
+        """Etiquetas de todos los patrones contenidos en el texto"""
+        goto = self._goto
+        fail = self._fail
+        salida = self._salida
+        encontradas = frozenset()
+        estado = 0
+        for caracter in texto:
+            while estado and caracter not in goto[estado]:
+                estado = fail[estado]
+            estado = goto[estado].get(caracter, 0)
+            if salida[estado]:
+                encontradas = encontradas | salida[estado]
+        return encontradas
+
+    def contiene(self, texto: str) -> bool:
+        """True si algún patrón aparece en el texto (se detiene en el primero)"""
+        goto = self._goto
+        fail = self._fail
+        salida = self._salida
+        estado = 0
+        for caracter in texto:
+            while estado and caracter not in goto[estado]:
+                estado = fail[estado]
+            estado = goto[estado].get(caracter, 0)
+            if salida[estado]:
+                return True
+        return False
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la clasificación de hechos CMF por palabras clave.
+
+Compara la implementación anterior (recorrer CATEGORIAS_HECHOS palabra por
+palabra y las listas `any(palabra in ...)` de exclusiones y bonus) con
+ClasificadorHechos (una regex combinada, una pasada por hecho) sobre los
+hechos del histórico data/hechos_cmf_selenium_reales.json más materias y
+resúmenes típicos. Verifica además que ambas den la misma categoría, exclusiones y
+bonus para cada hecho.
+
+Uso:
+    python scripts/benchmarks/benchmark_clasificador_hechos.py [--repeticiones 20]
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.cmf_criterios_profesionales import (
+    BONUS_CONTEXTO,
+    CATEGORIAS_HECHOS,
+    CLASIFICADOR_HECHOS,
+    EXCLUSIONES_HECHOS,
+)
+
+MATERIAS_TIPICAS = [
+    "Otros", "Cambios en la administración", "Junta extraordinaria de accionistas, citaciones, acuerdos y proposiciones",
+    "Colocación de valores en mercados internacionales y/o nacionales", "Fusión de sociedades",
+    "Aumento de capital", "Pago de dividendos", "Transacción de acciones", "Póliza de seguro",
+]
+
+RESUMENES_TIPICOS = [
+    "",
+    "La sociedad informa la compra de acciones por USD 120 millones, un monto significativo para el grupo.",
+    "El EBITDA del trimestre creció 20% y la utilidad neta aumentó respecto al año anterior.",
+    "Se informa la renuncia del gerente general y la designación de su reemplazo a contar del próximo mes.",
+    "El directorio acordó citar a junta extraordinaria para aprobar un aumento de capital y la política de dividendos.",
+]
+
+
+def _analizar_anterior(titulo, materia, entidad, resumen):
+    """Categoría, exclusiones y bonus con los bucles de la implementación previa"""
+    texto_completo = f"{titulo} {materia} {resumen}".lower()
+    categoria = None
+    for nombre, info in CATEGORIAS_HECHOS.items():
+        if any(keyword in texto_completo for keyword in info["keywords"]):
+            categoria = nombre
+            break
+
+    campos = {"titulo": titulo.lower(), "materia": materia.lower(),
+              "entidad": entidad.lower(), "resumen": resumen.lower()}
+    marcas = set()
+    for marca, (nombres_campos, palabras) in EXCLUSIONES_HECHOS.items():
+        if any(palabra in campos[c] for palabra in palabras for c in nombres_campos):
+            marcas.add(marca)
+    for marca, palabras in BONUS_CONTEXTO.items():
+        if any(palabra in campos["resumen"] for palabra in palabras):
+            marcas.add(marca)
+    return categoria, frozenset(marcas)
+
+
+def cargar_hechos():
+    json_path = BASE_DIR / 'data' / 'hechos_cmf_selenium_reales.json'
+    with open(json_path, 'r', encoding='utf-8') as f:
+        hechos = json.load(f).get('hechos', [])
+    casos = [(h.get('titulo', ''), h.get('materia', ''), h.get('entidad', ''), h.get('resumen', ''))
+             for h in hechos]
+    entidades = sorted({h.get('entidad', '') for h in hechos})[:20]
+    for materia, resumen, entidad in itertools.product(MATERIAS_TIPICAS, RESUMENES_TIPICOS, entidades[:4]):
+        casos.append((materia, materia, entidad, f"{entidad} - {materia}. {resumen}"))
+    return casos
+
+
+def medir(func, casos, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for caso in casos:
+            func(*caso)
+    return (time.perf_counter() - inicio) / (repeticiones * len(casos)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    casos = cargar_hechos()
+    diferencias = [c for c in casos if _analizar_anterior(*c) != tuple(CLASIFICADOR_HECHOS._analizar(*c))]
+    if diferencias:
+        print(f"❌ {len(diferencias)} hechos clasificados distinto, p. ej. {diferencias[0]}")
+        return 1
+
+    t_anterior = medir(_analizar_anterior, casos, args.repeticiones)
+    t_actual = medir(CLASIFICADOR_HECHOS._analizar, casos, args.repeticiones)
+
+    print(f"{len(casos)} hechos")
+    print(f"{'implementación':<32}{'µs por hecho':>14}")
+    print(f"{'anterior (bucles any/in)':<32}{t_anterior:>14.1f}")
+    print(f"{'actual (regex, una pasada)':<32}{t_actual:>14.1f}")
+    print(f"\n✅ Misma categoría, exclusiones y bonus en los {len(casos)} hechos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
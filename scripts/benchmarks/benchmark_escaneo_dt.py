@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Benchmark del recorrido de la página de legislación de la DT.
+
+Compara el recorrido anterior de ScraperDT.obtener_documentos_dt (tres
+soup.find_all(string=re.compile(...)) sobre toda la página, tope de 50
+elementos y duplicados revisados con any() sobre la lista) con
+ScraperDT.escanear_documentos_dt (una pasada con una sola alternancia
+precompilada, conjunto de vistos y corte cuando las fechas pasan del día
+buscado) sobre una página guardada.
+
+Verifica que todo documento del día encontrado por el recorrido anterior
+también lo encuentre el nuevo; los adicionales (p. ej. dictámenes que el tope
+de 50 dejaba fuera) se informan aparte.
+
+data/legislacion_dt.html reproduce la página de la DT (dictamen destacado
+antiguo, sección Dictámenes y luego sección Ordinarios, cada una del más nuevo
+al más antiguo); se revisa con --html data/legislacion_dt.html --fecha 17-09-2025.
+Sin --html se genera una página con la misma estructura y más días.
+
+Uso:
+    python scripts/benchmarks/benchmark_escaneo_dt.py [--html data/legislacion_dt.html --fecha 17-09-2025]
+                                                      [--dias 60] [--por-dia 6] [--repeticiones 20]
+"""
+import argparse
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / 'scripts' / 'scrapers'))
+
+from bs4 import BeautifulSoup
+
+from scraper_dt import ScraperDT
+
+
+def escaneo_anterior(scraper, soup, fecha_busqueda):
+    """Copia del recorrido anterior de obtener_documentos_dt (sin el corte final a 5)"""
+    documentos = []
+    documentos_del_dia = []
+
+    patrones = [
+        r'ORD\.?\s*N[°º]\s*\d+(/\d+)?',
+        r'DICTAMEN\s*N[°º]\s*\d+',
+        r'DIC\.?\s*N[°º]\s*\d+'
+    ]
+
+    elementos_encontrados = []
+    for patron in patrones:
+        elementos = soup.find_all(string=re.compile(patron, re.IGNORECASE))
+        elementos_encontrados.extend(elementos)
+
+    for elemento in elementos_encontrados[:50]:
+        try:
+            numero_match = re.search(r'(ORD\.?\s*N[°º]\s*\d+(/\d+)?|DICTAMEN\s*N[°º]\s*\d+|DIC\.?\s*N[°º]\s*\d+)',
+                                     str(elemento), re.IGNORECASE)
+            if not numero_match:
+                continue
+            numero = numero_match.group()
+
+            parent = elemento.parent
+            contador = 0
+            while parent and contador < 5:
+                if parent.name in ['li', 'article', 'div', 'p', 'td', 'tr']:
+                    break
+                parent = parent.parent
+                contador += 1
+
+            if not parent:
+                parent = elemento.parent
+
+            texto_completo = parent.get_text(separator=' ', strip=True) if parent else str(elemento)
+
+            descripcion = texto_completo
+            for parte in [numero, 'Dictamen destacado']:
+                descripcion = descripcion.replace(parte, '')
+
+            fecha_doc = ""
+            fecha_doc_obj = None
+            fecha_match = re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}', texto_completo)
+            if fecha_match:
+                fecha_doc = fecha_match.group()
+                fecha_doc_obj = scraper.convertir_fecha_dt(fecha_doc)
+                descripcion = descripcion.replace(fecha_doc, '')
+
+            es_del_dia = False
+            if fecha_doc_obj:
+                if fecha_doc_obj.date() == fecha_busqueda.date():
+                    es_del_dia = True
+
+            descripcion = ' '.join(descripcion.split())
+            descripcion = descripcion.strip(' ;,.')
+
+            tipo = "Ordinario"
+            if 'dictamen' in numero.lower() or 'dic.' in numero.lower():
+                tipo = "Dictamen"
+            elif 'ord' in numero.lower():
+                tipo = "Ordinario"
+
+            if len(descripcion) > 150:
+                descripcion = descripcion[:147] + "..."
+
+            if not descripcion or len(descripcion) < 10:
+                descripcion = f"Documento laboral de la Dirección del Trabajo"
+
+            url = scraper.url_legislacion
+            if parent:
+                link = parent.find('a', href=True)
+                if link:
+                    url = link['href']
+                    if not url.startswith('http'):
+                        url = scraper.base_url + url
+
+            numero = numero.replace('  ', ' ').strip()
+
+            documento = {
+                'tipo': tipo,
+                'numero': numero,
+                'descripcion': descripcion,
+                'fecha': fecha_doc if fecha_doc else "Sin fecha",
+                'url': url
+            }
+
+            if not any(d['numero'] == numero for d in documentos):
+                if es_del_dia:
+                    documentos_del_dia.append(documento)
+                else:
+                    documentos.append(documento)
+
+        except Exception:
+            continue
+
+    return documentos_del_dia
+
+
+def generar_pagina(dias: int, por_dia: int, hoy: datetime) -> str:
+    """Página de legislación con la estructura de la DT: Dictámenes y luego Ordinarios"""
+    materias = [
+        'Jornada de trabajo y descansos compensatorios en faenas mineras',
+        'Procedencia del pago de gratificación legal a trabajadores con contrato a plazo fijo',
+        'Alcance de la Ley N° 21.561 sobre reducción de la jornada laboral',
+        'Feriado proporcional de trabajadores con jornada parcial',
+    ]
+    destacado_fecha = (hoy - timedelta(days=dias + 30)).strftime('%d-%m-%Y')
+    destacado = (
+        "<div class='destacado'><p>Dictamen destacado</p><ul>"
+        f"<li><a href='/legislacion/1624/w3-article-1.html'>DICTAMEN N° 1</a> "
+        f"<span>{destacado_fecha}</span><p>{materias[0]}</p></li></ul></div>"
+    )
+    dictamenes = []
+    ordinarios = []
+    correlativo = 5000
+    for dia in range(1, dias + 1):
+        fecha = (hoy - timedelta(days=dia)).strftime('%d-%m-%Y')
+        for j in range(por_dia):
+            correlativo -= 1
+            es_ordinario = j % 3
+            numero = f"ORD. N° {correlativo}/{j + 10}" if es_ordinario else f"DICTAMEN N° {correlativo}"
+            (ordinarios if es_ordinario else dictamenes).append(
+                f"<li><a href='/legislacion/1624/w3-article-{correlativo}.html'>{numero}</a> "
+                f"<span>{fecha}</span><p>{materias[correlativo % len(materias)]}</p></li>"
+            )
+    menu = "".join(f"<li><a href='/seccion/{i}'>Sección {i}</a></li>" for i in range(80))
+    return (
+        "<html><body><nav><ul>" + menu + "</ul></nav><main>" + destacado +
+        "<section><h2>Dictámenes</h2><ul class='listado'>" + "".join(dictamenes) + "</ul></section>"
+        "<section><h2>Ordinarios</h2><ul class='listado'>" + "".join(ordinarios) + "</ul></section>"
+        "</main><footer><p>Dirección del Trabajo - Gobierno de Chile</p></footer></body></html>"
+    )
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--html', type=Path, help='Página de legislación de la DT guardada')
+    parser.add_argument('--fecha', help='Día buscado DD-MM-YYYY (por defecto, ayer)')
+    parser.add_argument('--dias', type=int, default=60, help='Días del listado generado (sin --html)')
+    parser.add_argument('--por-dia', type=int, default=6, help='Documentos por día del listado generado')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    fecha_busqueda = datetime.strptime(args.fecha, '%d-%m-%Y') if args.fecha else hoy - timedelta(days=1)
+
+    if args.html:
+        contenido = args.html.read_text(encoding='utf-8', errors='replace')
+        origen = str(args.html)
+    else:
+        contenido = generar_pagina(args.dias, args.por_dia, hoy)
+        origen = f"listado generado ({args.dias} días x {args.por_dia})"
+
+    scraper = ScraperDT()
+
+    t_parseo, soup = medir(lambda: BeautifulSoup(contenido, 'html.parser'), max(1, args.repeticiones // 4))
+    t_anterior, anteriores = medir(lambda: escaneo_anterior(scraper, soup, fecha_busqueda), args.repeticiones)
+    t_actual, actuales = medir(lambda: scraper.escanear_documentos_dt(soup, fecha_busqueda), args.repeticiones)
+
+    # El recorrido anterior podía repetir documentos del día
+    numeros_anteriores = list(dict.fromkeys(d['numero'] for d in anteriores))
+    numeros_actuales = [d['numero'] for d in actuales]
+    faltantes = [n for n in numeros_anteriores if n not in set(numeros_actuales)]
+    por_numero = {d['numero']: d for d in actuales}
+    distintos = [d['numero'] for d in anteriores if d['numero'] in por_numero and d != por_numero[d['numero']]]
+
+    print(f"{origen} ({len(contenido) / 1024:.0f} KB), día buscado {fecha_busqueda.strftime('%d/%m/%Y')}")
+    print(f"Parseo BeautifulSoup (común a ambos):   {t_parseo:>8.2f} ms")
+    print(f"Recorrido anterior (3 find_all):        {t_anterior:>8.2f} ms, {len(anteriores)} documentos del día")
+    print(f"Recorrido de una pasada:                {t_actual:>8.2f} ms, {len(actuales)} documentos del día")
+    if t_actual:
+        print(f"Aceleración del recorrido:              {t_anterior / t_actual:>8.1f}x")
+
+    if faltantes or distintos:
+        print(f"❌ Documentos del recorrido anterior ausentes o distintos: {faltantes + distintos}")
+        return 1
+
+    repetidos = len(anteriores) - len(numeros_anteriores)
+    if repetidos:
+        print(f"(el recorrido anterior repetía {repetidos} documentos del día)")
+    adicionales = [n for n in numeros_actuales if n not in set(numeros_anteriores)]
+    if adicionales:
+        print(f"(el recorrido de una pasada encuentra además {len(adicionales)} que el tope de 50 dejaba fuera: "
+              f"{', '.join(adicionales[:5])}{'...' if len(adicionales) > 5 else ''})")
+
+    print(f"\n✅ Los {len(numeros_anteriores)} documentos del recorrido anterior están en el nuevo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción forzada y la validación de texto de PDFExtractor.
+
+Compara la implementación anterior (decodificar todo el PDF como latin-1 y
+puntuar carácter por carácter) con la actual (solo streams de contenido y
+validación sobre una ventana muestreada) usando PDFs sintéticos armados con
+texto estilo ejemplo_extraccion.txt más streams binarios del tamaño de una
+imagen escaneada.
+
+Uso:
+    python scripts/benchmarks/benchmark_extraccion_forzada.py [--repeticiones 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.pdf_extractor import PDFExtractor
+
+
+def _force_text_anterior(pdf_content: bytes) -> str:
+    """Implementación previa de PDFExtractor._extract_force_text (referencia)"""
+    pdf_str = pdf_content.decode('latin-1', errors='ignore')
+    matches = re.findall(r'\((.*?)\)', pdf_str)
+    text = ' '.join(matches)
+    if len(text) < 100:
+        ascii_matches = re.findall(r'[\x20-\x7E]{20,}', pdf_str)
+        text += ' '.join(ascii_matches)
+    text = re.sub(r'[^\x20-\x7E\n\r\t]+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()[:10000]
+
+
+def _is_valid_text_anterior(text: str) -> bool:
+    """Implementación previa de PDFExtractor._is_valid_text (referencia)"""
+    if not text or len(text.strip()) < 20:
+        return False
+    if len(text.split()) < 3:
+        return False
+    ratio = sum(c.isalnum() or c.isspace() or c in '.,;:-()[]{}/@#$%&*+=|<>"\'' for c in text) / len(text)
+    return ratio >= 0.3
+
+
+def _texto_base() -> str:
+    ejemplo = BASE_DIR / 'ejemplo_extraccion.txt'
+    if ejemplo.exists():
+        return ejemplo.read_text(encoding='utf-8')
+    return ('El proyecto consiste en la construcción y operación de una planta de '
+            'generación de energía renovable en la región de ejemplo.')
+
+
+def construir_pdf(texto: str, paginas: int, bytes_imagen: int) -> bytes:
+    """Arma un PDF mínimo con streams de texto comprimidos y streams binarios"""
+    partes = [b'%PDF-1.4\n']
+    lineas = [l for l in texto.splitlines() if l.strip()]
+    for num in range(paginas):
+        operadores = b'BT /F1 11 Tf 72 720 Td\n'
+        for linea in lineas * 20:
+            segura = linea.encode('latin-1', errors='ignore').replace(b'(', b'').replace(b')', b'')
+            operadores += b'(' + segura + b') Tj T*\n'
+        operadores += b'ET\n'
+        comprimido = zlib.compress(operadores)
+        partes.append(
+            f'{num * 2 + 1} 0 obj<</Length {len(comprimido)}/Filter/FlateDecode>>stream\n'.encode()
+            + comprimido + b'\nendstream\nendobj\n'
+        )
+        imagen = os.urandom(bytes_imagen)
+        partes.append(
+            f'{num * 2 + 2} 0 obj<</Subtype/Image/Length {len(imagen)}/Filter/DCTDecode>>stream\n'.encode()
+            + imagen + b'\nendstream\nendobj\n'
+        )
+    partes.append(b'%%EOF\n')
+    return b''.join(partes)
+
+
+def medir(func, arg, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        func(arg)
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = PDFExtractor()
+    texto = _texto_base()
+    corpus = {
+        'decreto_2p_texto': construir_pdf(texto, paginas=2, bytes_imagen=20_000),
+        'hecho_cmf_escaneado_4p': construir_pdf(texto, paginas=4, bytes_imagen=800_000),
+        'circular_10p_mixta': construir_pdf(texto, paginas=10, bytes_imagen=300_000),
+    }
+
+    print(f"{'documento':<26}{'MB':>6}{'force ant.(ms)':>16}{'force act.(ms)':>16}"
+          f"{'valid ant.(ms)':>16}{'valid act.(ms)':>16}")
+    for nombre, pdf in corpus.items():
+        t_force_ant = medir(_force_text_anterior, pdf, args.repeticiones)
+        t_force_act = medir(lambda c: extractor._extract_force_text(c, 2), pdf, args.repeticiones)
+        # La validación se mide sobre el binario decodificado: el peor caso real
+        texto_largo = pdf.decode('latin-1')
+        t_valid_ant = medir(_is_valid_text_anterior, texto_largo, args.repeticiones)
+        t_valid_act = medir(extractor._is_valid_text, texto_largo, args.repeticiones)
+        print(f"{nombre:<26}{len(pdf) / 1e6:>6.2f}{t_force_ant:>16.1f}{t_force_act:>16.1f}"
+              f"{t_valid_ant:>16.1f}{t_valid_act:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
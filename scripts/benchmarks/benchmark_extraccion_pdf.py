@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Harness de regresión para la extracción de texto de PDFs.
+
+Corre PDFExtractor (cada método por separado y la cascada completa) y
+CMFPDFExtractorGarantizado sobre el corpus offline de data/pdf_corpus/ y
+reporta, por documento y método:
+
+- latencia (mediana de N repeticiones)
+- memoria pico (tracemalloc)
+- similitud del texto contra el golden (difflib)
+
+La similitud se exige contra los mínimos por método versionados en
+manifest.json (similitud_minima), así que una copia recién clonada también
+detecta regresiones de calidad. Latencia y memoria dependen de la máquina:
+se comparan contra data/pdf_corpus/baseline.json, que no se versiona; la
+primera corrida la crea y --actualizar-baseline la reemplaza. El script
+termina con código 1 si algún método queda bajo su mínimo o empeora más allá
+de la tolerancia.
+
+El corpus se regenera con scripts/benchmarks/generar_corpus_pdf.py.
+
+Uso:
+    python scripts/benchmarks/benchmark_extraccion_pdf.py
+    python scripts/benchmarks/benchmark_extraccion_pdf.py --actualizar-baseline
+    python scripts/benchmarks/benchmark_extraccion_pdf.py --documento decreto_do --repeticiones 10
+"""
+import argparse
+import difflib
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.pdf_extractor import PDFExtractor
+from scripts.scrapers.cmf_pdf_extractor_garantizado import CMFPDFExtractorGarantizado
+
+CORPUS_DIR = BASE_DIR / 'data' / 'pdf_corpus'
+BASELINE_FILE = CORPUS_DIR / 'baseline.json'
+
+# Tolerancias antes de considerar una regresión
+TOLERANCIA_LATENCIA = 0.5     # +50% sobre la baseline
+HOLGURA_LATENCIA_MS = 5.0     # ruido absoluto aceptado en métodos muy rápidos
+TOLERANCIA_MEMORIA = 0.5      # +50% sobre la baseline
+
+
+def normalizar(texto: str) -> str:
+    return re.sub(r'\s+', ' ', texto or '').strip().lower()
+
+
+def similitud(texto: str, golden: str) -> float:
+    return difflib.SequenceMatcher(None, normalizar(texto), normalizar(golden), autojunk=False).ratio()
+
+
+def metodos_a_medir():
+    """Métodos a evaluar: nombre -> callable(pdf_bytes, paginas) -> texto"""
+    extractor = PDFExtractor()
+    garantizado = CMFPDFExtractorGarantizado()
+    metodos = {f'pdf_extractor.{nombre}': func for nombre, func in extractor.methods_priority}
+    metodos['pdf_extractor.cascada'] = lambda pdf, paginas: extractor.extract_text(pdf, max_pages=paginas)[0]
+    metodos['cmf_garantizado.cascada'] = lambda pdf, paginas: garantizado.extract_text_guaranteed(pdf)[0]
+    return metodos
+
+
+def medir_metodo(func, pdf: bytes, paginas: int, repeticiones: int) -> dict:
+    latencias = []
+    texto = ''
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        texto = func(pdf, paginas) or ''
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    # La memoria se mide en una corrida aparte para no distorsionar la latencia
+    tracemalloc.start()
+    func(pdf, paginas)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'latencia_ms': round(statistics.median(latencias), 2),
+        'memoria_kb': round(pico / 1024, 1),
+        'chars': len(texto),
+        '_texto': texto,
+    }
+
+
+def leer_manifest() -> dict:
+    return json.loads((CORPUS_DIR / 'manifest.json').read_text(encoding='utf-8'))
+
+
+def correr_benchmark(manifest: dict, documentos=None, repeticiones: int = 3) -> dict:
+    metodos = metodos_a_medir()
+    resultados = {}
+
+    for nombre, info in manifest.items():
+        if documentos and nombre not in documentos:
+            continue
+        pdf = (CORPUS_DIR / info['archivo']).read_bytes()
+        golden = (CORPUS_DIR / info['golden']).read_text(encoding='utf-8')
+        resultados[nombre] = {}
+
+        for metodo, func in metodos.items():
+            try:
+                medicion = medir_metodo(func, pdf, info['paginas'], repeticiones)
+            except Exception as e:
+                resultados[nombre][metodo] = {'error': str(e)[:200]}
+                continue
+            medicion['similitud'] = round(similitud(medicion.pop('_texto'), golden), 3)
+            resultados[nombre][metodo] = medicion
+
+    return resultados
+
+
+def detectar_bajo_minimo(resultados: dict, manifest: dict) -> list:
+    """Métodos cuya similitud queda bajo el mínimo versionado en el manifest"""
+    regresiones = []
+    for documento, metodos in resultados.items():
+        minimos = manifest[documento].get('similitud_minima', {})
+        for metodo, minimo in minimos.items():
+            actual = metodos.get(metodo)
+            if actual is None:
+                continue
+            if 'error' in actual:
+                regresiones.append(f"{documento} / {metodo}: falla ({actual['error']})")
+            elif actual['similitud'] < minimo:
+                regresiones.append(f"{documento} / {metodo}: similitud {actual['similitud']} < {minimo}")
+    return regresiones
+
+
+def detectar_regresiones(resultados: dict, baseline: dict) -> list:
+    """Empeoramientos de latencia y memoria respecto a la baseline local"""
+    regresiones = []
+    for documento, metodos in resultados.items():
+        for metodo, actual in metodos.items():
+            previo = baseline.get(documento, {}).get(metodo)
+            if not previo or 'error' in previo:
+                continue
+            if 'error' in actual:
+                regresiones.append(f"{documento} / {metodo}: ahora falla ({actual['error']})")
+                continue
+            limite_latencia = previo['latencia_ms'] * (1 + TOLERANCIA_LATENCIA) + HOLGURA_LATENCIA_MS
+            if actual['latencia_ms'] > limite_latencia:
+                regresiones.append(
+                    f"{documento} / {metodo}: latencia {actual['latencia_ms']}ms > {limite_latencia:.1f}ms")
+            limite_memoria = previo['memoria_kb'] * (1 + TOLERANCIA_MEMORIA)
+            if actual['memoria_kb'] > limite_memoria:
+                regresiones.append(
+                    f"{documento} / {metodo}: memoria {actual['memoria_kb']}KB > {limite_memoria:.1f}KB")
+    return regresiones
+
+
+def imprimir_reporte(resultados: dict):
+    print(f"\n{'documento':<22}{'método':<32}{'ms':>10}{'KB pico':>10}{'chars':>8}{'similitud':>11}")
+    print('-' * 93)
+    for documento, metodos in resultados.items():
+        for metodo, r in metodos.items():
+            if 'error' in r:
+                print(f"{documento:<22}{metodo:<32}  ERROR: {r['error'][:40]}")
+            else:
+                print(f"{documento:<22}{metodo:<32}{r['latencia_ms']:>10.1f}{r['memoria_kb']:>10.1f}"
+                      f"{r['chars']:>8}{r['similitud']:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de extracción de PDFs sobre el corpus offline')
+    parser.add_argument('--documento', action='append', help='Limitar a uno o más documentos del corpus')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--actualizar-baseline', action='store_true',
+                        help='Guardar los resultados actuales como nueva baseline')
+    args = parser.parse_args()
+
+    # Los extractores registran cada intento; aquí solo interesa el reporte
+    logging.basicConfig(level=logging.ERROR)
+
+    manifest = leer_manifest()
+    resultados = correr_benchmark(manifest, args.documento, args.repeticiones)
+    imprimir_reporte(resultados)
+
+    regresiones = detectar_bajo_minimo(resultados, manifest)
+
+    if args.actualizar_baseline or not BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text(encoding='utf-8')) if BASELINE_FILE.exists() else {}
+        baseline.update(resultados)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\n💾 Baseline guardada en {BASELINE_FILE.relative_to(BASE_DIR)}")
+    else:
+        regresiones += detectar_regresiones(resultados, json.loads(BASELINE_FILE.read_text(encoding='utf-8')))
+
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresión(es) detectada(s):")
+        for r in regresiones:
+            print(f"  - {r}")
+        return 1
+
+    print("\n✅ Sin regresiones: similitud sobre los mínimos del manifest y rendimiento dentro de la baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la detección de empresas IPSA / estratégicas en los criterios CMF.
+
+Compara la implementación anterior (recorrer EMPRESAS_IPSA y
+EMPRESAS_ESTRATEGICAS con subcadenas en ambas direcciones, llamada varias
+veces por hecho) con MatcherEmpresas (Aho-Corasick precompilado + memo),
+sobre las entidades del histórico data/hechos_cmf_selenium_reales.json.
+También verifica que ambas clasifiquen igual cada entidad.
+
+Uso:
+    python scripts/benchmarks/benchmark_matcher_empresas.py [--repeticiones 20]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.cmf_criterios_profesionales import (
+    EMPRESAS_ESTRATEGICAS,
+    EMPRESAS_IPSA,
+    MATCHER_EMPRESAS,
+    es_empresa_estrategica,
+    es_empresa_ipsa,
+    es_empresa_prioritaria,
+)
+
+
+def _es_ipsa_anterior(nombre_empresa):
+    nombre_upper = nombre_empresa.upper().strip()
+    for empresa_ipsa in EMPRESAS_IPSA:
+        if empresa_ipsa in nombre_upper or nombre_upper in empresa_ipsa:
+            return True
+    return False
+
+
+def _es_estrategica_anterior(nombre_empresa):
+    if _es_ipsa_anterior(nombre_empresa):
+        return True
+    nombre_upper = nombre_empresa.upper().strip()
+    for empresa in EMPRESAS_ESTRATEGICAS:
+        if empresa in nombre_upper or nombre_upper in empresa:
+            return True
+    return False
+
+
+def _es_prioritaria_anterior(nombre_empresa):
+    return _es_ipsa_anterior(nombre_empresa) or _es_estrategica_anterior(nombre_empresa)
+
+
+def evaluar_dia(entidades, es_ipsa, es_estrategica, es_prioritaria):
+    """Llamadas que hacen filtrar_hechos_profesional + calcular_relevancia por hecho"""
+    for entidad in entidades:
+        es_estrategica(entidad)
+        es_ipsa(entidad)
+        es_prioritaria(entidad)
+
+
+def cargar_entidades():
+    json_path = BASE_DIR / 'data' / 'hechos_cmf_selenium_reales.json'
+    with open(json_path, 'r', encoding='utf-8') as f:
+        hechos = json.load(f).get('hechos', [])
+    entidades = [h.get('entidad', '') for h in hechos]
+    # Casos límite: nombres cortos, contenidos en la lista y en minúsculas
+    entidades += ['SQM', 'Banco de Chile', 'CAP S.A.', 'ENEL', 'CLINICA', 'XYZ INVERSIONES LTDA']
+    return entidades
+
+
+def medir(func, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        func()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    entidades = cargar_entidades()
+
+    diferencias = [
+        e for e in entidades
+        if (_es_ipsa_anterior(e), _es_estrategica_anterior(e)) != (es_empresa_ipsa(e), es_empresa_estrategica(e))
+    ]
+    if diferencias:
+        print(f"❌ {len(diferencias)} entidades clasificadas distinto: {diferencias[:5]}")
+        return 1
+
+    t_anterior = medir(lambda: evaluar_dia(entidades, _es_ipsa_anterior, _es_estrategica_anterior,
+                                           _es_prioritaria_anterior), args.repeticiones)
+
+    # Sin memo: costo real del autómata por entidad nueva
+    def sin_memo():
+        for entidad in entidades:
+            MATCHER_EMPRESAS._clasificar(entidad)
+    t_automata = medir(sin_memo, args.repeticiones)
+
+    MATCHER_EMPRESAS.clasificar.cache_clear()
+    t_actual = medir(lambda: evaluar_dia(entidades, es_empresa_ipsa, es_empresa_estrategica,
+                                         es_empresa_prioritaria), args.repeticiones)
+
+    print(f"{len(entidades)} entidades, {len(EMPRESAS_IPSA)} IPSA + {len(EMPRESAS_ESTRATEGICAS)} estratégicas")
+    print(f"{'implementación':<34}{'ms por día':>12}")
+    print(f"{'anterior (bucles de subcadenas)':<34}{t_anterior:>12.2f}")
+    print(f"{'autómata, una clasificación':<34}{t_automata:>12.2f}")
+    print(f"{'actual (autómata + memo)':<34}{t_actual:>12.2f}")
+    print(f"\n✅ Misma clasificación en las {len(entidades)} entidades")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark del envío de notificaciones de hechos esenciales (send_notifications).
+
+Arma dentro de una transacción (que se revierte al final) un fixture de N
+usuarios suscritos a un grupo de empresas con hechos pendientes, y compara
+la implementación anterior (consultas y un correo por cada par usuario-hecho)
+con la actual (una consulta de pares pendientes, un correo resumen por usuario
+por una conexión reutilizada y bulk_create). Los correos van al backend locmem.
+
+Uso:
+    python scripts/benchmarks/benchmark_notificaciones.py [--usuarios 3000] [--hechos 10]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'market_sniper.settings')
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from alerts.management.commands.send_notifications import Command
+from alerts.models import Empresa, HechoEsencial, NotificacionEnviada, PerfilUsuario
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _ContadorConsultas:
+    """execute_wrapper que cuenta sentencias (queries_log se corta en 9000)"""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def _handle_anterior():
+    """Implementación previa de send_notifications.Command.handle (referencia)"""
+    hechos_a_notificar = HechoEsencial.objects.filter(
+        notificacion_enviada=False, resumen__isnull=False, relevancia__isnull=False
+    ).select_related('empresa')
+    for hecho in hechos_a_notificar:
+        perfiles_suscritos = PerfilUsuario.objects.filter(suscripciones=hecho.empresa).select_related('user')
+        if not perfiles_suscritos.exists():
+            hecho.notificacion_enviada = True
+            hecho.save()
+            continue
+        for perfil in perfiles_suscritos:
+            usuario = perfil.user
+            if NotificacionEnviada.objects.filter(usuario=usuario, hecho_esencial=hecho).exists():
+                continue
+            if usuario.email:
+                cuerpo_html = render_to_string('alerts/email/notificacion_hecho_esencial.html', {
+                    'nombre_usuario': usuario.username,
+                    'hecho_esencial': hecho,
+                    'url_absoluta': settings.SITE_URL + reverse('alerts:dashboard'),
+                })
+                send_mail(subject=f'Alerta de Hecho Esencial: {hecho.empresa.nombre}', message='',
+                          from_email=settings.DEFAULT_FROM_EMAIL, recipient_list=[usuario.email],
+                          html_message=cuerpo_html, fail_silently=False)
+                NotificacionEnviada.objects.create(usuario=usuario, hecho_esencial=hecho)
+        hecho.notificacion_enviada = True
+        hecho.save()
+
+
+def crear_fixture(usuarios: int, hechos: int, empresas: int = 20):
+    """Usuarios suscritos a 3 empresas cada uno y `hechos` hechos pendientes repartidos entre las empresas"""
+    Empresa.objects.bulk_create([Empresa(nombre=f'BENCH EMPRESA {i}') for i in range(empresas)])
+    lista_empresas = list(Empresa.objects.filter(nombre__startswith='BENCH EMPRESA').order_by('pk'))
+    User.objects.bulk_create([
+        User(username=f'bench_{i}', email=f'bench_{i}@example.com') for i in range(usuarios)
+    ])
+    lista_usuarios = list(User.objects.filter(username__startswith='bench_').order_by('pk'))
+    PerfilUsuario.objects.bulk_create([PerfilUsuario(user=u) for u in lista_usuarios])
+    perfiles = list(PerfilUsuario.objects.filter(user__in=lista_usuarios).order_by('pk'))
+
+    Through = PerfilUsuario.suscripciones.through
+    Through.objects.bulk_create([
+        Through(perfilusuario=perfil, empresa=lista_empresas[(i + k) % empresas])
+        for i, perfil in enumerate(perfiles) for k in range(3)
+    ])
+    HechoEsencial.objects.bulk_create([
+        HechoEsencial(empresa=lista_empresas[i % empresas], titulo=f'Hecho {i}',
+                      url=f'https://bench.local/hecho/{i}', fecha_publicacion=timezone.now(),
+                      resumen='Resumen de prueba', relevancia=2)
+        for i in range(hechos)
+    ])
+
+
+def medir(func, usuarios: int, hechos: int):
+    """Corre func sobre un fixture nuevo y revierte todo al terminar"""
+    mail.outbox = []
+    try:
+        with transaction.atomic():
+            crear_fixture(usuarios, hechos)
+            consultas = _ContadorConsultas()
+            with connection.execute_wrapper(consultas):
+                inicio = time.perf_counter()
+                func()
+                duracion = time.perf_counter() - inicio
+            notificaciones = NotificacionEnviada.objects.filter(hecho_esencial__url__startswith='https://bench.local/').count()
+            raise _Rollback((duracion, consultas.total, len(mail.outbox), notificaciones))
+    except _Rollback as resultado:
+        return resultado.args[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--usuarios', type=int, default=3000)
+    parser.add_argument('--hechos', type=int, default=10)
+    parser.add_argument('--sin-anterior', action='store_true', help='No medir la implementación anterior')
+    args = parser.parse_args()
+
+    comando = Command(stdout=io.StringIO())
+    implementaciones = [('actual (resumen por usuario)', lambda: comando.handle())]
+    if not args.sin_anterior:
+        implementaciones.insert(0, ('anterior (por par usuario-hecho)', _handle_anterior))
+
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        print(f"{args.usuarios} usuarios, {args.hechos} hechos pendientes")
+        print(f"{'implementación':<34}{'s':>8}{'consultas':>11}{'correos':>9}{'notificaciones':>16}")
+        for nombre, func in implementaciones:
+            duracion, consultas, correos, notificaciones = medir(func, args.usuarios, args.hechos)
+            print(f"{nombre:<34}{duracion:>8.2f}{consultas:>11}{correos:>9}{notificaciones:>16}")
+
+
+if __name__ == "__main__":
+    main()
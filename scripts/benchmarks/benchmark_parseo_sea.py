@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lectura de la tabla de resultados del SEA.
+
+Compara la lectura celda por celda vía WebDriver (_extraer_proyecto_de_fila,
+un round-trip al navegador por cada find_elements/.text/get_attribute) con el
+parseo en proceso de un único driver.page_source (_extraer_proyectos_de_html)
+sobre una página de resultados guardada.
+
+- Siempre: verifica que ambos caminos den los mismos proyectos (la fila se
+  recorre con un adaptador sobre lxml que cuenta las llamadas que harían a
+  WebDriver) y mide el parseo del snapshot.
+- Si hay Chrome disponible: abre la página con file:// y mide ambos caminos
+  contra el navegador real, contando los comandos WebDriver enviados.
+
+data/resultados_sea.html reproduce la tabla de 12 columnas de resultados del
+SEA (32 filas, de las que el scraper lee las primeras 30) dentro del resto de
+la página: cabecera, formulario de búsqueda y paginación.
+
+Uso:
+    python scripts/benchmarks/benchmark_parseo_sea.py [--html data/resultados_sea.html] [--repeticiones 50]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / 'scripts' / 'scrapers'))
+
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+
+from scraper_sea_selenium_completo import XPATH_FILAS_SEA, ScraperSEASeleniumCompleto, _texto_celda
+
+URL_BASE = "https://seia.sea.gob.cl/busqueda/buscarProyectoResumen.php"
+
+
+class _ElementoLxml:
+    """Imita la interfaz de WebElement usada por el scraper y cuenta cada llamada (un RPC real)"""
+
+    def __init__(self, nodo, contador):
+        self._nodo = nodo
+        self._contador = contador
+
+    def find_elements(self, by, valor):
+        self._contador[0] += 1
+        xpath = f'.//{valor}' if by == By.TAG_NAME else valor
+        return [_ElementoLxml(n, self._contador) for n in self._nodo.xpath(xpath)]
+
+    @property
+    def text(self):
+        self._contador[0] += 1
+        return _texto_celda(self._nodo)
+
+    def get_attribute(self, nombre):
+        self._contador[0] += 1
+        valor = self._nodo.get(nombre)
+        return urljoin(URL_BASE, valor) if nombre == 'href' and valor is not None else valor
+
+
+def _sin_fecha(proyectos):
+    return [{k: v for k, v in p.items() if k != 'fecha_extraccion'} for p in proyectos]
+
+
+def por_celdas(scraper, filas, driver=None):
+    proyectos = []
+    for fila in filas[:30]:
+        proyecto = scraper._extraer_proyecto_de_fila(fila, driver)
+        if proyecto and proyecto.get('titulo'):
+            proyectos.append(proyecto)
+    return proyectos
+
+
+def medir_con_chrome(scraper, ruta: Path):
+    """Ambos caminos contra un Chrome real; None si no hay navegador"""
+    try:
+        driver = scraper._setup_driver(headless=True)
+    except Exception as e:
+        print(f"\n(Chrome no disponible, se omite la medición contra el navegador: {str(e).splitlines()[0]})")
+        return None
+
+    comandos = [0]
+    execute_original = driver.execute
+
+    def execute_contado(*args, **kwargs):
+        comandos[0] += 1
+        return execute_original(*args, **kwargs)
+
+    driver.execute = execute_contado
+    try:
+        driver.get(ruta.as_uri())
+        resultados = []
+
+        comandos[0] = 0
+        inicio = time.perf_counter()
+        filas = driver.find_elements(By.XPATH, XPATH_FILAS_SEA)
+        por_celdas(scraper, filas, driver)
+        resultados.append(('WebDriver celda por celda', time.perf_counter() - inicio, comandos[0]))
+
+        comandos[0] = 0
+        inicio = time.perf_counter()
+        scraper._extraer_proyectos_de_html(driver.page_source, driver.current_url)
+        resultados.append(('page_source + lxml', time.perf_counter() - inicio, comandos[0]))
+        return resultados
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--html', type=Path, default=BASE_DIR / 'data' / 'resultados_sea.html',
+                        help='Página de resultados del SEA guardada')
+    parser.add_argument('--repeticiones', type=int, default=50)
+    args = parser.parse_args()
+
+    ruta = args.html.resolve()
+    contenido = ruta.read_text(encoding='utf-8', errors='replace')
+
+    scraper = ScraperSEASeleniumCompleto()
+
+    # Equivalencia y llamadas a WebDriver del camino anterior
+    contador = [1]  # el find_elements de las filas
+    raiz = lxml_html.fromstring(contenido)
+    filas = [_ElementoLxml(n, contador) for n in raiz.xpath(XPATH_FILAS_SEA)]
+    anteriores = por_celdas(scraper, filas)
+    actuales = scraper._extraer_proyectos_de_html(contenido, URL_BASE)
+    if _sin_fecha(anteriores) != _sin_fecha(actuales):
+        print("❌ Los proyectos extraídos difieren entre ambos caminos")
+        return 1
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        scraper._extraer_proyectos_de_html(contenido, URL_BASE)
+    t_snapshot = (time.perf_counter() - inicio) / args.repeticiones * 1000
+
+    print(f"{ruta} ({len(contenido) / 1024:.0f} KB), {len(actuales)} proyectos")
+    print(f"Llamadas a WebDriver, celda por celda: {contador[0]}")
+    print(f"Llamadas a WebDriver, snapshot:        1 (page_source)")
+    print(f"Parseo en proceso del snapshot:        {t_snapshot:.2f} ms")
+
+    resultados = medir_con_chrome(scraper, ruta)
+    if resultados:
+        print(f"\n{'Chrome headless':<28}{'ms':>10}{'comandos':>10}")
+        for nombre, duracion, comandos in resultados:
+            print(f"{nombre:<28}{duracion * 1000:>10.1f}{comandos:>10}")
+
+    print(f"\n✅ Mismos {len(actuales)} proyectos por ambos caminos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Genera el corpus offline de PDFs para el benchmark de extracción.
+
+Los documentos se arman en Python puro (sin dependencias) para que el corpus
+sea reproducible y no dependa de sitios en vivo:
+
+- decreto_do: decreto del Diario Oficial con capa de texto (3 páginas)
+- hecho_cmf_escaneado: hecho esencial CMF sin capa de texto (imagen 1 bit)
+- proyecto_camara: proyecto de ley de camara.cl con capa de texto (5 páginas)
+- circular_sii: circular del SII con capa de texto (2 páginas)
+
+Cada documento se guarda junto a su texto de referencia (golden) en
+data/pdf_corpus/, con un manifest.json que describe el corpus.
+
+Uso:
+    python scripts/benchmarks/generar_corpus_pdf.py
+"""
+import json
+import zlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CORPUS_DIR = BASE_DIR / 'data' / 'pdf_corpus'
+
+# Fuente de mapa de bits 5x7 para el documento escaneado (solo mayúsculas)
+FUENTE_5X7 = {
+    'A': ['01110', '10001', '10001', '11111', '10001', '10001', '10001'],
+    'B': ['11110', '10001', '10001', '11110', '10001', '10001', '11110'],
+    'C': ['01110', '10001', '10000', '10000', '10000', '10001', '01110'],
+    'D': ['11110', '10001', '10001', '10001', '10001', '10001', '11110'],
+    'E': ['11111', '10000', '10000', '11110', '10000', '10000', '11111'],
+    'F': ['11111', '10000', '10000', '11110', '10000', '10000', '10000'],
+    'G': ['01110', '10001', '10000', '10111', '10001', '10001', '01111'],
+    'H': ['10001', '10001', '10001', '11111', '10001', '10001', '10001'],
+    'I': ['01110', '00100', '00100', '00100', '00100', '00100', '01110'],
+    'J': ['00111', '00010', '00010', '00010', '00010', '10010', '01100'],
+    'K': ['10001', '10010', '10100', '11000', '10100', '10010', '10001'],
+    'L': ['10000', '10000', '10000', '10000', '10000', '10000', '11111'],
+    'M': ['10001', '11011', '10101', '10101', '10001', '10001', '10001'],
+    'N': ['10001', '11001', '10101', '10011', '10001', '10001', '10001'],
+    'O': ['01110', '10001', '10001', '10001', '10001', '10001', '01110'],
+    'P': ['11110', '10001', '10001', '11110', '10000', '10000', '10000'],
+    'Q': ['01110', '10001', '10001', '10001', '10101', '10010', '01101'],
+    'R': ['11110', '10001', '10001', '11110', '10100', '10010', '10001'],
+    'S': ['01111', '10000', '10000', '01110', '00001', '00001', '11110'],
+    'T': ['11111', '00100', '00100', '00100', '00100', '00100', '00100'],
+    'U': ['10001', '10001', '10001', '10001', '10001', '10001', '01110'],
+    'V': ['10001', '10001', '10001', '10001', '10001', '01010', '00100'],
+    'W': ['10001', '10001', '10001', '10101', '10101', '10101', '01010'],
+    'X': ['10001', '10001', '01010', '00100', '01010', '10001', '10001'],
+    'Y': ['10001', '10001', '01010', '00100', '00100', '00100', '00100'],
+    'Z': ['11111', '00001', '00010', '00100', '01000', '10000', '11111'],
+    '0': ['01110', '10001', '10011', '10101', '11001', '10001', '01110'],
+    '1': ['00100', '01100', '00100', '00100', '00100', '00100', '01110'],
+    '2': ['01110', '10001', '00001', '00010', '00100', '01000', '11111'],
+    '3': ['11111', '00010', '00100', '00010', '00001', '10001', '01110'],
+    '4': ['00010', '00110', '01010', '10010', '11111', '00010', '00010'],
+    '5': ['11111', '10000', '11110', '00001', '00001', '10001', '01110'],
+    '6': ['00110', '01000', '10000', '11110', '10001', '10001', '01110'],
+    '7': ['11111', '00001', '00010', '00100', '01000', '01000', '01000'],
+    '8': ['01110', '10001', '10001', '01110', '10001', '10001', '01110'],
+    '9': ['01110', '10001', '10001', '01111', '00001', '00010', '01100'],
+    '.': ['00000', '00000', '00000', '00000', '00000', '01100', '01100'],
+    ',': ['00000', '00000', '00000', '00000', '01100', '00100', '01000'],
+    ':': ['00000', '01100', '01100', '00000', '01100', '01100', '00000'],
+    '-': ['00000', '00000', '00000', '11111', '00000', '00000', '00000'],
+    '/': ['00001', '00010', '00010', '00100', '01000', '01000', '10000'],
+    ' ': ['00000'] * 7,
+}
+
+DECRETO_DO = [
+    "MINISTERIO DE HACIENDA",
+    "APRUEBA REGLAMENTO SOBRE CONDICIONES DE EMISIÓN DE BONOS DE LA TESORERÍA GENERAL DE LA REPÚBLICA",
+    "Núm. 1.245.- Santiago, 3 de marzo de 2025.",
+    "Vistos: Lo dispuesto en el artículo 32 N° 6 de la Constitución Política de la República; "
+    "en el decreto ley N° 1.263, de 1975, Orgánico de Administración Financiera del Estado; "
+    "y en la resolución N° 7, de 2019, de la Contraloría General de la República.",
+    "Considerando: Que es necesario actualizar las condiciones generales de emisión de los "
+    "instrumentos de deuda pública, con el objeto de facilitar su negociación en el mercado "
+    "secundario y ampliar la base de inversionistas.",
+    "Decreto: Artículo primero.- Apruébase el siguiente reglamento sobre condiciones de emisión "
+    "de bonos de la Tesorería General de la República, expresados en pesos y en unidades de fomento.",
+    "Artículo segundo.- Los bonos se emitirán en series, con amortización al vencimiento y "
+    "pago semestral de intereses, según lo determine el Ministro de Hacienda mediante resolución.",
+    "Artículo tercero.- El presente decreto comenzará a regir a contar de su publicación en el Diario Oficial.",
+    "Anótese, tómese razón, comuníquese y publíquese.- GABRIEL BORIC FONT, Presidente de la República.",
+]
+
+HECHO_CMF = [
+    "HECHO ESENCIAL",
+    "EMPRESAS COPEC S.A.",
+    "INSCRIPCION REGISTRO DE VALORES N. 0028",
+    "SANTIAGO, 14 DE MARZO DE 2025",
+    "SENORA SOLANGE BERSTEIN JAUREGUI",
+    "PRESIDENTA COMISION PARA EL MERCADO FINANCIERO",
+    "DE CONFORMIDAD CON LO DISPUESTO EN EL ARTICULO 9",
+    "Y EN EL INCISO SEGUNDO DEL ARTICULO 10 DE LA LEY 18.045",
+    "INFORMO QUE EL DIRECTORIO ACORDO CITAR A JUNTA",
+    "ORDINARIA DE ACCIONISTAS PARA EL 23 DE ABRIL DE 2025",
+    "Y PROPONER EL PAGO DE UN DIVIDENDO DEFINITIVO",
+    "DE 150 PESOS POR ACCION.",
+    "GERENTE GENERAL",
+]
+
+PROYECTO_CAMARA = [
+    "PROYECTO DE LEY",
+    "Boletín N° 17.321-05",
+    "Modifica la ley sobre impuesto a la renta para incentivar la inversión en investigación y desarrollo.",
+    "Antecedentes. El gasto en investigación y desarrollo del país alcanza apenas al 0,36% del producto "
+    "interno bruto, muy por debajo del promedio de los países de la OCDE.",
+    "Objetivo. El presente proyecto busca ampliar el crédito tributario establecido en la ley N° 20.241, "
+    "aumentando el tope anual y permitiendo su uso por pequeñas y medianas empresas.",
+    "Contenido. Se propone elevar el límite del crédito de 15.000 a 30.000 unidades tributarias mensuales "
+    "y extender el beneficio a contratos celebrados con centros de investigación acreditados.",
+    "Artículo único.- Introdúcense las siguientes modificaciones en la ley N° 20.241: "
+    "a) Reemplázase en el artículo 1 la expresión 15.000 por 30.000. "
+    "b) Agrégase un nuevo inciso final en el artículo 6.",
+    "Disposición transitoria. Las modificaciones regirán a contar del 1 de enero del año siguiente a su publicación.",
+]
+
+CIRCULAR_SII = [
+    "SERVICIO DE IMPUESTOS INTERNOS",
+    "CIRCULAR N° 12 DEL 28 DE FEBRERO DE 2025",
+    "Materia: Imparte instrucciones sobre la declaración jurada anual de operaciones con criptoactivos.",
+    "I. Introducción. Mediante la resolución exenta N° 28, de 2025, este Servicio estableció la obligación "
+    "de informar las operaciones de compra y venta de criptoactivos realizadas por contribuyentes domiciliados en Chile.",
+    "II. Instrucciones. Los contribuyentes obligados deberán presentar el formulario 1960 hasta el 30 de junio "
+    "de cada año, informando el detalle de las operaciones del año comercial anterior.",
+    "III. Vigencia. La presente circular rige a contar de su publicación en extracto en el Diario Oficial.",
+    "DIRECTOR",
+]
+
+
+def _escapar_pdf(texto: str) -> bytes:
+    return (texto.encode('cp1252', errors='replace')
+            .replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)'))
+
+
+def _partir_lineas(parrafo: str, ancho: int = 90):
+    palabras, linea = parrafo.split(), ''
+    for palabra in palabras:
+        if len(linea) + len(palabra) + 1 > ancho:
+            yield linea
+            linea = palabra
+        else:
+            linea = f'{linea} {palabra}'.strip()
+    if linea:
+        yield linea
+
+
+def _ensamblar_pdf(paginas):
+    """
+    Ensambla un PDF válido (con tabla xref) a partir de una lista de páginas.
+    Cada página es (contenido_bytes, recursos_dict_bytes, objetos_extra).
+    """
+    objetos = {1: b'<< /Type /Catalog /Pages 2 0 R >>',
+               3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'}
+    siguiente = 4
+    kids = []
+    for contenido, recursos, extras in paginas:
+        ids_extra = {}
+        for nombre, (dic, datos) in extras.items():
+            ids_extra[nombre] = siguiente
+            objetos[siguiente] = dic + b'\nstream\n' + datos + b'\nendstream'
+            siguiente += 1
+        recursos = recursos % {k.encode(): str(v).encode() for k, v in ids_extra.items()} if ids_extra else recursos
+        comprimido = zlib.compress(contenido)
+        id_contenido = siguiente
+        objetos[id_contenido] = (f'<< /Length {len(comprimido)} /Filter /FlateDecode >>\nstream\n'.encode()
+                                 + comprimido + b'\nendstream')
+        id_pagina = siguiente + 1
+        objetos[id_pagina] = (b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources '
+                              + recursos + f' /Contents {id_contenido} 0 R >>'.encode())
+        kids.append(id_pagina)
+        siguiente += 2
+    objetos[2] = (f'<< /Type /Pages /Kids [{" ".join(f"{k} 0 R" for k in kids)}] '
+                  f'/Count {len(kids)} >>').encode()
+
+    salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = {}
+    for num in sorted(objetos):
+        offsets[num] = len(salida)
+        salida += f'{num} 0 obj\n'.encode() + objetos[num] + b'\nendobj\n'
+    inicio_xref = len(salida)
+    salida += f'xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n'.encode()
+    for num in sorted(objetos):
+        salida += f'{offsets[num]:010d} 00000 n \n'.encode()
+    salida += (f'trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n'
+               f'startxref\n{inicio_xref}\n%%EOF\n').encode()
+    return bytes(salida)
+
+
+def pdf_con_texto(parrafos, paginas: int):
+    """PDF con capa de texto: los párrafos se reparten entre las páginas"""
+    por_pagina = max(1, -(-len(parrafos) // paginas))
+    golden, paginas_pdf = [], []
+    for i in range(paginas):
+        bloque = parrafos[i * por_pagina:(i + 1) * por_pagina] or [f'Página {i + 1}']
+        ops = [b'BT /F1 10 Tf 14 TL 60 740 Td']
+        for parrafo in bloque:
+            for linea in _partir_lineas(parrafo):
+                ops.append(b'(' + _escapar_pdf(linea) + b') Tj T*')
+                golden.append(linea)
+            ops.append(b'T*')
+        ops.append(b'ET')
+        paginas_pdf.append((b'\n'.join(ops), b'<< /Font << /F1 3 0 R >> >>', {}))
+    return _ensamblar_pdf(paginas_pdf), '\n'.join(golden)
+
+
+def pdf_escaneado(lineas, escala: int = 3):
+    """PDF sin capa de texto: una imagen de 1 bit con el texto rasterizado"""
+    ancho, alto = 1275, 1650  # carta a 150 DPI
+    filas = [[1] * ancho for _ in range(alto)]
+    y = 120
+    for linea in lineas:
+        x = 100
+        for caracter in linea:
+            glifo = FUENTE_5X7.get(caracter, FUENTE_5X7[' '])
+            for gy, fila_glifo in enumerate(glifo):
+                for gx, bit in enumerate(fila_glifo):
+                    if bit == '1':
+                        for dy in range(escala):
+                            fila = filas[y + gy * escala + dy]
+                            for dx in range(escala):
+                                fila[x + gx * escala + dx] = 0
+            x += 6 * escala
+        y += 11 * escala
+    datos = bytearray()
+    for fila in filas:
+        for i in range(0, ancho, 8):
+            byte = 0
+            for bit in fila[i:i + 8] + [1] * (8 - len(fila[i:i + 8])):
+                byte = (byte << 1) | bit
+            datos.append(byte)
+    comprimido = zlib.compress(bytes(datos))
+    imagen = (f'<< /Type /XObject /Subtype /Image /Width {ancho} /Height {alto} '
+              f'/ColorSpace /DeviceGray /BitsPerComponent 1 /Length {len(comprimido)} '
+              f'/Filter /FlateDecode >>').encode()
+    contenido = b'q 612 0 0 792 0 0 cm /Im1 Do Q'
+    recursos = b'<< /XObject << /Im1 %(Im1)s 0 R >> >>'
+    return _ensamblar_pdf([(contenido, recursos, {'Im1': (imagen, comprimido)})]), '\n'.join(lineas)
+
+
+CORPUS = {
+    'decreto_do': {
+        'tipo': 'texto', 'fuente': 'Diario Oficial', 'paginas': 3,
+        'descripcion': 'Decreto con capa de texto',
+        'construir': lambda: pdf_con_texto(DECRETO_DO, 3),
+    },
+    'hecho_cmf_escaneado': {
+        'tipo': 'escaneado', 'fuente': 'CMF', 'paginas': 1,
+        'descripcion': 'Hecho esencial escaneado (requiere OCR)',
+        'construir': lambda: pdf_escaneado(HECHO_CMF),
+    },
+    'proyecto_camara': {
+        'tipo': 'texto', 'fuente': 'camara.cl', 'paginas': 5,
+        'descripcion': 'Proyecto de ley con capa de texto',
+        'construir': lambda: pdf_con_texto(PROYECTO_CAMARA, 5),
+    },
+    'circular_sii': {
+        'tipo': 'texto', 'fuente': 'SII', 'paginas': 2,
+        'descripcion': 'Circular con capa de texto',
+        'construir': lambda: pdf_con_texto(CIRCULAR_SII, 2),
+    },
+}
+
+
+# Similitud mínima contra el golden por tipo de documento y método. Es
+# independiente de la máquina, así que se versiona en el manifest y el
+# benchmark la exige aunque no haya baseline local.
+SIMILITUD_MINIMA = {
+    'texto': {
+        'pdf_extractor.pypdf2': 0.95,
+        'pdf_extractor.pdfminer': 0.95,
+        'pdf_extractor.pypdf_fallback': 0.95,
+        'pdf_extractor.force_text': 0.9,
+        'pdf_extractor.cascada': 0.95,
+        'cmf_garantizado.cascada': 0.95,
+    },
+    'escaneado': {
+        'pdf_extractor.ocr_adaptive': 0.8,
+        'pdf_extractor.cascada': 0.8,
+        'cmf_garantizado.cascada': 0.8,
+    },
+}
+
+
+def generar_corpus(destino: Path = CORPUS_DIR) -> dict:
+    destino.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for nombre, spec in CORPUS.items():
+        pdf, golden = spec['construir']()
+        (destino / f'{nombre}.pdf').write_bytes(pdf)
+        (destino / f'{nombre}.golden.txt').write_text(golden + '\n', encoding='utf-8')
+        manifest[nombre] = {
+            'archivo': f'{nombre}.pdf',
+            'golden': f'{nombre}.golden.txt',
+            'tipo': spec['tipo'],
+            'fuente': spec['fuente'],
+            'paginas': spec['paginas'],
+            'descripcion': spec['descripcion'],
+            'similitud_minima': SIMILITUD_MINIMA[spec['tipo']],
+        }
+        print(f"✅ {nombre}: {len(pdf):,} bytes")
+    (destino / 'manifest.json').write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + '\n',
+                                           encoding='utf-8')
+    return manifest
+
+
+if __name__ == "__main__":
+    generar_corpus()
@@ -4,7 +4,6 @@ Generador de informe oficial integrado mejorado
 Incluye actualización automática de enlaces CMF
 """
 
-import json
 import os
 import sys
 import django
@@ -40,18 +39,21 @@ django.setup()
 from alerts.scraper_diario_oficial import obtener_sumario_diario_oficial
 from scripts.scrapers.scraper_cmf_mejorado import ScraperCMFMejorado
 from alerts.cmf_criterios_profesionales import filtrar_hechos_profesional, get_icono_categoria
-from alerts.scraper_sii import obtener_circulares_sii, obtener_resoluciones_exentas_sii, obtener_jurisprudencia_administrativa_sii
+from alerts.scraper_sii import obtener_circulares_sii, obtener_resoluciones_exentas_sii, obtener_jurisprudencia_administrativa_sii, sincronizar_documentos_sii
 from alerts.cmf_resumenes_ai import generar_resumen_cmf
 from alerts.utils.cache_informe import CacheInformeDiario
 from scripts.scrapers.scraper_dt import ScraperDT
 from alerts.services.pdf_extractor import pdf_extractor
 from alerts.services.pdf_cache import pdf_cache
+from alerts.services.metrics_service import metrics_collector
+from alerts.models import DocumentoSII, HechoCMFPublicado, TextoPDFExtraido
 from alerts.services.pdf_downloader_selenium import selenium_downloader
 from scripts.scrapers.scraper_ambiental_integrado import ScraperAmbiental
 from scripts.scrapers.scraper_proyectos_ley_integrado import ScraperProyectosLeyIntegrado
 from scripts.scrapers.scraper_contraloria_reglamentos import ScraperContraloriaReglamentos
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.db import connection
 import time
 
 # Importar el descargador especializado de CMF
@@ -156,64 +158,15 @@ def obtener_publicaciones_sii_dia(fecha):
         # Obtener fecha del día anterior
         fecha_obj = datetime.strptime(fecha, "%d-%m-%Y")
         fecha_anterior = fecha_obj - timedelta(days=1)
-        fecha_anterior_str = fecha_anterior.strftime("%d-%m-%Y")
         
-        year = fecha_anterior.year
-        
-        publicaciones = []
-        
-        # Usar la función de novedades tributarias para obtener solo del día anterior
+        # Agregar a DocumentoSII lo nuevo de los índices del año; si el SII no
+        # responde se informa lo ya sincronizado
         try:
-            from alerts.scraper_sii import obtener_novedades_tributarias_sii
-            resultado_sii = obtener_novedades_tributarias_sii(fecha_referencia=fecha_anterior, dias_atras=1)
-            
-            # La función devuelve un diccionario con 'circulares' y 'resoluciones_exentas'
-            if isinstance(resultado_sii, dict):
-                # Solo procesar si realmente son del día anterior
-                # Verificar si las publicaciones son del día que buscamos
-                fecha_buscada_str = formatear_fecha_espanol(fecha_anterior, con_coma=False, mes_mayuscula=True)
-                
-                # Procesar circulares - solo si son del día anterior
-                for circular in resultado_sii.get('circulares', []):
-                    fecha_pub = circular.get('fecha', '')
-                    # Solo incluir si la fecha coincide con el día anterior
-                    if fecha_pub and fecha_buscada_str.lower() in fecha_pub.lower():
-                        publicaciones.append({
-                            'tipo': 'Circular',
-                            'numero': circular.get('numero', ''),
-                            'titulo': circular.get('titulo', ''),
-                            'fecha_publicacion': fecha_pub,
-                            'url': circular.get('url_pdf', circular.get('url', ''))
-                        })
-                
-                # Procesar resoluciones exentas - solo si son del día anterior
-                for resolucion in resultado_sii.get('resoluciones_exentas', []):
-                    fecha_pub = resolucion.get('fecha', '')
-                    # Solo incluir si la fecha coincide con el día anterior
-                    if fecha_pub and fecha_buscada_str.lower() in fecha_pub.lower():
-                        publicaciones.append({
-                            'tipo': 'Resolución Exenta',
-                            'numero': resolucion.get('numero', ''),
-                            'titulo': resolucion.get('titulo', ''),
-                            'fecha_publicacion': fecha_pub,
-                            'url': resolucion.get('url_pdf', resolucion.get('url', ''))
-                        })
-                    
-                # Procesar jurisprudencia si existe - solo si es del día anterior
-                for juris in resultado_sii.get('jurisprudencia_administrativa', []):
-                    fecha_pub = juris.get('fecha', '')
-                    if fecha_pub and fecha_buscada_str.lower() in fecha_pub.lower():
-                        publicaciones.append({
-                            'tipo': 'Jurisprudencia',
-                            'numero': juris.get('numero', ''),
-                            'titulo': juris.get('titulo', ''),
-                            'fecha_publicacion': fecha_pub,
-                            'url': juris.get('url_pdf', juris.get('url', ''))
-                        })
+            sincronizar_documentos_sii(fecha_anterior.year)
         except Exception as e:
-            logger.error(f"Error obteniendo novedades SII: {e}")
-            # NO usar fallback - si no hay del día anterior, no mostrar nada
+            logger.error(f"Error sincronizando documentos SII: {e}")
         
+        publicaciones = DocumentoSII.publicaciones_del_dia(fecha_anterior.date())
         return publicaciones[:5]  # Retornar máximo 5 publicaciones
         
     except Exception as e:
@@ -238,18 +191,12 @@ def obtener_hechos_cmf_dia(fecha):
     # Convertir fecha al formato que espera el scraper (DD/MM/YYYY)
     fecha_scraper = fecha_anterior.strftime("%d/%m/%Y")
     
-    # Actualizar JSON con enlaces correctos
+    # Actualizar el registro de hechos con enlaces correctos
     scraper.actualizar_json_hechos(fecha_scraper)
     
-    # Leer hechos del JSON actualizado
+    # Leer solo los hechos del día anterior (consulta por el índice de fecha)
     try:
-        json_path = BASE_DIR / 'data' / 'hechos_cmf_selenium_reales.json'
-        with open(json_path, 'r', encoding='utf-8') as f:
-            datos = json.load(f)
-            todos_hechos = datos.get('hechos', [])
-        
-        # Filtrar por fecha del día anterior
-        hechos_dia = [h for h in todos_hechos if h.get('fecha') == fecha_anterior_str]
+        hechos_dia = HechoCMFPublicado.hechos_del_dia(fecha_anterior.date())
         
         logger.info(f"Hechos CMF encontrados para {fecha_anterior_str}: {len(hechos_dia)}")
         
@@ -294,19 +241,28 @@ def obtener_hechos_cmf_dia(fecha):
             pdf_content = None
             texto_pdf = ""
             
-            if url_pdf:
+            # Texto pre-extraído la tarde anterior por preextraer_pdfs_cmf
+            texto_preextraido = TextoPDFExtraido.obtener_texto(url_pdf)
+            if texto_preextraido:
+                texto_pdf = texto_preextraido
+                logger.info(f"📦 Usando texto pre-extraído para {entidad}")
+            
+            if url_pdf and not texto_pdf:
                 pdf_content = pdf_cache.get(url_pdf)
                 if pdf_content:
                     logger.info(f"📦 Usando PDF cacheado para {entidad}")
+                    metrics_collector.record_pdf_download(0.0, desde_cache=True)
             
             # Si no está en caché, usar el descargador especializado de CMF
-            if url_pdf and not pdf_content:
+            if url_pdf and not pdf_content and not texto_pdf:
                 logger.info(f"📥 Descargando PDF de {entidad} con descargador especializado")
                 
                 # Usar el descargador especializado de CMF
+                inicio_descarga = time.time()
                 pdf_content, download_method = cmf_pdf_downloader.download_pdf(url_pdf, max_retries=3)
                 
                 if pdf_content:
+                    metrics_collector.record_pdf_download(time.time() - inicio_descarga)
                     logger.info(f"✅ PDF descargado para {entidad} usando método: {download_method}")
                     # Guardar en caché
                     pdf_cache.put(url_pdf, pdf_content)
@@ -341,7 +297,11 @@ def obtener_hechos_cmf_dia(fecha):
             if pdf_content and not texto_pdf:
                 # USAR EXTRACTOR GARANTIZADO - SIEMPRE extrae algo
                 logger.info(f"🔍 Extrayendo texto GARANTIZADO de {entidad}...")
-                texto_extraido, metodo = cmf_pdf_extractor_garantizado.extract_text_guaranteed(pdf_content)
+                with metrics_collector.track_pdf_processing(url_pdf, f"{entidad} - {materia}") as pdf_metric:
+                    inicio_extraccion = time.time()
+                    texto_extraido, metodo = cmf_pdf_extractor_garantizado.extract_text_guaranteed(pdf_content)
+                    metrics_collector.record_pdf_extraction(pdf_metric, metodo, time.time() - inicio_extraccion)
+                    metrics_collector.record_pdf_info(pdf_metric, tamano_bytes=len(pdf_content))
                 
                 if texto_extraido:
                     texto_pdf = texto_extraido
@@ -450,6 +410,16 @@ def obtener_hechos_cmf_dia(fecha):
                 hecho['resumen'] = f"{entidad}: {materia}. [Error en extracción de contenido - verificar PDF original]"
                 return hecho
         
+        def procesar_hecho_cmf_en_hilo(hecho):
+            """
+            procesar_hecho_cmf desde el pool: la conexión a la BD que abre el hilo
+            (TextoPDFExtraido, métricas) se cierra al terminar
+            """
+            try:
+                return procesar_hecho_cmf(hecho)
+            finally:
+                connection.close()
+        
         # Limpiar caché viejo antes de empezar
         pdf_cache.clear_old()
         
@@ -460,7 +430,7 @@ def obtener_hechos_cmf_dia(fecha):
         # Reducir workers para PDFs escaneados que requieren OCR
         with ThreadPoolExecutor(max_workers=3) as executor:
             # Enviar todos los trabajos al pool
-            futures = {executor.submit(procesar_hecho_cmf, hecho): hecho 
+            futures = {executor.submit(procesar_hecho_cmf_en_hilo, hecho): hecho 
                       for hecho in hechos_filtrados}
             
             # Recoger resultados conforme se completan
@@ -524,18 +494,42 @@ def generar_informe_oficial(fecha=None):
     
     logger.info(f"Generando informe para {fecha}")
     
+    # Métricas de la corrida: cada etapa escribe lo acumulado al cerrarse
+    metrics_collector.start_scraping(pytz.timezone('America/Santiago').localize(datetime.strptime(fecha, "%d-%m-%Y")))
+    try:
+        resultado = _generar_informe_oficial(fecha)
+    except Exception as e:
+        metrics_collector.end_scraping(exitoso=False, mensaje_error=str(e))
+        raise
+    metrics_collector.end_scraping(exitoso=True)
+    return resultado
+
+def registrar_publicaciones(publicaciones, relevante=None):
+    """Cuenta las publicaciones de una fuente en las métricas de la corrida"""
+    for publicacion in publicaciones or []:
+        es_relevante = publicacion.get('relevante', True) if relevante is None else relevante
+        metrics_collector.add_publicacion(es_relevante=es_relevante)
+
+def _generar_informe_oficial(fecha):
+    """Obtiene las fuentes, arma el HTML, lo guarda y lo envía"""
     # 1. Obtener datos del Diario Oficial
     logger.info("Obteniendo datos del Diario Oficial...")
-    resultado_diario = obtener_sumario_diario_oficial(fecha)
+    with metrics_collector.etapa('diario_oficial'):
+        resultado_diario = obtener_sumario_diario_oficial(fecha)
+        registrar_publicaciones((resultado_diario or {}).get('publicaciones', []))
     
     # 2. Obtener hechos CMF (con actualización de enlaces)
     logger.info("Obteniendo hechos CMF...")
-    hechos_cmf = obtener_hechos_cmf_dia(fecha)
+    with metrics_collector.etapa('cmf'):
+        hechos_cmf = obtener_hechos_cmf_dia(fecha)
+        registrar_publicaciones(hechos_cmf, relevante=True)
     
     # 3. Obtener publicaciones del SII
     logger.info("Obteniendo publicaciones del SII...")
     try:
-        publicaciones_sii = obtener_publicaciones_sii_dia(fecha)
+        with metrics_collector.etapa('sii'):
+            publicaciones_sii = obtener_publicaciones_sii_dia(fecha)
+            registrar_publicaciones(publicaciones_sii, relevante=True)
     except Exception as e:
         logger.error(f"Error obteniendo SII: {e}")
         publicaciones_sii = []
@@ -551,7 +545,9 @@ def generar_informe_oficial(fecha=None):
             fecha_dt = fecha.strftime('%d-%m-%Y')
         else:
             fecha_dt = datetime.now().strftime('%d-%m-%Y')
-        documentos_dt = scraper_dt.obtener_documentos_dt(fecha_dt)
+        with metrics_collector.etapa('dt'):
+            documentos_dt = scraper_dt.obtener_documentos_dt(fecha_dt)
+            registrar_publicaciones(documentos_dt, relevante=True)
     except Exception as e:
         logger.error(f"Error obteniendo DT: {e}")
         documentos_dt = []
@@ -562,7 +558,8 @@ def generar_informe_oficial(fecha=None):
     try:
         scraper_proyectos = ScraperProyectosLeyIntegrado()
         # Pasar la fecha del informe para que busque proyectos del día anterior correcto
-        proyectos_ley = scraper_proyectos.obtener_proyectos_dia_anterior(fecha_informe=fecha)
+        with metrics_collector.etapa('proyectos_ley'):
+            proyectos_ley = scraper_proyectos.obtener_proyectos_dia_anterior(fecha_informe=fecha)
         
         # Deduplicar por número de boletín antes de enriquecer
         proyectos_unicos = []
@@ -580,6 +577,7 @@ def generar_informe_oficial(fecha=None):
         
         proyectos_ley = proyectos_unicos
         logger.info(f"Proyectos únicos después de deduplicación: {len(proyectos_ley)}")
+        registrar_publicaciones(proyectos_ley, relevante=True)
         
         # Enriquecer con detalles y resúmenes (ya no hay que volver a llamar obtener_detalle_proyecto)
         # porque ya se hizo en el scraper
@@ -592,7 +590,9 @@ def generar_informe_oficial(fecha=None):
     logger.info("Obteniendo reglamentos de Contraloría del día anterior...")
     try:
         scraper_contraloria = ScraperContraloriaReglamentos()
-        reglamentos_contraloria = scraper_contraloria.obtener_reglamentos_dia_anterior()
+        with metrics_collector.etapa('contraloria'):
+            reglamentos_contraloria = scraper_contraloria.obtener_reglamentos_dia_anterior()
+            registrar_publicaciones(reglamentos_contraloria, relevante=True)
         logger.info(f"Reglamentos de Contraloría encontrados: {len(reglamentos_contraloria)}")
     except Exception as e:
         logger.error(f"Error obteniendo reglamentos de Contraloría: {e}")
@@ -603,7 +603,8 @@ def generar_informe_oficial(fecha=None):
     try:
         scraper_ambiental = ScraperAmbiental()
         # Solo obtener datos del día anterior (1 día atrás)
-        datos_ambientales = scraper_ambiental.obtener_datos_ambientales(dias_atras=1)
+        with metrics_collector.etapa('sea'):
+            datos_ambientales = scraper_ambiental.obtener_datos_ambientales(dias_atras=1)
         datos_ambientales_formateados = scraper_ambiental.formatear_para_informe(datos_ambientales)
     except Exception as e:
         logger.error(f"Error obteniendo datos ambientales: {e}")
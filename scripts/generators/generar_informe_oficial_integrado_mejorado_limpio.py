@@ -4,7 +4,6 @@ Generador de informe oficial integrado mejorado
 Incluye actualización automática de enlaces CMF
 """
 
-import json
 import os
 import sys
 import django
@@ -38,6 +37,7 @@ from alerts.cmf_criterios_profesionales import filtrar_hechos_profesional, get_i
 from alerts.scraper_sii import obtener_circulares_sii, obtener_resoluciones_exentas_sii, obtener_jurisprudencia_administrativa_sii
 from alerts.cmf_resumenes_ai import generar_resumen_cmf
 from alerts.utils.cache_informe import CacheInformeDiario
+from alerts.models import HechoCMFPublicado
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -159,18 +159,12 @@ def obtener_hechos_cmf_dia(fecha):
     # Convertir fecha al formato que espera el scraper (DD/MM/YYYY)
     fecha_scraper = fecha_anterior.strftime("%d/%m/%Y")
     
-    # Actualizar JSON con enlaces correctos
+    # Actualizar el registro de hechos con enlaces correctos
     scraper.actualizar_json_hechos(fecha_scraper)
     
-    # Leer hechos del JSON actualizado
+    # Leer solo los hechos del día anterior (consulta por el índice de fecha)
     try:
-        json_path = BASE_DIR / 'data' / 'hechos_cmf_selenium_reales.json'
-        with open(json_path, 'r', encoding='utf-8') as f:
-            datos = json.load(f)
-            todos_hechos = datos.get('hechos', [])
-        
-        # Filtrar por fecha del día anterior
-        hechos_dia = [h for h in todos_hechos if h.get('fecha') == fecha_anterior_str]
+        hechos_dia = HechoCMFPublicado.hechos_del_dia(fecha_anterior.date())
         
         logger.info(f"Hechos CMF encontrados para {fecha_anterior_str}: {len(hechos_dia)}")
         
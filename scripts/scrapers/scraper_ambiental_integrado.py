@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Scraper integrado para datos ambientales del SEA
-Usa scraper especializado para obtener proyectos del SEA
+Obtiene el listado de proyectos del SEA desde el endpoint JSON del SEIA y
+usa el scraper con Selenium solo si ese endpoint cambia de formato
 """
 
 import logging
@@ -36,6 +37,30 @@ except ImportError:
             logger.error(f"❌ Error importando ScraperSEASeleniumCompleto: {e}")
             ScraperSEASeleniumCompleto = None
 
+try:
+    from .scraper_seia_json import ContratoSEIAError, ScraperSEIAJson
+except ImportError:
+    try:
+        from scripts.scrapers.scraper_seia_json import ContratoSEIAError, ScraperSEIAJson
+    except ImportError:
+        try:
+            from scraper_seia_json import ContratoSEIAError, ScraperSEIAJson
+        except ImportError as e:
+            logger.error(f"❌ Error importando ScraperSEIAJson: {e}")
+            ScraperSEIAJson = None
+
+try:
+    from .sea_detalle_concurrente import FetcherDetalleSEA
+except ImportError:
+    try:
+        from scripts.scrapers.sea_detalle_concurrente import FetcherDetalleSEA
+    except ImportError:
+        try:
+            from sea_detalle_concurrente import FetcherDetalleSEA
+        except ImportError as e:
+            logger.error(f"❌ Error importando FetcherDetalleSEA: {e}")
+            FetcherDetalleSEA = None
+
 
 # Importar telemetría
 try:
@@ -105,7 +130,10 @@ class ScraperAmbiental:
             'Accept-Language': 'es-ES,es;q=0.9'
         })
         
-        # Inicializar scraper SEA
+        # Cliente JSON del SEIA (principal), comparte la sesión HTTP
+        self.cliente_seia = ScraperSEIAJson(session=self.session) if ScraperSEIAJson else None
+        
+        # Inicializar scraper SEA (respaldo con navegador)
         if ScraperSEASeleniumCompleto:
             self.scraper_sea = ScraperSEASeleniumCompleto()
             logger.info("✅ Scraper SEA con Selenium inicializado")
@@ -130,7 +158,7 @@ class ScraperAmbiental:
         
         # Obtener proyectos SEA
         proyectos_sea = []
-        if self.scraper_sea:
+        if self.cliente_seia or self.scraper_sea:
             try:
                 logger.info("📋 Obteniendo proyectos SEA...")
                 proyectos_sea = self._obtener_proyectos_sea(dias_atras)
@@ -189,11 +217,22 @@ class ScraperAmbiental:
     
     def _obtener_proyectos_sea(self, dias_atras: int) -> List[Dict]:
         """
-        Obtiene proyectos del SEA usando el scraper con Selenium
+        Obtiene proyectos del SEA desde el endpoint JSON; si su formato cambió
+        o no responde, usa el scraper con Selenium
         """
         try:
             logger.info(f"🔄 Obteniendo proyectos SEA de los últimos {dias_atras} días...")
-            proyectos = self.scraper_sea.obtener_datos_sea(dias_atras=dias_atras)
+            proyectos = None
+            if self.cliente_seia:
+                try:
+                    proyectos = self.cliente_seia.obtener_datos_sea(dias_atras=dias_atras)
+                except (ContratoSEIAError, requests.RequestException) as e:
+                    logger.warning(f"⚠️ Endpoint JSON del SEIA no disponible ({e}), usando Selenium")
+            
+            if proyectos is None:
+                if not self.scraper_sea:
+                    raise RuntimeError("Endpoint JSON del SEIA falló y el scraper con Selenium no está disponible")
+                proyectos = self.scraper_sea.obtener_datos_sea(dias_atras=dias_atras)
             
             if proyectos:
                 logger.info(f"✅ {len(proyectos)} proyectos SEA obtenidos")
@@ -205,7 +244,7 @@ class ScraperAmbiental:
                         'fecha_extraccion': datetime.now().isoformat(),
                         'titulo': p.get('titulo', ''),
                         'url': p.get('url', ''),
-                        'id': p.get('id_expediente', ''),
+                        'id': p.get('id', p.get('id_expediente', '')),
                         'tipo': p.get('tipo', ''),
                         'region': p.get('region', ''),
                         'comuna': p.get('comuna', ''),
@@ -237,6 +276,17 @@ class ScraperAmbiental:
             'proyectos_sea': []
         }
         
+        # Fichas de todos los proyectos en paralelo y con caché por expediente;
+        # el extractor con Selenium queda solo para las que no se pudieron leer
+        fichas = {}
+        if datos_ambientales.get('proyectos_sea') and FetcherDetalleSEA and sea_resumen_extractor_selenium:
+            try:
+                ids = [sea_resumen_extractor_selenium.obtener_id_de_url(p['url'])
+                       for p in datos_ambientales['proyectos_sea'] if p.get('titulo') and p.get('url')]
+                fichas = FetcherDetalleSEA(session=self.session).obtener(ids)
+            except Exception as e:
+                logger.warning(f"⚠️ Error obteniendo fichas SEA en paralelo: {e}")
+        
         # Formatear proyectos SEA reales
         if datos_ambientales.get('proyectos_sea'):
             for proyecto in datos_ambientales['proyectos_sea']:
@@ -244,13 +294,15 @@ class ScraperAmbiental:
                 if proyecto.get('titulo'):
                     resumen_extraido = False
                     
-                    # PRIMERO: Intentar extraer resumen real del SEA con Selenium (en producción)
+                    # PRIMERO: Intentar extraer resumen real del SEA (ficha ya descargada o Selenium)
                     if proyecto.get('url') and sea_resumen_extractor_selenium:
                         try:
                             id_expediente = sea_resumen_extractor_selenium.obtener_id_de_url(proyecto['url'])
                             if id_expediente:
-                                logger.info(f"🔍 Intentando extraer resumen real del SEA para {proyecto['titulo'][:30]}...")
-                                resultado_sea = sea_resumen_extractor_selenium.extraer_resumen_completo(id_expediente)
+                                resultado_sea = fichas.get(id_expediente)
+                                if not resultado_sea:
+                                    logger.info(f"🔍 Intentando extraer resumen real del SEA para {proyecto['titulo'][:30]}...")
+                                    resultado_sea = sea_resumen_extractor_selenium.extraer_resumen_completo(id_expediente)
                                 
                                 if resultado_sea.get('resumen'):
                                     proyecto['resumen'] = resultado_sea['resumen']
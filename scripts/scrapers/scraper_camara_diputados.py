@@ -9,6 +9,14 @@ from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Optional
 import re
+import sys
+from pathlib import Path
+
+# Agregar el directorio base al path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.aspnet_form import formulario_para, parsear_grilla
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,49 +40,24 @@ class ScraperCamaraDiputados:
         logger.info(f"Buscando proyectos desde {fecha_desde.strftime('%d/%m/%Y')} hasta {fecha_hasta.strftime('%d/%m/%Y')}")
         
         try:
-            # Primero obtener la página para capturar viewstate
-            response = self.session.get(self.search_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extraer valores del formulario
-            viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-            viewstate_value = viewstate['value'] if viewstate else ''
-            
-            viewstate_generator = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
-            viewstate_generator_value = viewstate_generator['value'] if viewstate_generator else ''
-            
-            event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-            event_validation_value = event_validation['value'] if event_validation else ''
-            
-            # Preparar datos del formulario
-            form_data = {
-                '__EVENTTARGET': '',
-                '__EVENTARGUMENT': '',
-                '__VIEWSTATE': viewstate_value,
-                '__VIEWSTATEGENERATOR': viewstate_generator_value,
-                '__EVENTVALIDATION': event_validation_value,
+            # El estado del formulario (__VIEWSTATE y otros) se reutiliza entre búsquedas de la sesión
+            formulario = formulario_para(self.session, self.search_url)
+            response = formulario.enviar({
                 'ctl00$mainPlaceHolder$txtFechaDesde': fecha_desde.strftime('%d/%m/%Y'),
                 'ctl00$mainPlaceHolder$txtFechaHasta': fecha_hasta.strftime('%d/%m/%Y'),
                 'ctl00$mainPlaceHolder$btnBuscar': 'Buscar'
-            }
-            
-            # Realizar búsqueda
-            response = self.session.post(self.search_url, data=form_data)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            })
             
             # Buscar tabla de resultados
-            tabla = soup.find('table', {'id': 'mainPlaceHolder_grvResultado'})
+            filas = parsear_grilla(response.documento, 'mainPlaceHolder_grvResultado')
             
-            if not tabla:
+            if filas is None:
                 logger.warning("No se encontró tabla de resultados")
                 # Intentar buscar proyectos en otro formato
-                return self._buscar_proyectos_alternativos(soup)
+                return self._buscar_proyectos_alternativos(BeautifulSoup(response.text, 'html.parser'))
             
             proyectos = []
-            filas = tabla.find_all('tr')[1:]  # Saltar header
-            
-            for fila in filas:
-                celdas = fila.find_all('td')
+            for celdas in filas:
                 if len(celdas) >= 4:
                     proyecto = self._extraer_info_proyecto(celdas)
                     if proyecto:
@@ -89,36 +72,34 @@ class ScraperCamaraDiputados:
     
     def _extraer_info_proyecto(self, celdas) -> Optional[Dict]:
         """
-        Extrae información de un proyecto desde las celdas de la tabla
+        Extrae información de un proyecto desde las celdas (Celda) de la grilla
         """
         try:
             proyecto = {}
             
             # Boletín (número del proyecto)
             if len(celdas) > 0:
-                boletin = celdas[0].get_text(strip=True)
-                proyecto['boletin'] = boletin
+                proyecto['boletin'] = celdas[0].texto
                 
-                # Buscar enlace al detalle
-                link = celdas[0].find('a')
-                if link:
-                    proyecto['url_detalle'] = self.base_url + link.get('href', '')
+                # Enlace al detalle
+                if celdas[0].href is not None:
+                    proyecto['url_detalle'] = self.base_url + celdas[0].href
             
             # Fecha de ingreso
             if len(celdas) > 1:
-                proyecto['fecha_ingreso'] = celdas[1].get_text(strip=True)
+                proyecto['fecha_ingreso'] = celdas[1].texto
             
             # Título/materia
             if len(celdas) > 2:
-                proyecto['titulo'] = celdas[2].get_text(strip=True)
+                proyecto['titulo'] = celdas[2].texto
             
             # Estado/etapa
             if len(celdas) > 3:
-                proyecto['estado'] = celdas[3].get_text(strip=True)
+                proyecto['estado'] = celdas[3].texto
             
             # Cámara de origen
             if len(celdas) > 4:
-                proyecto['origen'] = celdas[4].get_text(strip=True)
+                proyecto['origen'] = celdas[4].texto
                 
             return proyecto if proyecto.get('boletin') else None
             
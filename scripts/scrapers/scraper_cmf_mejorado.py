@@ -6,14 +6,20 @@ con el formato largo que incluye token + Base64
 
 import requests
 from bs4 import BeautifulSoup
-import json
 from datetime import datetime, timedelta
 import time
 import logging
 from typing import Dict, List, Optional
 import re
+import sys
 from pathlib import Path
 
+# Agregar el directorio base al path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.http_cache import http_cache
+
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -42,7 +48,7 @@ class ScraperCMFMejorado:
         
         try:
             # Obtener la página de hechos recientes
-            response = self.session.get(self.hechos_portada_url)
+            response = http_cache.get(self.hechos_portada_url, session=self.session)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -93,16 +99,16 @@ class ScraperCMFMejorado:
     
     def actualizar_json_hechos(self, fecha_buscar: str = None):
         """
-        Actualiza el archivo JSON con los hechos del día
+        Actualiza el registro de hechos CMF (HechoCMFPublicado) con los hechos del día.
+        Se mantiene el nombre por compatibilidad con los generadores.
         """
+        from alerts.models import HechoCMFPublicado
+        
         if not fecha_buscar:
             # Por defecto buscar hechos de hoy
             hoy = datetime.now()
             fecha_buscar = hoy.strftime("%d/%m/%Y")
         
-        # Convertir fecha para el JSON (formato DD-MM-YYYY)
-        fecha_json = fecha_buscar.replace('/', '-')
-        
         logger.info(f"Buscando hechos del {fecha_buscar}")
         
         # Obtener hechos del día
@@ -112,54 +118,11 @@ class ScraperCMFMejorado:
             logger.warning(f"No se encontraron hechos para {fecha_buscar}")
             return
         
-        # Cargar JSON existente
-        try:
-            json_path = Path(__file__).parent.parent.parent / 'data' / 'hechos_cmf_selenium_reales.json'
-            with open(json_path, 'r', encoding='utf-8') as f:
-                datos = json.load(f)
-        except:
-            datos = {"hechos": []}
-        
-        # Actualizar enlaces de hechos existentes o agregar nuevos
-        hechos_actualizados = 0
-        hechos_agregados = 0
-        
-        for hecho_nuevo in hechos_nuevos:
-            # Buscar si ya existe el hecho para esta entidad y fecha
-            encontrado = False
-            for i, hecho_existente in enumerate(datos['hechos']):
-                if (hecho_existente.get('fecha') == fecha_json and 
-                    hecho_existente.get('entidad') == hecho_nuevo['entidad']):
-                    # Actualizar el enlace
-                    datos['hechos'][i]['url_pdf'] = hecho_nuevo['url_pdf']
-                    datos['hechos'][i]['tiene_pdf'] = True
-                    datos['hechos'][i]['link_actualizado'] = datetime.now().isoformat()
-                    hechos_actualizados += 1
-                    encontrado = True
-                    break
-            
-            if not encontrado:
-                # Agregar nuevo hecho
-                nuevo_registro = {
-                    'fecha': fecha_json,
-                    'entidad': hecho_nuevo['entidad'],
-                    'materia': hecho_nuevo['materia'],
-                    'titulo': hecho_nuevo['materia'],
-                    'resumen': f"{hecho_nuevo['entidad']} - {hecho_nuevo['materia']} ({fecha_json})",
-                    'url_pdf': hecho_nuevo['url_pdf'],
-                    'tiene_pdf': True,
-                    'relevancia': 5.0,
-                    'categoria': 'MODERADO',
-                    'es_ipsa': self._es_empresa_ipsa(hecho_nuevo['entidad']),
-                    'link_actualizado': datetime.now().isoformat()
-                }
-                datos['hechos'].append(nuevo_registro)
-                hechos_agregados += 1
-        
-        # Guardar JSON actualizado
-        json_path = Path(__file__).parent.parent.parent / 'data' / 'hechos_cmf_selenium_reales.json'
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, ensure_ascii=False, indent=2)
+        # Solo se leen y escriben las filas de esta fecha
+        fecha = datetime.strptime(fecha_buscar, "%d/%m/%Y").date()
+        hechos_actualizados, hechos_agregados = HechoCMFPublicado.upsert_dia(
+            fecha, hechos_nuevos, es_ipsa=self._es_empresa_ipsa
+        )
         
         logger.info(f"✅ Actualización completada:")
         logger.info(f"   - Hechos actualizados: {hechos_actualizados}")
@@ -182,7 +145,11 @@ def main():
     """
     Función principal
     """
-    import sys
+    import os
+    import django
+    
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'market_sniper.settings')
+    django.setup()
     
     scraper = ScraperCMFMejorado()
     
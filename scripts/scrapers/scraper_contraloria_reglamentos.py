@@ -2,6 +2,11 @@
 """
 Scraper para obtener reglamentos de la Contraloría General de la República
 https://www.contraloria.cl/web/cgr/tramitacion-de-reglamentos1
+
+La tabla viene en el HTML del servidor, así que se descarga con una solicitud
+condicional (http_cache) y Selenium queda solo como respaldo. Los reglamentos
+leídos se guardan en ReglamentoContraloria: cada corrida lee la tabla desde
+arriba hasta llegar a uno ya guardado, en vez de recorrer cientos de filas.
 """
 
 import requests
@@ -10,6 +15,8 @@ from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Optional
 import re
+import sys
+from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -19,13 +26,60 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 import time
 
+# Agregar el directorio base al path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.http_cache import http_cache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _claves_guardadas() -> set:
+    try:
+        from alerts.models import ReglamentoContraloria
+        return ReglamentoContraloria.claves_recientes()
+    except Exception as e:
+        logger.debug(f"Reglamentos guardados no disponibles: {e}")
+        return set()
+
+
+def _guardar_reglamentos(reglamentos: List[Dict]) -> bool:
+    try:
+        from alerts.models import ReglamentoContraloria
+        ReglamentoContraloria.guardar_varios(reglamentos)
+        return True
+    except Exception as e:
+        logger.debug(f"No se pudieron guardar los reglamentos: {e}")
+        return False
+
+
+def _reglamentos_guardados_del_dia(fecha) -> Optional[List[Dict]]:
+    try:
+        from alerts.models import ReglamentoContraloria
+        return ReglamentoContraloria.reglamentos_del_dia(fecha)
+    except Exception as e:
+        logger.debug(f"Reglamentos guardados no disponibles: {e}")
+        return None
+
+
 class ScraperContraloriaReglamentos:
+    # Tope de filas a leer (cuando no hay reglamentos guardados que marquen dónde parar)
+    LIMITE_FILAS = 200
+    
+    # La tabla va casi siempre de la más nueva a la más antigua, pero un ingreso
+    # tardío puede quedar entre filas ya guardadas: se deja de leer recién tras
+    # esta cantidad de reglamentos guardados seguidos
+    CONOCIDAS_PARA_CORTAR = 5
+    
     def __init__(self):
         self.base_url = "https://www.contraloria.cl"
         self.reglamentos_url = "https://www.contraloria.cl/web/cgr/tramitacion-de-reglamentos1"
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        })
         
     def _setup_driver(self):
         """Configura el driver de Chrome para scraping"""
@@ -51,11 +105,45 @@ class ScraperContraloriaReglamentos:
         """
         Obtiene los reglamentos de una fecha específica
         """
-        # Generar múltiples formatos de fecha para mayor compatibilidad
         fecha_str = fecha.strftime('%d/%m/%Y')
-        fecha_str_sin_cero = fecha.strftime('%-d/%-m/%Y') if hasattr(fecha, 'strftime') else fecha.strftime('%d/%m/%Y').replace('/0', '/')
-        logger.info(f"Buscando reglamentos del {fecha_str} (también probando {fecha_str_sin_cero})")
+        logger.info(f"Buscando reglamentos del {fecha_str}")
+        
+        try:
+            soup = self._obtener_listado()
+            if soup is None:
+                return []
+            
+            reglamentos = self._extraer_reglamentos_tabla(soup, fecha)
+            
+            logger.info(f"Reglamentos encontrados para {fecha_str}: {len(reglamentos)}")
+            return reglamentos
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo reglamentos: {e}")
+            return []
+    
+    def _obtener_listado(self) -> Optional[BeautifulSoup]:
+        """
+        HTML de la página de reglamentos: primero por HTTP directo y, si la
+        tabla no viene en la respuesta, con Selenium.
+        """
+        try:
+            response = http_cache.get(self.reglamentos_url, session=self.session, timeout=30)
+            if response.status_code == 200:
+                soup = BeautifulSoup(response.content, 'html.parser')
+                if self._buscar_tabla_principal(soup) is not None:
+                    logger.info("Tabla de reglamentos obtenida por HTTP directo")
+                    return soup
+                logger.info("La respuesta HTTP no trae la tabla de reglamentos, usando Selenium")
+            else:
+                logger.warning(f"HTTP {response.status_code} en la página de reglamentos, usando Selenium")
+        except requests.RequestException as e:
+            logger.warning(f"Error HTTP obteniendo reglamentos ({e}), usando Selenium")
         
+        return self._obtener_listado_selenium()
+    
+    def _obtener_listado_selenium(self) -> Optional[BeautifulSoup]:
+        """HTML de la página de reglamentos renderizada en Chrome"""
         driver = None
         try:
             driver = self._setup_driver()
@@ -68,75 +156,109 @@ class ScraperContraloriaReglamentos:
             time.sleep(3)  # Dar tiempo adicional para que cargue JavaScript
             
             # Obtener el HTML actual
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Buscar la tabla de reglamentos
-            reglamentos = self._extraer_reglamentos_tabla(soup, fecha)
-            
-            logger.info(f"Reglamentos encontrados para {fecha_str}: {len(reglamentos)}")
-            return reglamentos
+            return BeautifulSoup(driver.page_source, 'html.parser')
             
         except Exception as e:
-            logger.error(f"Error obteniendo reglamentos: {e}")
-            return []
+            logger.error(f"Error obteniendo reglamentos con Selenium: {e}")
+            return None
         finally:
             if driver:
                 driver.quit()
     
+    @staticmethod
+    def _buscar_tabla_principal(soup: BeautifulSoup):
+        """La tabla de reglamentos es la primera con muchas filas"""
+        for tabla in soup.find_all('table'):
+            if len(tabla.find_all('tr')) > 100:
+                return tabla
+        return None
+    
     def _extraer_reglamentos_tabla(self, soup: BeautifulSoup, fecha: datetime) -> List[Dict]:
         """
-        Extrae los reglamentos de la tabla HTML
+        Lee las filas de la tabla hasta CONOCIDAS_PARA_CORTAR reglamentos ya
+        guardados seguidos, las guarda (las conocidas actualizan su estado) y
+        retorna los reglamentos ingresados en `fecha`
         """
-        reglamentos = []
-        # Múltiples formatos de fecha para comparación
-        fecha_objetivo = fecha.strftime('%d/%m/%Y')
-        # Formato sin ceros a la izquierda (1/9/2025 en lugar de 01/09/2025)
-        fecha_sin_ceros = f"{fecha.day}/{fecha.month}/{fecha.year}"
-        # Formato con ceros garantizados
-        fecha_con_ceros = f"{fecha.day:02d}/{fecha.month:02d}/{fecha.year}"
-        
-        logger.info(f"Buscando reglamentos con fechas: {fecha_con_ceros}, {fecha_sin_ceros}")
-        
-        # Buscar la tabla principal (debería ser la primera con muchas filas)
-        tablas = soup.find_all('table')
-        tabla_principal = None
-        
-        for tabla in tablas:
-            filas = tabla.find_all('tr')
-            if len(filas) > 100:  # La tabla principal tiene muchas filas
-                tabla_principal = tabla
-                break
-        
+        tabla_principal = self._buscar_tabla_principal(soup)
         if not tabla_principal:
             logger.warning("No se encontró tabla principal de reglamentos")
             return []
         
-        # Buscar filas de datos
         filas = tabla_principal.find_all('tr')
-        logger.info(f"Procesando {len(filas)} filas de la tabla")
+        guardadas = _claves_guardadas()
         
+        leidos = []
+        nuevos = 0
+        conocidas_seguidas = 0
+        leidas = 0
         for i, fila in enumerate(filas[1:], 1):  # Saltar header
+            if guardadas and self._clave_fila(fila) in guardadas:
+                conocidas_seguidas += 1
+                # Desde aquí el resto se leyó en corridas anteriores
+                if conocidas_seguidas >= self.CONOCIDAS_PARA_CORTAR:
+                    logger.info(f"Marca alcanzada en la fila {i}")
+                    break
+            else:
+                conocidas_seguidas = 0
+                nuevos += 1
+            
+            leidas = i
             try:
-                # Pasar todos los formatos de fecha posibles
-                fechas_objetivo = [fecha_con_ceros, fecha_sin_ceros, fecha_objetivo]
-                reglamento = self._extraer_info_reglamento(fila, fechas_objetivo)
+                reglamento = self._extraer_info_reglamento(fila)
                 if reglamento:
-                    reglamentos.append(reglamento)
-                    logger.info(f"Reglamento encontrado: {reglamento.get('numero', 'N/A')}")
+                    leidos.append(reglamento)
             except Exception as e:
                 logger.debug(f"Error procesando fila {i}: {e}")
                 continue
             
-            # Limitar búsqueda a los primeros 200 para capturar más reglamentos
-            if i > 200:
+            if i >= self.LIMITE_FILAS:
                 break
         
-        return reglamentos
+        logger.info(f"Leídas {leidas} de {len(filas) - 1} filas de la tabla, {nuevos} no guardadas")
+        
+        con_fecha = [r for r in leidos if r.get('fecha')]
+        del_dia = None
+        if _guardar_reglamentos(con_fecha):
+            del_dia = _reglamentos_guardados_del_dia(fecha.date())
+        if del_dia is None:
+            # Sin base de datos: solo lo leído en esta corrida
+            del_dia = [r for r in con_fecha if r['fecha'] == fecha.date()]
+        return self._del_dia(del_dia)
+    
+    def _del_dia(self, reglamentos: List[Dict]) -> List[Dict]:
+        """Formato final de los reglamentos de la fecha buscada"""
+        resultado = []
+        for reglamento in reglamentos:
+            reglamento = {k: v for k, v in reglamento.items() if k != 'fecha'}
+            reglamento['es_objetivo'] = True
+            reglamento['resumen'] = self._generar_resumen(reglamento)
+            logger.info(f"Reglamento encontrado: {reglamento.get('numero', 'N/A')}")
+            resultado.append(reglamento)
+        return resultado
     
-    def _extraer_info_reglamento(self, fila, fechas_objetivo: list) -> Optional[Dict]:
+    @staticmethod
+    def _clave_fila(fila):
+        """(numero, anio, ministerio) de una fila, sin extraer el resto"""
+        celdas = fila.find_all('td', limit=4)
+        if len(celdas) < 4:
+            return None
+        return tuple(celda.get_text(strip=True) for celda in celdas[1:4])
+    
+    @staticmethod
+    def _parsear_fecha(fecha_text: str):
+        """Fecha de ingreso DD/MM/YYYY (con o sin ceros, con - o . como separador)"""
+        fecha_normalizada = fecha_text.replace(' ', '').replace('-', '/').replace('.', '/')
+        try:
+            return datetime.strptime(fecha_normalizada, '%d/%m/%Y').date()
+        except ValueError:
+            return None
+    
+    def _extraer_info_reglamento(self, fila) -> Optional[Dict]:
         """
         Extrae información de un reglamento desde una fila de tabla
         Estructura esperada: [Expandir][Número][Año][Ministerio][Subsecretaría][Materia][Fecha][Estado][Descarga]
+        
+        La fecha de ingreso queda además como date en 'fecha' (None si no se pudo leer).
         """
         try:
             # Buscar celdas
@@ -177,42 +299,13 @@ class ScraperContraloriaReglamentos:
             if len(celdas) > 6:
                 fecha_text = celdas[6].get_text(strip=True)
                 reglamento['fecha_ingreso'] = fecha_text
+            reglamento['fecha'] = self._parsear_fecha(fecha_text)
             
             # Estado (celda 7 si existe)
             if len(celdas) > 7:
                 estado_text = celdas[7].get_text(strip=True)
                 reglamento['estado'] = estado_text
             
-            # Verificar si la fecha coincide con alguno de los formatos objetivo
-            fecha_coincide = False
-            
-            # Log para debugging
-            if fecha_text and any(c.isdigit() for c in fecha_text):
-                logger.debug(f"Comparando fecha del reglamento '{fecha_text}' con objetivos: {fechas_objetivo}")
-            
-            for fecha_obj in fechas_objetivo:
-                if fecha_text == fecha_obj:
-                    fecha_coincide = True
-                    logger.info(f"✅ Fecha coincide exactamente: {fecha_text} == {fecha_obj}")
-                    break
-                # También probar sin espacios y con diferentes separadores
-                fecha_normalizada = fecha_text.replace(' ', '').replace('-', '/').replace('.', '/')
-                fecha_obj_normalizada = fecha_obj.replace(' ', '').replace('-', '/').replace('.', '/')
-                if fecha_normalizada == fecha_obj_normalizada:
-                    fecha_coincide = True
-                    logger.info(f"✅ Fecha coincide (normalizada): {fecha_text} -> {fecha_normalizada} == {fecha_obj_normalizada}")
-                    break
-            
-            # Solo incluir si coincide con la fecha objetivo
-            if not fecha_coincide:
-                # Log solo si parece ser una fecha válida
-                if fecha_text and '/' in fecha_text:
-                    logger.debug(f"❌ Fecha no coincide: '{fecha_text}' no es ninguna de {fechas_objetivo}")
-                return None
-            
-            # Es exactamente la fecha que buscamos
-            reglamento['es_objetivo'] = True
-            
             # Buscar enlace de descarga en la última celda o en botones
             enlace_descarga = self._buscar_enlace_descarga(fila)
             if enlace_descarga:
@@ -221,9 +314,6 @@ class ScraperContraloriaReglamentos:
                 # URL por defecto a la página de reglamentos
                 reglamento['url_descarga'] = self.reglamentos_url
             
-            # Generar resumen
-            reglamento['resumen'] = self._generar_resumen(reglamento)
-            
             # Filtrar reglamentos mal parseados
             if not self._es_reglamento_valido(reglamento):
                 return None
@@ -4,11 +4,18 @@ Scraper para obtener dictámenes y ordinarios de la Dirección del Trabajo del d
 Similar al scraper del SII - busca documentos publicados el día anterior
 """
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, Tag
 from datetime import datetime, timedelta
 import logging
 import re
+import sys
+from pathlib import Path
+
+# Agregar el directorio base al path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.http_cache import http_cache
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +27,18 @@ MESES_ES = {
     'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
 }
 
+# ORD. N°, DICTAMEN N° y DIC. N° en una sola alternancia: la página se recorre una vez
+PATRON_DOCUMENTO_DT = re.compile(r'ORD\.?\s*N[°º]\s*\d+(?:/\d+)?|DICTAMEN\s*N[°º]\s*\d+|DIC\.?\s*N[°º]\s*\d+', re.IGNORECASE)
+PATRON_FECHA_DT = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}')
+
+# El listado va del más nuevo al más antiguo: tras esta cantidad de documentos
+# seguidos anteriores al día buscado se deja de leer ese listado (un destacado
+# antiguo aislado no corta la búsqueda)
+ANTERIORES_PARA_CORTAR = 3
+
+# Bloques que agrupan un listado ordenado por fecha; el corte se lleva por cada uno
+CONTENEDORES_LISTADO_DT = ['ul', 'ol', 'table', 'section']
+
 class ScraperDT:
     def __init__(self):
         self.base_url = "https://www.dt.gob.cl"
@@ -76,124 +95,12 @@ class ScraperDT:
             fecha_busqueda = fecha_informe - timedelta(days=1)
             logger.info(f"Buscando documentos DT del día anterior ({fecha_busqueda.strftime('%d/%m/%Y')})...")
             
-            response = requests.get(self.url_legislacion, headers=self.headers, timeout=30)
+            response = http_cache.get(self.url_legislacion, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
             
-            documentos = []
-            documentos_del_dia = []
-            
-            # Buscar todos los elementos que contengan ORD.N° o DICTAMEN
-            patrones = [
-                r'ORD\.?\s*N[°º]\s*\d+(/\d+)?',
-                r'DICTAMEN\s*N[°º]\s*\d+',
-                r'DIC\.?\s*N[°º]\s*\d+'
-            ]
-            
-            elementos_encontrados = []
-            for patron in patrones:
-                elementos = soup.find_all(string=re.compile(patron, re.IGNORECASE))
-                elementos_encontrados.extend(elementos)
-            
-            # Procesar cada elemento encontrado
-            for elemento in elementos_encontrados[:50]:
-                try:
-                    # Extraer el número
-                    numero_match = re.search(r'(ORD\.?\s*N[°º]\s*\d+(/\d+)?|DICTAMEN\s*N[°º]\s*\d+|DIC\.?\s*N[°º]\s*\d+)', 
-                                           str(elemento), re.IGNORECASE)
-                    if not numero_match:
-                        continue
-                    numero = numero_match.group()
-                    
-                    # Obtener el contexto (elemento padre)
-                    parent = elemento.parent
-                    contador = 0
-                    while parent and contador < 5:
-                        if parent.name in ['li', 'article', 'div', 'p', 'td', 'tr']:
-                            break
-                        parent = parent.parent
-                        contador += 1
-                    
-                    if not parent:
-                        parent = elemento.parent
-                    
-                    # Extraer el texto completo del contexto
-                    texto_completo = parent.get_text(separator=' ', strip=True) if parent else str(elemento)
-                    
-                    # Limpiar y extraer descripción
-                    # Eliminar el número del texto
-                    descripcion = texto_completo
-                    for parte in [numero, 'Dictamen destacado']:
-                        descripcion = descripcion.replace(parte, '')
-                    
-                    # Buscar fecha en el texto
-                    fecha_doc = ""
-                    fecha_doc_obj = None
-                    fecha_match = re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}', texto_completo)
-                    if fecha_match:
-                        fecha_doc = fecha_match.group()
-                        fecha_doc_obj = self.convertir_fecha_dt(fecha_doc)
-                        # Eliminar la fecha de la descripción
-                        descripcion = descripcion.replace(fecha_doc, '')
-                    
-                    # Verificar si es del día que buscamos
-                    es_del_dia = False
-                    if fecha_doc_obj:
-                        # Comparar solo fecha (sin hora)
-                        if fecha_doc_obj.date() == fecha_busqueda.date():
-                            es_del_dia = True
-                    
-                    # Limpiar descripción
-                    descripcion = ' '.join(descripcion.split())
-                    descripcion = descripcion.strip(' ;,.')
-                    
-                    # Determinar tipo basado en el contenido
-                    tipo = "Ordinario"  # Por defecto
-                    if 'dictamen' in numero.lower() or 'dic.' in numero.lower():
-                        tipo = "Dictamen"
-                    elif 'ord' in numero.lower():
-                        tipo = "Ordinario"
-                    
-                    # Limitar longitud de descripción
-                    if len(descripcion) > 150:
-                        descripcion = descripcion[:147] + "..."
-                    
-                    # Si no hay descripción o es muy corta, usar un texto genérico
-                    if not descripcion or len(descripcion) < 10:
-                        descripcion = f"Documento laboral de la Dirección del Trabajo"
-                    
-                    # Buscar URL si existe
-                    url = self.url_legislacion
-                    if parent:
-                        link = parent.find('a', href=True)
-                        if link:
-                            url = link['href']
-                            if not url.startswith('http'):
-                                url = self.base_url + url
-                    
-                    # Limpiar el número (normalizar formato)
-                    numero = numero.replace('  ', ' ').strip()
-                    
-                    # Crear documento
-                    documento = {
-                        'tipo': tipo,
-                        'numero': numero,
-                        'descripcion': descripcion,
-                        'fecha': fecha_doc if fecha_doc else "Sin fecha",
-                        'url': url
-                    }
-                    
-                    # Agregar documento si no está duplicado
-                    if not any(d['numero'] == numero for d in documentos):
-                        if es_del_dia:
-                            documentos_del_dia.append(documento)
-                        else:
-                            documentos.append(documento)
-                    
-                except Exception as e:
-                    logger.debug(f"Error procesando elemento: {e}")
-                    continue
+            documentos_del_dia = self.escanear_documentos_dt(soup, fecha_busqueda)
             
             # Solo retornar documentos del día anterior
             if documentos_del_dia:
@@ -207,6 +114,154 @@ class ScraperDT:
         except Exception as e:
             logger.error(f"Error obteniendo documentos DT: {str(e)}")
             return []
+    
+    def escanear_documentos_dt(self, soup, fecha_busqueda):
+        """
+        Documentos del día buscado, en el orden de la página.
+        
+        Recorre el árbol una sola vez con PATRON_DOCUMENTO_DT y descarta números
+        repetidos con un conjunto. Cada listado (ul, ol, table o section) está
+        ordenado por fecha por separado (p. ej. Dictámenes y luego Ordinarios),
+        así que el corte se lleva por listado: cuando sus fechas pasan a ser
+        anteriores al día buscado (ver ANTERIORES_PARA_CORTAR) el recorrido
+        salta al final del listado y sigue con el siguiente.
+        """
+        documentos_del_dia = []
+        vistos = set()
+        dia = fecha_busqueda.date()
+        # Por listado: [hubo fecha posterior o igual, anteriores seguidos]
+        estado_listados = {}
+        
+        # Recorrido de soup.descendants a mano para poder saltar un listado
+        siguiente = soup.contents[0] if soup.contents else None
+        while siguiente is not None:
+            nodo, siguiente = siguiente, siguiente.next_element
+            if not isinstance(nodo, NavigableString):
+                continue
+            numero_match = PATRON_DOCUMENTO_DT.search(nodo)
+            if not numero_match:
+                continue
+            
+            listado = nodo.find_parent(CONTENEDORES_LISTADO_DT)
+            
+            try:
+                numero = numero_match.group()
+                parent, texto_completo, fecha_doc, fecha_doc_obj = self._contexto_documento(nodo)
+            except Exception as e:
+                logger.debug(f"Error procesando elemento: {e}")
+                continue
+            
+            if fecha_doc_obj:
+                estado = estado_listados.setdefault(id(listado), [False, 0])
+                if fecha_doc_obj.date() >= dia:
+                    estado[0] = True
+                    estado[1] = 0
+                else:
+                    estado[1] += 1
+                    if estado[0] and estado[1] >= ANTERIORES_PARA_CORTAR:
+                        logger.debug(f"Fechas anteriores al {dia.strftime('%d/%m/%Y')}, fin del listado")
+                        if listado is None:
+                            break
+                        siguiente = self._ultimo_descendiente(listado).next_element
+                        continue
+            
+            numero_normalizado = numero.replace('  ', ' ').strip()
+            if numero_normalizado in vistos:
+                continue
+            vistos.add(numero_normalizado)
+            
+            # Solo los documentos del día se arman completos
+            if fecha_doc_obj and fecha_doc_obj.date() == dia:
+                documentos_del_dia.append(
+                    self._armar_documento(numero, parent, texto_completo, fecha_doc))
+        
+        return documentos_del_dia
+    
+    def _ultimo_descendiente(self, elemento):
+        """Último nodo dentro de elemento; su next_element ya está fuera de él"""
+        while isinstance(elemento, Tag) and elemento.contents:
+            elemento = elemento.contents[-1]
+        return elemento
+    
+    def _contexto_documento(self, elemento):
+        """
+        Bloque que contiene el número (li, article, div, p, td o tr), su texto y su fecha.
+        
+        Returns:
+            tuple: (bloque, texto, fecha como texto, fecha como datetime o None)
+        """
+        # Obtener el contexto (elemento padre)
+        parent = elemento.parent
+        contador = 0
+        while parent and contador < 5:
+            if parent.name in ['li', 'article', 'div', 'p', 'td', 'tr']:
+                break
+            parent = parent.parent
+            contador += 1
+        
+        if not parent:
+            parent = elemento.parent
+        
+        # Extraer el texto completo del contexto
+        texto_completo = parent.get_text(separator=' ', strip=True) if parent else str(elemento)
+        
+        # Buscar fecha en el texto
+        fecha_doc = ""
+        fecha_doc_obj = None
+        fecha_match = PATRON_FECHA_DT.search(texto_completo)
+        if fecha_match:
+            fecha_doc = fecha_match.group()
+            fecha_doc_obj = self.convertir_fecha_dt(fecha_doc)
+        return parent, texto_completo, fecha_doc, fecha_doc_obj
+    
+    def _armar_documento(self, numero, parent, texto_completo, fecha_doc):
+        """Documento con tipo, descripción limpia y URL a partir de su contexto"""
+        # Limpiar y extraer descripción
+        # Eliminar el número y la fecha del texto
+        descripcion = texto_completo
+        for parte in [numero, 'Dictamen destacado']:
+            descripcion = descripcion.replace(parte, '')
+        if fecha_doc:
+            descripcion = descripcion.replace(fecha_doc, '')
+        
+        # Limpiar descripción
+        descripcion = ' '.join(descripcion.split())
+        descripcion = descripcion.strip(' ;,.')
+        
+        # Determinar tipo basado en el contenido
+        tipo = "Ordinario"  # Por defecto
+        if 'dictamen' in numero.lower() or 'dic.' in numero.lower():
+            tipo = "Dictamen"
+        elif 'ord' in numero.lower():
+            tipo = "Ordinario"
+        
+        # Limitar longitud de descripción
+        if len(descripcion) > 150:
+            descripcion = descripcion[:147] + "..."
+        
+        # Si no hay descripción o es muy corta, usar un texto genérico
+        if not descripcion or len(descripcion) < 10:
+            descripcion = f"Documento laboral de la Dirección del Trabajo"
+        
+        # Buscar URL si existe
+        url = self.url_legislacion
+        if parent:
+            link = parent.find('a', href=True)
+            if link:
+                url = link['href']
+                if not url.startswith('http'):
+                    url = self.base_url + url
+        
+        # Limpiar el número (normalizar formato)
+        numero = numero.replace('  ', ' ').strip()
+        
+        return {
+            'tipo': tipo,
+            'numero': numero,
+            'descripcion': descripcion,
+            'fecha': fecha_doc if fecha_doc else "Sin fecha",
+            'url': url
+        }
 
 
 def main():
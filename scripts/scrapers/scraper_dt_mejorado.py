@@ -4,11 +4,18 @@ Scraper mejorado para obtener dictámenes y ordinarios de la Dirección del Trab
 Versión que no depende de fechas exactas y toma los documentos más recientes
 """
 
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import logging
 import re
+import sys
+from pathlib import Path
+
+# Agregar el directorio base al path
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from alerts.services.http_cache import http_cache
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -33,7 +40,7 @@ class ScraperDT:
         try:
             logger.info(f"Obteniendo documentos más recientes de DT...")
             
-            response = requests.get(self.url_legislacion, headers=self.headers, timeout=30)
+            response = http_cache.get(self.url_legislacion, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
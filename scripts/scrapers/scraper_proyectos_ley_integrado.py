@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 import re
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import openai
 from dotenv import load_dotenv
@@ -22,6 +23,8 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+from alerts.services.aspnet_form import formulario_para, parsear_grilla
+
 # Importar servicios de extracción de PDF
 try:
     from alerts.services.pdf_extractor import pdf_extractor
@@ -34,7 +37,30 @@ openai.api_key = os.getenv('OPENAI_API_KEY')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _registros_guardados(boletines) -> Dict:
+    """Registros de ProyectoLeyCongreso por boletín ({} sin Django configurado)"""
+    try:
+        from alerts.models import ProyectoLeyCongreso
+        return ProyectoLeyCongreso.registros(boletines)
+    except Exception as e:
+        logger.debug(f"Registro de proyectos de ley no disponible: {e}")
+        return {}
+
+
+def _guardar_registro(proyecto: Dict):
+    if not proyecto.get('boletin'):
+        return
+    try:
+        from alerts.models import ProyectoLeyCongreso
+        ProyectoLeyCongreso.guardar(proyecto)
+    except Exception as e:
+        logger.debug(f"No se pudo guardar el boletín {proyecto['boletin']}: {e}")
+
 class ScraperProyectosLeyIntegrado:
+    # Proyectos cuyo documento se descarga y resume en paralelo
+    MAX_WORKERS_DOCUMENTOS = 4
+    
     def __init__(self):
         self.base_url = "https://www.camara.cl"
         self.search_url = f"{self.base_url}/legislacion/proyectosdeley/proyectos_ley.aspx"
@@ -102,59 +128,103 @@ class ScraperProyectosLeyIntegrado:
         
         logger.info(f"Buscando proyectos del {fecha_busqueda}")
         
-        proyectos = []
-        
         # Buscar en Congreso Nacional (últimos 7 días para luego filtrar)
         proyectos_recientes = self._buscar_proyectos_camara_recientes(dias_atras=7)
         
-        # Filtrar solo los que realmente son del día anterior
-        proyectos_filtrados = []
-        proyectos_vistos = set()  # Para evitar duplicados por número de boletín
-        
+        # Evitar duplicados por número de boletín antes de descargar nada
+        proyectos_unicos = {}
         for proyecto in proyectos_recientes:
-            # Primero obtener detalles para tener la fecha real
+            boletin = proyecto.get('boletin', '')
+            if boletin in proyectos_unicos:
+                logger.debug(f"Proyecto {boletin} ya procesado, omitiendo duplicado")
+                continue
+            proyectos_unicos[boletin] = proyecto
+        
+        # Boletines ya enriquecidos en días anteriores: se filtran por fecha sin descargar
+        guardados = _registros_guardados(proyectos_unicos.keys())
+        
+        # Fase 1: filtro por fecha con datos livianos (registro guardado o página de detalle)
+        por_enriquecer = []
+        incluidos = {}
+        metadatos_descargados = 0
+        
+        for boletin, proyecto in proyectos_unicos.items():
+            registro = guardados.get(boletin)
+            if registro is not None and registro.fecha_ingreso:
+                proyecto_guardado = registro.as_dict()
+                if not self._fecha_coincide(proyecto_guardado['fecha_ingreso'], fecha_busqueda):
+                    logger.info(f"❌ Proyecto {boletin} excluido (registro guardado) - fecha {proyecto_guardado['fecha_ingreso']}")
+                    continue
+                if registro.resumen:
+                    incluidos[boletin] = proyecto_guardado
+                    logger.info(f"✅ Proyecto {boletin} incluido (registro guardado) - fecha {proyecto_guardado['fecha_ingreso']}")
+                    continue
+                # Coincide pero quedó sin resumen: se vuelve a intentar el detalle
+            
+            # Boletín nuevo: obtener la página de detalle para tener la fecha real
             try:
-                proyecto_con_detalle = self.obtener_detalle_proyecto(proyecto)
+                proyecto_con_detalle = self.obtener_metadatos_proyecto(proyecto)
             except Exception as e:
                 logger.error(f"Error obteniendo detalles del proyecto {proyecto.get('boletin', 'desconocido')}: {e}")
                 continue
+            metadatos_descargados += 1
             
             # Verificar si la fecha de ingreso coincide con ayer
             fecha_ingreso = proyecto_con_detalle.get('fecha_ingreso', '')
-            boletin = proyecto_con_detalle.get('boletin', '')
             
             # LOG CRÍTICO: Mostrar TODAS las fechas que se están comparando
             logger.info(f"Comparando fechas - Buscada: '{fecha_busqueda}' vs Encontrada: '{fecha_ingreso}' para boletín {boletin}")
             
-            # Evitar duplicados por número de boletín
-            if boletin and boletin in proyectos_vistos:
-                logger.debug(f"Proyecto {boletin} ya procesado, omitiendo duplicado")
-                continue
-            
-            # Mejorar comparación de fechas - normalizar formatos
-            fecha_match = False
-            
-            if fecha_ingreso:
-                # Comparación exacta
-                if fecha_ingreso == fecha_busqueda:
-                    fecha_match = True
-                # Comparación flexible (sin ceros)
-                elif self._fechas_equivalentes(fecha_ingreso, fecha_busqueda):
-                    fecha_match = True
-                    logger.warning(f"Fechas equivalentes pero formato diferente: '{fecha_ingreso}' vs '{fecha_busqueda}'")
-                
-            if fecha_match:
-                proyectos_filtrados.append(proyecto_con_detalle)
-                if boletin:
-                    proyectos_vistos.add(boletin)
+            if self._fecha_coincide(fecha_ingreso, fecha_busqueda):
+                por_enriquecer.append(proyecto_con_detalle)
                 logger.info(f"✅ Proyecto {boletin} incluido - fecha {fecha_ingreso}")
             else:
+                # Se guarda igual para no volver a pedir su detalle mañana
+                _guardar_registro(proyecto_con_detalle)
                 logger.warning(f"❌ Proyecto {boletin} excluido - fecha no coincide: '{fecha_ingreso}' != '{fecha_busqueda}'")
         
+        # Fase 2: documento y resumen con IA, en paralelo, solo para los proyectos que van al informe
+        if por_enriquecer:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS_DOCUMENTOS, len(por_enriquecer))) as executor:
+                for proyecto_con_detalle in executor.map(self.enriquecer_documento, por_enriquecer):
+                    _guardar_registro(proyecto_con_detalle)
+                    incluidos[proyecto_con_detalle['boletin']] = proyecto_con_detalle
+        
+        # Mismo orden que la búsqueda
+        proyectos_filtrados = [incluidos[boletin] for boletin in proyectos_unicos if boletin in incluidos]
+        
+        logger.info(f"Detalles descargados: {metadatos_descargados} de {len(proyectos_unicos)} boletines "
+                    f"({len(proyectos_unicos) - metadatos_descargados} desde el registro); "
+                    f"documentos procesados: {len(por_enriquecer)}")
         logger.info(f"Total proyectos únicos ingresados el {fecha_busqueda}: {len(proyectos_filtrados)}")
         
         return proyectos_filtrados
     
+    def _fecha_coincide(self, fecha_ingreso: str, fecha_busqueda: str) -> bool:
+        """Compara la fecha de ingreso con la buscada, normalizando formatos"""
+        if not fecha_ingreso:
+            return False
+        # Comparación exacta
+        if fecha_ingreso == fecha_busqueda:
+            return True
+        # Comparación flexible (sin ceros)
+        if self._fechas_equivalentes(fecha_ingreso, fecha_busqueda):
+            logger.warning(f"Fechas equivalentes pero formato diferente: '{fecha_ingreso}' vs '{fecha_busqueda}'")
+            return True
+        return False
+    
+    def _buscar_en_formulario(self, fecha_desde: datetime, fecha_hasta: datetime):
+        """
+        Búsqueda por rango de fechas en el formulario de la Cámara.
+        El estado ASP.NET se reutiliza entre búsquedas de la misma sesión.
+        """
+        formulario = formulario_para(self.session, self.search_url)
+        return formulario.enviar({
+            'ctl00$mainPlaceHolder$txtFechaDesde': fecha_desde.strftime('%d/%m/%Y'),
+            'ctl00$mainPlaceHolder$txtFechaHasta': fecha_hasta.strftime('%d/%m/%Y'),
+            'ctl00$mainPlaceHolder$btnBuscar': 'Buscar'
+        })
+    
     def _buscar_proyectos_camara_recientes(self, dias_atras: int = 7) -> List[Dict]:
         """
         Busca proyectos recientes de los últimos días
@@ -163,63 +233,33 @@ class ScraperProyectosLeyIntegrado:
         fecha_desde = fecha_hasta - timedelta(days=dias_atras)
         
         try:
-            response = self.session.get(self.search_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extraer valores del formulario
-            viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-            viewstate_value = viewstate['value'] if viewstate else ''
-            
-            viewstate_generator = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
-            viewstate_generator_value = viewstate_generator['value'] if viewstate_generator else ''
-            
-            event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-            event_validation_value = event_validation['value'] if event_validation else ''
-            
-            # Buscar proyectos de los últimos días
-            form_data = {
-                '__EVENTTARGET': '',
-                '__EVENTARGUMENT': '',
-                '__VIEWSTATE': viewstate_value,
-                '__VIEWSTATEGENERATOR': viewstate_generator_value,
-                '__EVENTVALIDATION': event_validation_value,
-                'ctl00$mainPlaceHolder$txtFechaDesde': fecha_desde.strftime('%d/%m/%Y'),
-                'ctl00$mainPlaceHolder$txtFechaHasta': fecha_hasta.strftime('%d/%m/%Y'),
-                'ctl00$mainPlaceHolder$btnBuscar': 'Buscar'
-            }
-            
-            response = self.session.post(self.search_url, data=form_data)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self._buscar_en_formulario(fecha_desde, fecha_hasta)
             
             proyectos = []
             
             # Buscar tabla de resultados
-            tabla = soup.find('table', {'id': 'mainPlaceHolder_grvResultado'})
+            filas = parsear_grilla(response.documento, 'mainPlaceHolder_grvResultado')
             
-            if tabla:
-                filas = tabla.find_all('tr')[1:]  # Saltar header
-                for fila in filas:
-                    celdas = fila.find_all('td')
+            if filas is not None:
+                for celdas in filas:
                     if len(celdas) >= 3:
                         proyecto = {}
                         
                         # Boletín y URL
-                        if celdas[0].find('a'):
-                            link = celdas[0].find('a')
-                            texto = link.get_text(strip=True)
-                            match = re.search(r'(\d{4,5}-\d{2})', texto)
+                        if celdas[0].enlace_texto is not None:
+                            match = re.search(r'(\d{4,5}-\d{2})', celdas[0].enlace_texto)
                             if match:
                                 proyecto['boletin'] = match.group(1)
-                                proyecto['url_detalle'] = self.base_url + link.get('href', '')
+                                proyecto['url_detalle'] = self.base_url + celdas[0].href
                         
                         # Título
-                        if len(celdas) > 2:
-                            proyecto['titulo'] = celdas[2].get_text(strip=True)
+                        proyecto['titulo'] = celdas[2].texto
                         
                         if proyecto.get('boletin'):
                             proyectos.append(proyecto)
             else:
                 # Buscar enlaces alternativos
+                soup = BeautifulSoup(response.text, 'html.parser')
                 enlaces = soup.find_all('a', href=re.compile('tramitacion\\.aspx\\?prmID=\\d+'))
                 for enlace in enlaces[:20]:  # Limitar a 20 proyectos
                     href = enlace.get('href', '')
@@ -251,51 +291,23 @@ class ScraperProyectosLeyIntegrado:
         Busca proyectos en el sitio del Congreso Nacional
         """
         try:
-            # Hacer búsqueda por fecha específica
-            response = self.session.get(self.search_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extraer valores del formulario
-            viewstate = soup.find('input', {'name': '__VIEWSTATE'})
-            viewstate_value = viewstate['value'] if viewstate else ''
-            
-            viewstate_generator = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
-            viewstate_generator_value = viewstate_generator['value'] if viewstate_generator else ''
-            
-            event_validation = soup.find('input', {'name': '__EVENTVALIDATION'})
-            event_validation_value = event_validation['value'] if event_validation else ''
-            
-            # Preparar datos del formulario para búsqueda específica por fecha
-            fecha_str = fecha.strftime('%d/%m/%Y')
-            form_data = {
-                '__EVENTTARGET': '',
-                '__EVENTARGUMENT': '',
-                '__VIEWSTATE': viewstate_value,
-                '__VIEWSTATEGENERATOR': viewstate_generator_value,
-                '__EVENTVALIDATION': event_validation_value,
-                'ctl00$mainPlaceHolder$txtFechaDesde': fecha_str,
-                'ctl00$mainPlaceHolder$txtFechaHasta': fecha_str,  # Mismo día
-                'ctl00$mainPlaceHolder$btnBuscar': 'Buscar'
-            }
-            
-            # Realizar búsqueda
-            response = self.session.post(self.search_url, data=form_data)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Búsqueda por fecha específica (mismo día en ambos extremos)
+            response = self._buscar_en_formulario(fecha, fecha)
             
             proyectos = []
             
             # Buscar proyectos en la respuesta
             # Primero intentar tabla de resultados
-            tabla = soup.find('table', {'id': 'mainPlaceHolder_grvResultado'})
+            filas = parsear_grilla(response.documento, 'mainPlaceHolder_grvResultado')
             
-            if tabla:
-                filas = tabla.find_all('tr')[1:]  # Saltar header
-                for fila in filas:
-                    proyecto = self._extraer_proyecto_de_fila(fila, fecha)
+            if filas is not None:
+                for celdas in filas:
+                    proyecto = self._extraer_proyecto_de_fila(celdas, fecha)
                     if proyecto:
                         proyectos.append(proyecto)
             else:
                 # Buscar enlaces a proyectos
+                soup = BeautifulSoup(response.text, 'html.parser')
                 enlaces = soup.find_all('a', href=re.compile('tramitacion\\.aspx\\?prmID=\\d+'))
                 for enlace in enlaces:
                     proyecto = self._extraer_proyecto_de_enlace(enlace, fecha)
@@ -315,12 +327,11 @@ class ScraperProyectosLeyIntegrado:
         # Por ahora retornamos vacío, se puede implementar después si es necesario
         return []
     
-    def _extraer_proyecto_de_fila(self, fila, fecha: datetime) -> Dict:
+    def _extraer_proyecto_de_fila(self, celdas, fecha: datetime) -> Dict:
         """
-        Extrae información de proyecto desde una fila de tabla
+        Extrae información de proyecto desde las celdas de una fila de la grilla
         """
         try:
-            celdas = fila.find_all('td')
             if len(celdas) < 3:
                 return None
             
@@ -330,21 +341,18 @@ class ScraperProyectosLeyIntegrado:
             }
             
             # Extraer boletín
-            if celdas[0].find('a'):
-                link = celdas[0].find('a')
-                texto = link.get_text(strip=True)
-                match = re.search(r'(\d{4,5}-\d{2})', texto)
+            if celdas[0].enlace_texto is not None:
+                match = re.search(r'(\d{4,5}-\d{2})', celdas[0].enlace_texto)
                 if match:
                     proyecto['boletin'] = match.group(1)
-                    proyecto['url_detalle'] = self.base_url + link.get('href', '')
+                    proyecto['url_detalle'] = self.base_url + celdas[0].href
             
             # Extraer título
-            if len(celdas) > 2:
-                proyecto['titulo'] = celdas[2].get_text(strip=True)
+            proyecto['titulo'] = celdas[2].texto
             
             # Extraer estado
             if len(celdas) > 3:
-                proyecto['estado'] = celdas[3].get_text(strip=True)
+                proyecto['estado'] = celdas[3].texto
             
             return proyecto if proyecto.get('boletin') else None
             
@@ -396,6 +404,13 @@ class ScraperProyectosLeyIntegrado:
         """
         Enriquece el proyecto con información adicional y extrae contenido del documento
         """
+        return self.enriquecer_documento(self.obtener_metadatos_proyecto(proyecto))
+    
+    def obtener_metadatos_proyecto(self, proyecto: Dict) -> Dict:
+        """
+        Paso liviano: solo la página de detalle (fecha de ingreso, urgencia,
+        comisión y enlace al documento), sin descargar el PDF
+        """
         if not proyecto.get('url_detalle'):
             return proyecto
         
@@ -461,13 +476,6 @@ class ScraperProyectosLeyIntegrado:
                     url_documento_encontrada = self.base_url + '/' + url_documento_encontrada
                 
                 proyecto['url_documento'] = url_documento_encontrada
-                
-                # Descargar y extraer contenido del PDF
-                contenido = self._extraer_contenido_pdf(url_documento_encontrada)
-                if contenido:
-                    proyecto['contenido_documento'] = contenido
-                    # Generar resumen del contenido
-                    proyecto['resumen'] = self._generar_resumen_proyecto(contenido, proyecto.get('titulo', ''))
             
             # Buscar urgencia
             urgencia = soup.find(string=re.compile('Urgencia'))
@@ -486,6 +494,26 @@ class ScraperProyectosLeyIntegrado:
         
         return proyecto
     
+    def enriquecer_documento(self, proyecto: Dict) -> Dict:
+        """
+        Paso pesado: descarga el documento del proyecto, extrae su contenido y
+        genera el resumen con IA
+        """
+        if not proyecto.get('url_documento'):
+            return proyecto
+        
+        try:
+            # Descargar y extraer contenido del PDF
+            contenido = self._extraer_contenido_pdf(proyecto['url_documento'])
+            if contenido:
+                proyecto['contenido_documento'] = contenido
+                # Generar resumen del contenido
+                proyecto['resumen'] = self._generar_resumen_proyecto(contenido, proyecto.get('titulo', ''))
+        except Exception as e:
+            logger.error(f"Error enriqueciendo el proyecto {proyecto.get('boletin', 'desconocido')}: {e}")
+        
+        return proyecto
+    
     def _extraer_contenido_pdf(self, url: str) -> Optional[str]:
         """
         Descarga y extrae el contenido completo de un PDF
@@ -525,7 +553,7 @@ class ScraperProyectosLeyIntegrado:
                 # Fallback: usar pdf_extractor si pypdf falla
                 if pdf_extractor:
                     try:
-                        texto, metodo = pdf_extractor.extract_text(response.content, max_pages=5)
+                        texto, metodo = pdf_extractor.extract_text(response.content, max_pages=5, max_chars=5000)
                         if texto and len(texto) > 50:
                             logger.info(f"Extraídos {len(texto)} caracteres con pdf_extractor")
                             return texto[:5000] if len(texto) > 5000 else texto
@@ -15,14 +15,46 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+from lxml import html as lxml_html
+from urllib.parse import urljoin
 import time
 import re
 
+try:
+    from .sea_detalle_concurrente import FetcherDetalleSEA
+except ImportError:
+    try:
+        from scripts.scrapers.sea_detalle_concurrente import FetcherDetalleSEA
+    except ImportError:
+        from sea_detalle_concurrente import FetcherDetalleSEA
+
 logger = logging.getLogger(__name__)
 
+# Filas de datos de la tabla de resultados (se excluye el encabezado)
+XPATH_FILAS_SEA = "//table//tr[position()>1]"
+
+# Columnas de la tabla de resultados, en orden
+COLUMNAS_SEA = (
+    'titulo', 'tipo', 'region', 'comuna', 'tipo_proyecto', 'razon_ingreso', 'empresa',
+    'inversion_mmusd', 'fecha_presentacion', 'fecha_ingreso', 'dias_legales', 'estado',
+)
+
+
+def _texto_celda(elemento) -> str:
+    """Texto de un elemento lxml con los espacios normalizados, como .text de WebDriver en una celda"""
+    return ' '.join(elemento.text_content().split())
+
+
 class ScraperSEASeleniumCompleto:
-    def __init__(self):
-        """Inicializa el scraper con Selenium"""
+    def __init__(self, parseo_snapshot: bool = True):
+        """
+        Inicializa el scraper con Selenium
+
+        Args:
+            parseo_snapshot: Leer la tabla desde un único driver.page_source con lxml
+                             en vez de consultar cada celda por WebDriver.
+        """
+        self.parseo_snapshot = parseo_snapshot
         self.base_url = "https://seia.sea.gob.cl"
         self.search_url = f"{self.base_url}/busqueda/buscarProyectoResumen.php"
         
@@ -98,23 +130,27 @@ class ScraperSEASeleniumCompleto:
                 
                 logger.info("✅ Tabla encontrada")
                 
-                # Obtener todas las filas de la tabla (excluyendo el header)
-                filas = driver.find_elements(By.XPATH, "//table//tr[position()>1]")
-                logger.info(f"📊 Filas encontradas: {len(filas)}")
-                
-                # Procesar cada fila
-                for i, fila in enumerate(filas[:30], 1):  # Limitar a 30 proyectos
-                    try:
-                        proyecto = self._extraer_proyecto_de_fila(fila, driver)
-                        if proyecto and proyecto.get('titulo'):
-                            proyectos.append(proyecto)
-                            logger.info(f"✅ Proyecto {i}: {proyecto.get('titulo', '')[:60]}")
-                        else:
-                            logger.debug(f"Fila {i} no contiene proyecto válido")
-                                    
-                    except Exception as e:
-                        logger.debug(f"Error procesando fila {i}: {e}")
-                        continue
+                if self.parseo_snapshot:
+                    # Una sola llamada al navegador; las filas se parsean en proceso
+                    proyectos = self._extraer_proyectos_de_html(driver.page_source, driver.current_url)
+                else:
+                    # Obtener todas las filas de la tabla (excluyendo el header)
+                    filas = driver.find_elements(By.XPATH, XPATH_FILAS_SEA)
+                    logger.info(f"📊 Filas encontradas: {len(filas)}")
+                    
+                    # Procesar cada fila
+                    for i, fila in enumerate(filas[:30], 1):  # Limitar a 30 proyectos
+                        try:
+                            proyecto = self._extraer_proyecto_de_fila(fila, driver)
+                            if proyecto and proyecto.get('titulo'):
+                                proyectos.append(proyecto)
+                                logger.info(f"✅ Proyecto {i}: {proyecto.get('titulo', '')[:60]}")
+                            else:
+                                logger.debug(f"Fila {i} no contiene proyecto válido")
+                                        
+                        except Exception as e:
+                            logger.debug(f"Error procesando fila {i}: {e}")
+                            continue
                 
             except Exception as e:
                 logger.error(f"Error esperando tabla: {e}")
@@ -152,23 +188,27 @@ class ScraperSEASeleniumCompleto:
         
         # Obtener resúmenes de los top 5 o menos si hay menos proyectos
         max_resumenes = min(5, len(proyectos_ordenados))
+        relevantes = proyectos_ordenados[:max_resumenes]
         
-        for i in range(max_resumenes):
-            proyecto = proyectos_ordenados[i]
-            try:
-                logger.info(f"   Obteniendo resumen de: {proyecto.get('titulo', '')[:50]}...")
-                resumen_detallado = self._obtener_resumen_proyecto(proyecto, driver)
-                
-                if resumen_detallado:
-                    proyecto.update(resumen_detallado)
-                    logger.info(f"   ✅ Resumen obtenido ({len(proyecto.get('resumen_completo', ''))} caracteres)")
-                else:
-                    # Si no se pudo obtener resumen detallado, generar uno básico
-                    proyecto['resumen_completo'] = self._generar_resumen_completo(proyecto)
-                    
-            except Exception as e:
-                logger.debug(f"Error obteniendo resumen: {e}")
-                # Generar resumen básico si falla
+        # Fichas en paralelo sobre una sesión con las cookies del navegador (con caché por expediente)
+        detalles = {}
+        try:
+            fetcher = FetcherDetalleSEA.desde_driver(driver)
+            detalles = fetcher.obtener(p.get('id') for p in relevantes)
+        except Exception as e:
+            logger.debug(f"Error obteniendo fichas: {e}")
+        
+        for proyecto in relevantes:
+            detalle = detalles.get(proyecto.get('id'))
+            if detalle:
+                proyecto.update({
+                    'resumen_completo': self._formatear_descripcion_real(detalle['resumen']),
+                    'descripcion_real': detalle['resumen'],
+                    'metodo_extraccion': 'requests_con_cookies'
+                })
+                logger.info(f"   ✅ Resumen obtenido ({len(proyecto['resumen_completo'])} caracteres)")
+            else:
+                # Si no se pudo obtener resumen detallado, generar uno básico
                 proyecto['resumen_completo'] = self._generar_resumen_completo(proyecto)
         
         # Para el resto de proyectos, generar resumen básico
@@ -310,7 +350,10 @@ class ScraperSEASeleniumCompleto:
         return resumen
     
     def _extraer_proyecto_de_fila(self, fila, driver) -> Optional[Dict]:
-        """Extrae información básica del proyecto desde una fila de la tabla"""
+        """
+        Extrae información básica del proyecto desde una fila de la tabla vía WebDriver.
+        Cada find_elements/.text/get_attribute es un round-trip al navegador.
+        """
         try:
             # Obtener todas las celdas
             celdas = fila.find_elements(By.TAG_NAME, "td")
@@ -318,6 +361,59 @@ class ScraperSEASeleniumCompleto:
             if len(celdas) < 2:
                 return None
             
+            enlaces = celdas[0].find_elements(By.TAG_NAME, "a")
+            enlace = (enlaces[0].text.strip(), enlaces[0].get_attribute('href')) if enlaces else None
+            textos = ['' if enlace else celdas[0].text.strip()]
+            textos += [celda.text.strip() for celda in celdas[1:len(COLUMNAS_SEA)]]
+            
+            return self._proyecto_desde_celdas(textos, enlace)
+            
+        except Exception as e:
+            logger.debug(f"Error extrayendo proyecto de fila: {e}")
+        
+        return None
+    
+    def _extraer_proyectos_de_html(self, html: str, url_base: str, limite: int = 30) -> List[Dict]:
+        """
+        Extrae los proyectos de todas las filas de la tabla desde un snapshot de
+        driver.page_source, parseado en proceso con lxml (sin llamadas a WebDriver).
+        """
+        documento = lxml_html.fromstring(html)
+        filas = documento.xpath(XPATH_FILAS_SEA)
+        logger.info(f"📊 Filas encontradas: {len(filas)}")
+        
+        proyectos = []
+        for i, fila in enumerate(filas[:limite], 1):
+            try:
+                celdas = fila.xpath('.//td')
+                if len(celdas) < 2:
+                    logger.debug(f"Fila {i} no contiene proyecto válido")
+                    continue
+                
+                enlaces = celdas[0].xpath('.//a')
+                enlace = None
+                if enlaces:
+                    href = enlaces[0].get('href')
+                    enlace = (_texto_celda(enlaces[0]), urljoin(url_base, href) if href is not None else None)
+                textos = [_texto_celda(celda) for celda in celdas[:len(COLUMNAS_SEA)]]
+                
+                proyecto = self._proyecto_desde_celdas(textos, enlace)
+                if proyecto and proyecto.get('titulo'):
+                    proyectos.append(proyecto)
+                    logger.info(f"✅ Proyecto {i}: {proyecto.get('titulo', '')[:60]}")
+                else:
+                    logger.debug(f"Fila {i} no contiene proyecto válido")
+            except Exception as e:
+                logger.debug(f"Error procesando fila {i}: {e}")
+        
+        return proyectos
+    
+    def _proyecto_desde_celdas(self, celdas: List[str], enlace: Optional[tuple]) -> Optional[Dict]:
+        """
+        Arma el proyecto a partir de los textos de las celdas de una fila y del
+        enlace de la primera columna (texto, href), si lo hay.
+        """
+        try:
             proyecto = {
                 'fuente': 'SEA',
                 'fecha_extraccion': datetime.now().isoformat()
@@ -339,47 +435,43 @@ class ScraperSEASeleniumCompleto:
             
             # Columna 0: Nombre del proyecto con enlace
             if len(celdas) > 0:
-                celda_nombre = celdas[0]
-                enlace = celda_nombre.find_element(By.TAG_NAME, "a") if celda_nombre.find_elements(By.TAG_NAME, "a") else None
-                
                 if enlace:
-                    proyecto['titulo'] = enlace.text.strip()
-                    proyecto['url'] = enlace.get_attribute('href')
+                    proyecto['titulo'], proyecto['url'] = enlace
                     
                     # Extraer ID del href
-                    id_match = re.search(r'id_expediente=(\d+)', proyecto['url'])
+                    id_match = re.search(r'id_expediente=(\d+)', proyecto['url'] or '')
                     if id_match:
                         proyecto['id'] = id_match.group(1)
                 else:
-                    proyecto['titulo'] = celda_nombre.text.strip()
+                    proyecto['titulo'] = celdas[0]
             
             # Columna 1: Tipo (DIA/EIA)
             if len(celdas) > 1:
-                proyecto['tipo'] = celdas[1].text.strip()
+                proyecto['tipo'] = celdas[1]
             
             # Columna 2: Región
             if len(celdas) > 2:
-                proyecto['region'] = celdas[2].text.strip()
+                proyecto['region'] = celdas[2]
             
             # Columna 3: Comuna
             if len(celdas) > 3:
-                proyecto['comuna'] = celdas[3].text.strip()
+                proyecto['comuna'] = celdas[3]
             
             # Columna 4: Tipo de Proyecto
             if len(celdas) > 4:
-                proyecto['tipo_proyecto'] = celdas[4].text.strip()
+                proyecto['tipo_proyecto'] = celdas[4]
             
             # Columna 5: Razón de Ingreso
             if len(celdas) > 5:
-                proyecto['razon_ingreso'] = celdas[5].text.strip()
+                proyecto['razon_ingreso'] = celdas[5]
             
             # Columna 6: Titular/Empresa
             if len(celdas) > 6:
-                proyecto['empresa'] = celdas[6].text.strip()
+                proyecto['empresa'] = celdas[6]
             
             # Columna 7: Inversión
             if len(celdas) > 7:
-                inversion_text = celdas[7].text.strip()
+                inversion_text = celdas[7]
                 # Convertir a número si es posible
                 try:
                     # Remover comas y convertir
@@ -390,15 +482,15 @@ class ScraperSEASeleniumCompleto:
             
             # Columna 8: Fecha Presentación
             if len(celdas) > 8:
-                proyecto['fecha_presentacion'] = celdas[8].text.strip()
+                proyecto['fecha_presentacion'] = celdas[8]
             
             # Columna 9: Fecha de Ingreso
             if len(celdas) > 9:
-                proyecto['fecha_ingreso'] = celdas[9].text.strip()
+                proyecto['fecha_ingreso'] = celdas[9]
             
             # Columna 10: Días Legales
             if len(celdas) > 10:
-                dias_text = celdas[10].text.strip()
+                dias_text = celdas[10]
                 try:
                     proyecto['dias_legales'] = int(dias_text)
                 except:
@@ -406,7 +498,7 @@ class ScraperSEASeleniumCompleto:
             
             # Columna 11: Estado
             if len(celdas) > 11:
-                proyecto['estado'] = celdas[11].text.strip()
+                proyecto['estado'] = celdas[11]
             
             # Generar resumen
             if proyecto.get('titulo'):
@@ -415,119 +507,7 @@ class ScraperSEASeleniumCompleto:
                 return proyecto
             
         except Exception as e:
-            logger.debug(f"Error extrayendo proyecto de fila: {e}")
-        
-        return None
-    
-    def _obtener_resumen_proyecto(self, proyecto: Dict, driver) -> Optional[Dict]:
-        """
-        Obtiene resumen detallado del proyecto usando requests con cookies de Selenium
-        NUEVO: Método híbrido que evita problemas de navegación con Selenium
-        """
-        try:
-            url_proyecto = proyecto.get('url')
-            if not url_proyecto:
-                return None
-            
-            logger.debug(f"📖 Obteniendo resumen de: {url_proyecto}")
-            
-            # Método HÍBRIDO: usar requests con cookies de Selenium
-            resumen_detallado = self._obtener_descripcion_con_requests(url_proyecto, driver)
-            
-            if resumen_detallado and resumen_detallado.get('resumen_completo'):
-                logger.debug(f"✅ Descripción real obtenida: {len(resumen_detallado['resumen_completo'])} caracteres")
-                return resumen_detallado
-            else:
-                # Fallback: generar resumen mejorado
-                logger.debug("⚠️ Sin descripción real, usando resumen mejorado")
-                return {'resumen_completo': self._generar_resumen_completo(proyecto)}
-            
-        except Exception as e:
-            logger.debug(f"Error obteniendo resumen del proyecto: {e}")
-            return {'resumen_completo': self._generar_resumen_completo(proyecto)}
-    
-    def _obtener_descripcion_con_requests(self, url_proyecto: str, driver) -> Optional[Dict]:
-        """
-        NUEVO: Obtiene descripción real usando requests con cookies de Selenium
-        """
-        try:
-            import requests
-            from bs4 import BeautifulSoup
-            
-            # Obtener cookies de Selenium
-            selenium_cookies = driver.get_cookies()
-            cookies_dict = {}
-            for cookie in selenium_cookies:
-                cookies_dict[cookie['name']] = cookie['value']
-            
-            # Headers para simular navegador
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Referer': driver.current_url,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            
-            # Request con cookies de Selenium
-            response = requests.get(url_proyecto, cookies=cookies_dict, headers=headers, timeout=20)
-            
-            if response.status_code == 200 and len(response.text) > 1000:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extraer descripción usando múltiples métodos
-                descripcion = self._extraer_descripcion_de_soup(soup)
-                
-                if descripcion and len(descripcion) > 50:
-                    return {
-                        'resumen_completo': self._formatear_descripcion_real(descripcion),
-                        'descripcion_real': descripcion,
-                        'metodo_extraccion': 'requests_con_cookies'
-                    }
-            
-            return None
-            
-        except Exception as e:
-            logger.debug(f"Error en requests con cookies: {e}")
-            return None
-    
-    def _extraer_descripcion_de_soup(self, soup) -> Optional[str]:
-        """Extrae descripción del HTML parseado con BeautifulSoup"""
-        
-        # Método 1: Buscar div específico de descripción
-        desc_div = soup.find('div', class_='sg-description-file')
-        if desc_div:
-            texto = desc_div.get_text(separator=' ', strip=True)
-            if len(texto) > 50:
-                return self._limpiar_texto_html(texto)
-        
-        # Método 2: Buscar por span "Descripción del Proyecto"  
-        span_desc = soup.find('span', string='Descripción del Proyecto')
-        if span_desc:
-            parent = span_desc.parent
-            if parent:
-                siguiente = parent.find_next_sibling('div')
-                if siguiente:
-                    texto = siguiente.get_text(separator=' ', strip=True)
-                    if len(texto) > 50:
-                        return self._limpiar_texto_html(texto)
-        
-        # Método 3: Buscar divs con contenido relevante
-        for div in soup.find_all('div'):
-            texto = div.get_text(separator=' ', strip=True)
-            if (len(texto) > 300 and 
-                any(palabra in texto.lower() for palabra in 
-                    ['consiste en', 'contempla', 'proyecto se emplaza', 'construcción', 'operación'])):
-                return self._limpiar_texto_html(texto)
-        
-        # Método 4: Buscar en celdas de tabla
-        for td in soup.find_all('td'):
-            texto = td.get_text(separator=' ', strip=True)
-            if (len(texto) > 300 and 
-                any(palabra in texto.lower() for palabra in 
-                    ['consiste en', 'contempla', 'se emplaza'])):
-                return self._limpiar_texto_html(texto)
+            logger.debug(f"Error armando proyecto desde celdas: {e}")
         
         return None
     
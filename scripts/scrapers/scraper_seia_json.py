@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cliente JSON para el listado de proyectos del SEIA (sin navegador)
+
+La grilla de https://seia.sea.gob.cl/busqueda/buscarProyectoResumen.php se
+llena desde un endpoint DataTables (buscarProyectoResumenAction.php) que
+pagina con start/length y acepta el mismo rango de fechas de presentación que
+la página. Este cliente lo recorre con una sesión HTTP compartida y entrega los
+proyectos con el mismo formato que ScraperSEASeleniumCompleto.obtener_datos_sea.
+
+Si la respuesta deja de cumplir el contrato esperado (no es JSON, falta 'data'
+o los registros no traen las columnas conocidas) se lanza ContratoSEIAError
+para que quien lo use recurra al scraper con Selenium.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import requests
+
+try:
+    from .scraper_sea_selenium_completo import COLUMNAS_SEA, ScraperSEASeleniumCompleto
+except ImportError:
+    try:
+        from scripts.scrapers.scraper_sea_selenium_completo import COLUMNAS_SEA, ScraperSEASeleniumCompleto
+    except ImportError:
+        from scraper_sea_selenium_completo import COLUMNAS_SEA, ScraperSEASeleniumCompleto
+
+logger = logging.getLogger(__name__)
+
+# Campo del JSON que alimenta cada columna de la tabla (ver COLUMNAS_SEA);
+# se usa el primero presente. Los de la columna 0 son obligatorios.
+CAMPOS_JSON_SEA = {
+    'titulo': ('EXPEDIENTE_NOMBRE',),
+    'tipo': ('WORKFLOW_DESCRIPCION',),
+    'region': ('REGION_NOMBRE',),
+    'comuna': ('COMUNA_NOMBRE',),
+    'tipo_proyecto': ('DESCRIPCION_TIPOLOGIA',),
+    'razon_ingreso': ('RAZON_INGRESO',),
+    'empresa': ('TITULAR',),
+    'inversion_mmusd': ('INVERSION_MM_FORMAT', 'INVERSION_MM'),
+    'fecha_presentacion': ('FECHA_PRESENTACION_FORMAT', 'FECHA_PRESENTACION'),
+    'fecha_ingreso': ('FECHA_INGRESO_FORMAT', 'FECHA_INGRESO'),
+    'dias_legales': ('DIAS_LEGALES',),
+    'estado': ('ESTADO_PROYECTO',),
+}
+
+
+class ContratoSEIAError(Exception):
+    """La respuesta del endpoint DataTables no tiene el formato esperado"""
+
+
+class ScraperSEIAJson:
+    """Listado paginado de proyectos del SEIA vía el endpoint JSON de DataTables"""
+
+    # Registros por página solicitados al endpoint
+    TAMANO_PAGINA = 100
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Args:
+            session: Sesión HTTP a reutilizar (p. ej. la de ScraperAmbiental).
+        """
+        self.session = session or requests.Session()
+        self.base_url = "https://seia.sea.gob.cl"
+        self.search_url = f"{self.base_url}/busqueda/buscarProyectoResumen.php"
+        self.ajax_url = f"{self.base_url}/busqueda/buscarProyectoResumenAction.php"
+        self._sesion_iniciada = False
+        # Solo para reutilizar el mapeo de columnas, el resumen y la relevancia (no abre navegador)
+        self._formateador = ScraperSEASeleniumCompleto()
+
+    def obtener_datos_sea(self, dias_atras: int = 7, limite: int = 30) -> List[Dict]:
+        """
+        Obtiene los proyectos presentados en los últimos `dias_atras` días,
+        más recientes primero, hasta `limite` proyectos.
+
+        Raises:
+            ContratoSEIAError: Si el endpoint no responde con el formato esperado.
+            requests.RequestException: Errores de red.
+        """
+        fecha_hasta = datetime.now()
+        fecha_desde = fecha_hasta - timedelta(days=dias_atras)
+        filtros = {
+            'tipoPresentacion': 'AMBOS',
+            'PresentacionMin': fecha_desde.strftime('%d/%m/%Y'),
+            'PresentacionMax': fecha_hasta.strftime('%d/%m/%Y'),
+        }
+
+        self._iniciar_sesion()
+
+        proyectos = []
+        inicio = 0
+        pagina = 1
+        while len(proyectos) < limite:
+            largo = min(self.TAMANO_PAGINA, limite - len(proyectos))
+            registros, total = self._obtener_pagina(filtros, pagina, inicio, largo)
+            for item in registros:
+                proyecto = self._convertir_registro(item)
+                if proyecto:
+                    proyectos.append(proyecto)
+
+            inicio += len(registros)
+            pagina += 1
+            if not registros or len(registros) < largo or inicio >= total:
+                break
+
+        logger.info(f"✅ {len(proyectos)} proyectos SEIA obtenidos vía JSON ({pagina - 1} páginas)")
+        return proyectos[:limite]
+
+    def _iniciar_sesion(self):
+        """Visita la página de búsqueda una vez para obtener las cookies de sesión"""
+        if self._sesion_iniciada:
+            return
+        response = self.session.get(self.search_url, timeout=15)
+        response.raise_for_status()
+        self._sesion_iniciada = True
+
+    def _obtener_pagina(self, filtros: Dict, draw: int, inicio: int, largo: int):
+        """Una página del endpoint DataTables; retorna (registros, total filtrado)"""
+        params = dict(filtros)
+        params.update({
+            'draw': str(draw),
+            'start': str(inicio),
+            'length': str(largo),
+            'order[0][column]': '13',  # Fecha de presentación
+            'order[0][dir]': 'desc',
+        })
+        headers = {
+            'X-Requested-With': 'XMLHttpRequest',
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Referer': self.search_url,
+        }
+
+        response = self.session.get(self.ajax_url, params=params, headers=headers, timeout=15)
+        response.raise_for_status()
+
+        try:
+            data = response.json()
+        except ValueError:
+            raise ContratoSEIAError(f"Respuesta no JSON ({response.headers.get('Content-Type', '')})")
+
+        if not isinstance(data, dict) or not isinstance(data.get('data'), list):
+            raise ContratoSEIAError("La respuesta no contiene la lista 'data'")
+
+        registros = data['data']
+        if registros and not (isinstance(registros[0], dict) and CAMPOS_JSON_SEA['titulo'][0] in registros[0]):
+            raise ContratoSEIAError("Los registros no traen las columnas esperadas")
+
+        # Sin total informado se sigue paginando mientras lleguen páginas completas
+        try:
+            total = int(data.get('recordsFiltered', data.get('recordsTotal')))
+        except (TypeError, ValueError):
+            total = inicio + len(registros) + (largo if len(registros) == largo else 0)
+        return registros, total
+
+    def _convertir_registro(self, item: Dict) -> Optional[Dict]:
+        """Registro JSON -> proyecto con el formato de la tabla del SEA"""
+        textos = []
+        for columna in COLUMNAS_SEA:
+            valor = next((item[c] for c in CAMPOS_JSON_SEA[columna] if item.get(c) not in (None, '')), '')
+            if columna in ('fecha_presentacion', 'fecha_ingreso') and str(valor).isdigit():
+                valor = datetime.fromtimestamp(int(valor)).strftime('%d/%m/%Y')
+            textos.append(' '.join(str(valor).split()))
+
+        url = item.get('EXPEDIENTE_URL_FICHA') or item.get('EXPEDIENTE_URL_PPAL')
+        if not url and item.get('EXPEDIENTE_ID'):
+            url = (f"{self.base_url}/expediente/ficha/fichaPrincipal.php"
+                   f"?id_expediente={item['EXPEDIENTE_ID']}")
+        enlace = (textos[0], url) if url else None
+
+        proyecto = self._formateador._proyecto_desde_celdas(textos, enlace)
+        if proyecto:
+            if not proyecto.get('id') and item.get('EXPEDIENTE_ID'):
+                proyecto['id'] = str(item['EXPEDIENTE_ID'])
+            # Como el scraper con Selenium; la descripción real se agrega al formatear el informe
+            proyecto['resumen_completo'] = self._formateador._generar_resumen_completo(proyecto)
+        return proyecto
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Descarga concurrente de fichas de proyectos del SEA con caché por expediente
+
+Las fichas se piden en paralelo sobre una única sesión HTTP (con las cookies
+del navegador cuando se parte de un driver de Selenium) y se parsean con
+BeautifulSoup. Cada descripción extraída se guarda por id_expediente en memoria
+y en la tabla DescripcionProyectoSEA: como un proyecto aparece en la ventana de
+7 días del informe varios días seguidos, su ficha se descarga una sola vez.
+Sin Django configurado (scripts sueltos) la caché queda solo en memoria.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .sea_resumen_extractor_robusto import SEAResumenExtractorRobusto
+except ImportError:
+    try:
+        from scripts.scrapers.sea_resumen_extractor_robusto import SEAResumenExtractorRobusto
+    except ImportError:
+        from sea_resumen_extractor_robusto import SEAResumenExtractorRobusto
+
+logger = logging.getLogger(__name__)
+
+URL_FICHA_SEA = "https://seia.sea.gob.cl/expediente/ficha/fichaPrincipal.php?modo=ficha&id_expediente={}"
+
+# Frases que indican que un bloque de texto describe el proyecto
+FRASES_DESCRIPCION = ('consiste en', 'contempla', 'proyecto se emplaza', 'se emplaza', 'construcción', 'operación')
+
+
+def _cache_bd_obtener(ids_expediente) -> Dict[str, Dict]:
+    try:
+        from alerts.models import DescripcionProyectoSEA
+        return DescripcionProyectoSEA.obtener_varios(ids_expediente)
+    except Exception as e:
+        logger.debug(f"Caché de fichas SEA en BD no disponible: {e}")
+        return {}
+
+
+def _cache_bd_guardar(detalles: Dict[str, Dict]):
+    try:
+        from alerts.models import DescripcionProyectoSEA
+        DescripcionProyectoSEA.guardar_varios(detalles)
+    except Exception as e:
+        logger.debug(f"No se pudo guardar la caché de fichas SEA en BD: {e}")
+
+
+class FetcherDetalleSEA:
+    """Obtiene las fichas de varios expedientes del SEA en paralelo, con caché"""
+
+    MAX_WORKERS = 4
+    TIMEOUT = 20
+
+    # Caché compartida por todas las instancias del proceso
+    _memoria: Dict[str, Dict] = {}
+
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            session: Sesión a reutilizar (p. ej. con las cookies de Selenium o la
+                     de ScraperAmbiental). Si no se entrega se crea una con
+                     reintentos y un pool del tamaño de max_workers.
+            max_workers: Descargas simultáneas.
+        """
+        self.max_workers = max_workers or self.MAX_WORKERS
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+            })
+            reintentos = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                               allowed_methods=frozenset(['GET']))
+            adaptador = HTTPAdapter(pool_maxsize=self.max_workers, max_retries=reintentos)
+            session.mount('https://', adaptador)
+            session.mount('http://', adaptador)
+        self.session = session
+        # Solo se usan sus helpers de texto (no abre navegador)
+        self._texto = SEAResumenExtractorRobusto()
+
+    @classmethod
+    def desde_driver(cls, driver, max_workers: Optional[int] = None) -> 'FetcherDetalleSEA':
+        """Fetcher cuya sesión lleva las cookies del driver de Selenium (se copian una vez)"""
+        fetcher = cls(max_workers=max_workers)
+        for cookie in driver.get_cookies():
+            fetcher.session.cookies.set(cookie['name'], cookie['value'],
+                                        domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        fetcher.session.headers['Referer'] = driver.current_url
+        return fetcher
+
+    def obtener(self, ids_expediente: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Fichas de los expedientes indicados.
+
+        Returns:
+            {id_expediente: {'resumen', 'objetivo', 'titular', 'ubicacion', 'inversion'}}
+            solo para los expedientes con descripción encontrada.
+        """
+        ids = list(dict.fromkeys(str(i) for i in ids_expediente if i))
+        resultado = {i: self._memoria[i] for i in ids if i in self._memoria}
+
+        faltantes = [i for i in ids if i not in resultado]
+        desde_bd = _cache_bd_obtener(faltantes) if faltantes else {}
+        self._memoria.update(desde_bd)
+        resultado.update(desde_bd)
+
+        faltantes = [i for i in faltantes if i not in desde_bd]
+        descargados = {}
+        if faltantes:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(faltantes))) as executor:
+                for id_expediente, detalle in zip(faltantes, executor.map(self._descargar, faltantes)):
+                    if detalle and detalle.get('resumen'):
+                        descargados[id_expediente] = detalle
+            if descargados:
+                _cache_bd_guardar(descargados)
+                self._memoria.update(descargados)
+                resultado.update(descargados)
+
+        logger.info(f"📄 Fichas SEA: {len(ids) - len(faltantes)} desde caché, "
+                    f"{len(descargados)}/{len(faltantes)} descargadas")
+        return resultado
+
+    def _descargar(self, id_expediente: str) -> Optional[Dict]:
+        """Descarga y parsea una ficha; None si no se pudo"""
+        url = URL_FICHA_SEA.format(id_expediente)
+        try:
+            response = self.session.get(url, timeout=self.TIMEOUT)
+            if response.status_code != 200:
+                logger.debug(f"Ficha {id_expediente}: HTTP {response.status_code}")
+                return None
+            soup = BeautifulSoup(response.content, 'html.parser')
+
+            # Fichas servidas dentro de frames: se descarga el contenido de cada uno
+            for frame in soup.find_all(['frame', 'iframe'], src=True):
+                respuesta_frame = self.session.get(urljoin(url, frame['src']), timeout=self.TIMEOUT)
+                if respuesta_frame.status_code == 200:
+                    soup.append(BeautifulSoup(respuesta_frame.content, 'html.parser'))
+
+            detalle = self._parsear_ficha(soup)
+            if detalle.get('resumen'):
+                detalle['url'] = url
+                detalle['metodo'] = 'requests_concurrente'
+                return detalle
+        except requests.RequestException as e:
+            logger.debug(f"Error descargando ficha {id_expediente}: {e}")
+        except Exception as e:
+            logger.debug(f"Error parseando ficha {id_expediente}: {e}")
+        return None
+
+    def _parsear_ficha(self, soup: BeautifulSoup) -> Dict[str, str]:
+        """Mismos criterios que SEAResumenExtractorRobusto._extract_from_tables, sobre el HTML"""
+        texto = self._texto
+        resultado = {'resumen': '', 'objetivo': '', 'titular': '', 'ubicacion': '', 'inversion': ''}
+
+        for fila in soup.find_all('tr'):
+            celdas = fila.find_all('td', recursive=False)
+            if len(celdas) < 2:
+                celdas = fila.find_all('th', recursive=False) + celdas
+            if len(celdas) < 2:
+                continue
+
+            header = texto._normalize_text(celdas[0].get_text(' ', strip=True))
+            contenido = celdas[1].get_text(' ', strip=True)
+            if not contenido:
+                continue
+
+            if not resultado['resumen'] and texto._matches_header(header, 'descripcion'):
+                if len(contenido) > 100:
+                    resultado['resumen'] = texto._clean_text(contenido)
+            elif not resultado['objetivo'] and texto._matches_header(header, 'objetivo'):
+                resultado['objetivo'] = texto._clean_text(contenido)
+            elif not resultado['titular'] and texto._matches_header(header, 'titular'):
+                resultado['titular'] = contenido
+            elif not resultado['ubicacion'] and texto._matches_header(header, 'ubicacion'):
+                resultado['ubicacion'] = contenido
+            elif not resultado['inversion'] and texto._matches_header(header, 'inversion'):
+                resultado['inversion'] = contenido
+
+        if not resultado['resumen']:
+            descripcion = self._descripcion_en_bloques(soup)
+            if descripcion:
+                resultado['resumen'] = texto._clean_text(descripcion)
+        return resultado
+
+    def _descripcion_en_bloques(self, soup: BeautifulSoup) -> Optional[str]:
+        """Descripción fuera de las tablas de la ficha"""
+        # Bloque de descripción de la ficha nueva
+        desc_div = soup.find('div', class_='sg-description-file')
+        if desc_div:
+            contenido = desc_div.get_text(separator=' ', strip=True)
+            if len(contenido) > 50:
+                return contenido
+
+        # Título "Descripción del Proyecto" seguido del texto
+        span_desc = soup.find('span', string='Descripción del Proyecto')
+        if span_desc and span_desc.parent:
+            siguiente = span_desc.parent.find_next_sibling('div')
+            if siguiente:
+                contenido = siguiente.get_text(separator=' ', strip=True)
+                if len(contenido) > 50:
+                    return contenido
+
+        # Primer bloque largo que describa el proyecto
+        for elemento in soup.find_all(['p', 'div', 'td']):
+            contenido = elemento.get_text(separator=' ', strip=True)
+            if len(contenido) > 300 and any(frase in contenido.lower() for frase in FRASES_DESCRIPCION):
+                return re.sub(r'\s+', ' ', contenido)
+        return None
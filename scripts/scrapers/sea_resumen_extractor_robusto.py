@@ -484,6 +484,11 @@ class SEAResumenExtractorRobusto:
         """
         Método principal para extraer resumen con todas las protecciones
         """
+        # Ficha ya extraída antes (el proyecto sigue en la ventana del informe)
+        cacheado = self._descripcion_cacheada(id_expediente)
+        if cacheado:
+            return cacheado
+        
         # Verificar circuit breaker
         if not self.circuit_breaker.can_attempt():
             logger.warning("🔴 Circuit breaker abierto - usando fallback")
@@ -507,6 +512,9 @@ class SEAResumenExtractorRobusto:
             if elapsed > self.TIMEOUTS['max_per_project']:
                 logger.warning(f"⏱️ Extracción tomó mucho tiempo: {elapsed:.1f}s")
             
+            if resultado.get('resumen'):
+                self._guardar_descripcion(id_expediente, resultado)
+            
         except TimeoutException:
             logger.error(f"⏰ Timeout extrayendo proyecto {id_expediente}")
             self.circuit_breaker.call_failed()
@@ -516,6 +524,22 @@ class SEAResumenExtractorRobusto:
         
         return resultado
     
+    def _descripcion_cacheada(self, id_expediente: str) -> Dict[str, str]:
+        """Descripción guardada en DescripcionProyectoSEA ({} si no hay o no hay BD)"""
+        try:
+            from alerts.models import DescripcionProyectoSEA
+            return DescripcionProyectoSEA.obtener_varios([id_expediente]).get(str(id_expediente), {})
+        except Exception as e:
+            logger.debug(f"Caché de fichas SEA no disponible: {e}")
+            return {}
+    
+    def _guardar_descripcion(self, id_expediente: str, resultado: Dict[str, str]):
+        try:
+            from alerts.models import DescripcionProyectoSEA
+            DescripcionProyectoSEA.guardar_varios({id_expediente: resultado}, metodo='selenium')
+        except Exception as e:
+            logger.debug(f"No se pudo guardar la ficha SEA {id_expediente}: {e}")
+    
     def cerrar_driver(self):
         """Cierra el driver de Chrome de manera segura"""
         if self.driver: